@@ -0,0 +1,162 @@
+"""
+API Benchmarks - Hot endpoint scenarios for the bench_api command
+
+Each scenario turns a generated dataset (see rentalbe.datagen) into a list
+of test-client requests against the public API, which measure_requests
+times and counts queries for. Requests depend only on the seed and the
+dataset, so runs at the same scale send the same requests and can be
+compared against a stored baseline.
+"""
+import json
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import partial
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from django.test import Client
+
+from rentalbe.benchmarking import measure_requests
+from rentalbe.datagen import BOOKING_HORIZON_DAYS, GENERATED_PASSWORD
+
+Calls = List[Callable]
+
+
+@dataclass
+class BenchData:
+    """What the scenarios need to know about the dataset under test."""
+    user_ids: List[int]
+    usernames: List[str]
+    vehicle_ids: List[int]
+    locations: List[str]
+    anchor: date
+
+    @classmethod
+    def load(cls, anchor: date) -> "BenchData":
+        from user.models import User
+        from vehicle.models import Vehicle
+
+        users = list(User.objects.order_by("id").values_list("id", "username"))
+        return cls(
+            user_ids=[user_id for user_id, _ in users],
+            usernames=[username for _, username in users],
+            vehicle_ids=list(Vehicle.objects.order_by("id").values_list("id", flat=True)),
+            locations=sorted(set(Vehicle.objects.values_list("location", flat=True))),
+            anchor=anchor,
+        )
+
+
+def _post_json(client: Client, path: str, payload: dict, **extra) -> Callable:
+    return partial(client.post, path, json.dumps(payload), content_type="application/json", **extra)
+
+
+def _booking_window(rng: random.Random, data: BenchData) -> Tuple[date, date]:
+    """A short range between the anchor and the booking horizon, where searches look."""
+    start = data.anchor + timedelta(days=rng.randint(0, BOOKING_HORIZON_DAYS))
+    return start, start + timedelta(days=rng.randint(1, 7))
+
+
+def vehicle_search(client: Client, rng: random.Random, data: BenchData, count: int) -> Calls:
+    calls = []
+    for _ in range(count):
+        start, end = _booking_window(rng, data)
+        params = {"location": rng.choice(data.locations), "start_date": start, "end_date": end}
+        calls.append(partial(client.get, "/api/vehicles/search", params))
+    return calls
+
+
+def vehicle_list(client: Client, rng: random.Random, data: BenchData, count: int) -> Calls:
+    return [
+        partial(client.get, "/api/vehicles/", {
+            "location": rng.choice(data.locations),
+            "sort": rng.choice(("id", "daily_rate", "-year", "name")),
+            "limit": 50,
+        })
+        for _ in range(count)
+    ]
+
+
+def reservation_list(client: Client, rng: random.Random, data: BenchData, count: int) -> Calls:
+    return [partial(client.get, "/api/reservations/", {"limit": 50}) for _ in range(count)]
+
+
+def check_availability(client: Client, rng: random.Random, data: BenchData, count: int) -> Calls:
+    calls = []
+    for _ in range(count):
+        start, end = _booking_window(rng, data)
+        calls.append(_post_json(client, "/api/reservations/check-availability", {
+            "vehicle_id": rng.choice(data.vehicle_ids), "start_date": str(start), "end_date": str(end),
+        }))
+    return calls
+
+
+def reservation_create(client: Client, rng: random.Random, data: BenchData, count: int) -> Calls:
+    # Past the generated bookings, one 3-night slot per vehicle per round,
+    # so every request books successfully
+    first_day = data.anchor + timedelta(days=BOOKING_HORIZON_DAYS + 30)
+    vehicle_ids = rng.sample(data.vehicle_ids, len(data.vehicle_ids))
+    calls = []
+    for index in range(count):
+        start = first_day + timedelta(days=index // len(vehicle_ids) * 4)
+        calls.append(_post_json(client, "/api/reservations/", {
+            "vehicle_id": vehicle_ids[index % len(vehicle_ids)],
+            "user_id": rng.choice(data.user_ids),
+            "start_date": str(start),
+            "end_date": str(start + timedelta(days=3)),
+        }))
+    return calls
+
+
+def login(client: Client, rng: random.Random, data: BenchData, count: int) -> Calls:
+    # Distinct users and addresses stay under the login throttle
+    return [
+        _post_json(
+            client, "/api/users/login",
+            {"username": data.usernames[index % len(data.usernames)], "password": GENERATED_PASSWORD},
+            REMOTE_ADDR=f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}",
+        )
+        for index in range(count)
+    ]
+
+
+@dataclass
+class Scenario:
+    build: Callable[[Client, random.Random, BenchData, int], Calls]
+    expected_status: Sequence[int] = (200,)
+    # Fraction of the requested sample count to run (at least MIN_SAMPLES)
+    share: float = 1.0
+
+
+MIN_SAMPLES = 5
+
+# Run in this order; each login pays for a full password hash, so a tenth
+# of the samples keeps the suite quick
+SCENARIOS: Dict[str, Scenario] = {
+    "vehicle_search": Scenario(vehicle_search),
+    "vehicle_list": Scenario(vehicle_list),
+    "reservation_list": Scenario(reservation_list),
+    "check_availability": Scenario(check_availability),
+    "reservation_create": Scenario(reservation_create, (201,)),
+    "login": Scenario(login, share=0.1),
+}
+
+
+def run_scenarios(
+    client: Client,
+    rng: random.Random,
+    data: BenchData,
+    requests: int,
+    warmup: int = 3,
+    names: Sequence[str] = tuple(SCENARIOS),
+) -> Dict[str, Dict[str, float]]:
+    """Latency percentiles and query counts per scenario (`requests` timed samples each)."""
+    from user.throttle import login_throttle
+
+    login_throttle.reset()
+    results = {}
+    for name in names:
+        scenario = SCENARIOS[name]
+        samples = max(MIN_SAMPLES, round(requests * scenario.share))
+        calls = scenario.build(client, rng, data, samples + warmup)
+        results[name] = measure_requests(calls, scenario.expected_status, warmup)
+    return results
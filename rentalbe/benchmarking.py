@@ -0,0 +1,207 @@
+"""
+Benchmark Helpers - Throwaway database and timing utilities for bench_* commands
+"""
+import math
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, List, Sequence
+
+from django.core.cache import caches
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+SEED_START = date(2024, 1, 1)
+STATUS_WEIGHTS = {"pending": 15, "confirmed": 35, "cancelled": 10, "completed": 40}
+
+
+@contextmanager
+def throwaway_database(verbosity: int = 0):
+    """
+    Run the block against a freshly migrated test database, then drop it.
+    Benchmarks never write into the configured database.
+    """
+    old_name = connection.creation.create_test_db(verbosity=verbosity, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+
+
+@contextmanager
+def slow_database(delay: float):
+    """
+    Add `delay` seconds of blocking latency to every query, on connections
+    open now and on those opened later by other threads (simulated slow DB).
+    Other threads' connections keep the delay until they are closed.
+    """
+    def wrapper(execute, sql, params, many, context):
+        time.sleep(delay)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
+
+    connection_created.connect(install)
+    for conn in connections.all(initialized_only=True):
+        install(None, conn)
+    try:
+        yield
+    finally:
+        connection_created.disconnect(install)
+        for conn in connections.all(initialized_only=True):
+            if wrapper in conn.execute_wrappers:
+                conn.execute_wrappers.remove(wrapper)
+
+
+def api_client() -> Client:
+    """Test client whose Host header passes the production ALLOWED_HOSTS."""
+    return Client(HTTP_HOST="127.0.0.1")
+
+
+def seed_fleet(
+    rng: random.Random,
+    vehicles: int,
+    reservations: int,
+    locations: Sequence[str] = ("Jakarta",),
+) -> List[int]:
+    """
+    Replace all vehicles and reservations with a synthetic fleet and clear caches.
+    Reservations are spread round-robin over vehicles in weekly slots starting
+    at SEED_START, so each vehicle covers reservations / vehicles weeks.
+    Returns the vehicle ids.
+    """
+    from reservation.models import Reservation
+    from user.models import User
+    from vehicle.models import Vehicle
+
+    Reservation.objects.all().delete()
+    Vehicle.all_objects.all().delete()
+    for cache in caches.all():
+        cache.clear()
+    user, _ = User.objects.get_or_create(username="bench", defaults={"password": "!"})
+
+    Vehicle.objects.bulk_create(
+        [
+            Vehicle(
+                name=f"Bench {i}", brand=f"Brand {i % 7}", model="B", year=2015 + i % 10,
+                plate_number=f"BENCH {i}", color="Grey", daily_rate=200000 + i % 20 * 25000,
+                is_available=True, location=locations[i % len(locations)],
+            )
+            for i in range(vehicles)
+        ],
+        batch_size=5000,
+    )
+    vehicle_ids = list(Vehicle.objects.order_by("id").values_list("id", flat=True))
+
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    batch = []
+    for index in range(reservations):
+        start = SEED_START + timedelta(days=index // vehicles * 7 + rng.randint(0, 2))
+        batch.append(
+            Reservation(
+                user=user,
+                vehicle_id=vehicle_ids[index % vehicles],
+                start_date=start,
+                end_date=start + timedelta(days=rng.randint(1, 4)),
+                status=rng.choices(statuses, weights)[0],
+            )
+        )
+        if len(batch) == 5000:
+            Reservation.objects.bulk_create(batch)
+            batch = []
+    Reservation.objects.bulk_create(batch)
+    return vehicle_ids
+
+
+def time_calls(func: Callable, calls: Iterable[Sequence]) -> List[float]:
+    """Call func once per argument tuple and return each duration in seconds."""
+    durations = []
+    for args in calls:
+        started = time.perf_counter()
+        func(*args)
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of the samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def measure_requests(
+    calls: Sequence[Callable[[], HttpResponse]],
+    expected_status: Iterable[int] = (200,),
+    warmup: int = 0,
+) -> Dict[str, float]:
+    """
+    Run each request and summarize its latency and query count; the first
+    `warmup` calls are run but not counted. Raises AssertionError on an
+    unexpected status, since timing an error page measures the wrong thing.
+    """
+    expected_status = set(expected_status)
+    samples, queries = [], []
+    for index, call in enumerate(calls):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = call()
+            elapsed = time.perf_counter() - started
+        if response.status_code not in expected_status:
+            raise AssertionError(f"Unexpected status {response.status_code}: {response.content[:200]!r}")
+        if index >= warmup:
+            samples.append(elapsed)
+            queries.append(len(captured))
+
+    stats = summarize(samples)
+    stats["queries_mean"] = sum(queries) / len(queries) if queries else 0.0
+    stats["queries_max"] = max(queries, default=0)
+    return stats
+
+
+def regressions(
+    current: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+    min_delta_ms: float = 1.0,
+) -> List[str]:
+    """
+    Describe each scenario (present in both runs) that got slower or issues
+    more queries than its baseline. A latency counts as regressed when it is
+    over `threshold` (0.25 = 25%) and `min_delta_ms` above the baseline, so
+    sub-millisecond jitter is ignored; any extra query is a regression.
+    """
+    found = []
+    for name, stats in current.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            limit = max(base[metric] * (1 + threshold), base[metric] + min_delta_ms)
+            if stats[metric] > limit:
+                found.append(f"{name} {metric}: {stats[metric]:.2f} > {limit:.2f} (baseline {base[metric]:.2f})")
+        if stats["queries_max"] > base["queries_max"]:
+            found.append(f"{name} queries: {stats['queries_max']} > baseline {base['queries_max']}")
+    return found
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """Mean and tail latencies of the samples, in milliseconds."""
+    if not samples:
+        return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    return {
+        "count": len(samples),
+        "mean_ms": sum(samples) / len(samples) * 1000,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
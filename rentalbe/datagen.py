@@ -0,0 +1,199 @@
+"""
+Dataset Generator - Deterministic synthetic users, fleet and reservation history
+
+Each table draws from its own random.Random seeded with (seed, table), so a
+dataset is a pure function of its seed, sizes and anchor date: asking for
+more reservations never changes the users or vehicles. Rows are produced
+lazily as tuples and written with insert_rows, which skips the ORM (COPY on
+PostgreSQL, executemany elsewhere); at tens of millions of rows building
+model instances costs more than the database does.
+
+Reservations follow per-vehicle timelines: bookings spread over a shared
+history window, some vehicles booked far more than others, completed and
+cancelled history before the anchor date and pending/confirmed bookings up
+to BOOKING_HORIZON_DAYS after it. Active reservations of a vehicle never
+overlap (the booking paths guarantee that); cancelled ones may.
+"""
+import io
+import random
+from datetime import date
+from itertools import accumulate
+from string import ascii_uppercase
+from typing import Iterator, List, Sequence, Tuple
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+
+DATASET_ANCHOR = date(2025, 1, 1)
+BOOKING_HORIZON_DAYS = 90
+GENERATED_PASSWORD = "password123"
+
+USER_FIELDS = ("username", "password", "is_deleted")
+VEHICLE_FIELDS = (
+    "name", "brand", "model", "year", "plate_number", "color",
+    "daily_rate", "is_available", "location", "is_deleted",
+)
+RESERVATION_FIELDS = ("user_id", "vehicle_id", "start_date", "end_date", "status")
+
+CITIES = (
+    "Jakarta", "Surabaya", "Bandung", "Medan", "Semarang",
+    "Makassar", "Palembang", "Denpasar", "Yogyakarta", "Malang",
+)
+# (brand, model, daily rate of a 2015 car)
+CATALOG = (
+    ("Toyota", "Avanza", 250000), ("Toyota", "Innova", 400000), ("Toyota", "Fortuner", 750000),
+    ("Toyota", "Alphard", 1500000), ("Honda", "Brio", 200000), ("Honda", "Jazz", 250000),
+    ("Honda", "HR-V", 400000), ("Honda", "CR-V", 550000), ("Daihatsu", "Xenia", 230000),
+    ("Daihatsu", "Terios", 300000), ("Suzuki", "Ertiga", 250000), ("Mitsubishi", "Xpander", 300000),
+    ("Mitsubishi", "Pajero Sport", 700000), ("Nissan", "Livina", 260000), ("Hyundai", "Creta", 350000),
+)
+COLORS = ("Black", "White", "Silver", "Grey", "Red", "Blue")
+# Rental length in nights, drawn uniformly
+RENTAL_NIGHTS = (1, 1, 2, 2, 2, 3, 3, 3, 4, 4, 5, 6, 7, 7, 10, 14)
+MEAN_NIGHTS = sum(RENTAL_NIGHTS) / len(RENTAL_NIGHTS)
+# Busiest vehicle relative to the mean
+MAX_POPULARITY = 2.5
+
+Row = Tuple
+
+
+def table_rng(seed: int, table: str) -> random.Random:
+    """The random stream of one table of the dataset."""
+    return random.Random(f"{seed}:{table}")
+
+
+def locations(count: int) -> List[str]:
+    """`count` location names; past the city list, districts like "Jakarta 2"."""
+    return [
+        CITIES[i % len(CITIES)] + (f" {i // len(CITIES) + 1}" if i >= len(CITIES) else "")
+        for i in range(count)
+    ]
+
+
+def username(index: int) -> str:
+    return f"gen_user_{index}"
+
+
+def plate_number(index: int) -> str:
+    """Unique plate for the index-th vehicle (up to 9999 * 26^3 of them)."""
+    letters, number = divmod(index, 9999)
+    suffix = "".join(ascii_uppercase[letters // 26 ** power % 26] for power in (2, 1, 0))
+    return f"G {number + 1} {suffix}"
+
+
+def user_rows(count: int, seed: int) -> Iterator[Row]:
+    """USER_FIELDS tuples; every user's password is GENERATED_PASSWORD, hashed once."""
+    password = make_password(GENERATED_PASSWORD, salt=f"gen{seed}")
+    for index in range(count):
+        yield username(index), password, False
+
+
+def vehicle_rows(count: int, location_names: Sequence[str], seed: int) -> Iterator[Row]:
+    """VEHICLE_FIELDS tuples; earlier locations get more vehicles (1/rank weights)."""
+    rng = table_rng(seed, "vehicles")
+    cum_weights = list(accumulate(1 / (rank + 1) for rank in range(len(location_names))))
+    for index in range(count):
+        brand, model, base_rate = rng.choice(CATALOG)
+        year = 2015 + rng.randrange(10)
+        yield (
+            f"{brand} {model} {year}", brand, model, year, plate_number(index), rng.choice(COLORS),
+            base_rate + (year - 2015) * 10000, rng.random() >= 0.05,
+            rng.choices(location_names, cum_weights=cum_weights)[0], False,
+        )
+
+
+class _IsoDates(dict):
+    """Day ordinal -> ISO date string, computed once per day."""
+
+    def __missing__(self, day: int) -> str:
+        value = self[day] = date.fromordinal(day).isoformat()
+        return value
+
+
+def bookings_per_vehicle(count: int, vehicles: int, rng: random.Random) -> List[int]:
+    """Split `count` bookings over vehicles with log-normal popularity."""
+    weights = [min(rng.lognormvariate(0, 0.5), MAX_POPULARITY) for _ in range(vehicles)]
+    total = sum(weights)
+    counts = [int(count * weight / total) for weight in weights]
+    for index in range(count - sum(counts)):
+        counts[index % vehicles] += 1
+    return counts
+
+
+def reservation_rows(
+    count: int,
+    user_ids: Sequence[int],
+    vehicle_ids: Sequence[int],
+    seed: int,
+    anchor: date = DATASET_ANCHOR,
+) -> Iterator[Row]:
+    """RESERVATION_FIELDS tuples (dates as ISO strings), vehicle by vehicle."""
+    if count <= 0:
+        return
+    if not user_ids or not vehicle_ids:
+        raise ValueError("Reservations need at least one user and one vehicle")
+
+    rng = table_rng(seed, "reservations")
+    rand = rng.random
+    iso = _IsoDates()
+    today = anchor.toordinal()
+    horizon = today + BOOKING_HORIZON_DAYS
+    users, nights = len(user_ids), len(RENTAL_NIGHTS)
+    # Every vehicle's history covers the same window, sized so the busiest
+    # vehicles are booked back to back; the rest idle between bookings
+    window = count / len(vehicle_ids) * MAX_POPULARITY * (1 + MEAN_NIGHTS)
+    first_day = horizon - int(window)
+
+    for vehicle_id, bookings in zip(vehicle_ids, bookings_per_vehicle(count, len(vehicle_ids), rng)):
+        if not bookings:
+            continue
+        # One slot per booking; each booking starts at a random point of its slot
+        slot = window / bookings
+        free = first_day
+        for index in range(bookings):
+            length = RENTAL_NIGHTS[int(rand() * nights)]
+            day = max(first_day + int(index * slot + rand() * max(0.0, slot - 1 - length)), free)
+            end = day + length
+            draw = rand()
+            if end < today:
+                status = "cancelled" if draw < 0.12 else "completed"
+            elif day > today:
+                status = "cancelled" if draw < 0.1 else "pending" if draw < 0.45 else "confirmed"
+            else:
+                status = "confirmed"
+            yield user_ids[int(rand() * users)], vehicle_id, iso[day], iso[end], status
+            # A cancelled booking does not hold the vehicle; the next may overlap it
+            if status != "cancelled":
+                free = end + 1
+
+
+def insert_rows(model, fields: Sequence[str], rows: Sequence[Row]) -> None:
+    """
+    Insert the rows (tuples in `fields` order) into model's table in one
+    statement. Values must not contain tabs, newlines or backslashes (the
+    PostgreSQL COPY text format is written unescaped). Callers own the
+    transaction.
+    """
+    if not rows:
+        return
+    opts = model._meta
+    quote = connection.ops.quote_name
+    table = quote(opts.db_table)
+    columns = ", ".join(quote(opts.get_field(name).column) for name in fields)
+
+    with connection.cursor() as cursor:
+        if connection.vendor != "postgresql":
+            placeholders = ", ".join(["%s"] * len(fields))
+            cursor.executemany(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", rows)
+            return
+
+        data = io.StringIO()
+        data.writelines("\t".join(map(str, row)) + "\n" for row in rows)
+        sql = f"COPY {table} ({columns}) FROM STDIN"
+        raw = cursor.cursor
+        if hasattr(raw, "copy_expert"):  # psycopg2
+            data.seek(0)
+            raw.copy_expert(sql, data)
+        else:  # psycopg 3
+            with raw.copy(sql) as copy:
+                copy.write(data.getvalue())
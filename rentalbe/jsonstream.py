@@ -0,0 +1,106 @@
+"""
+JSON Streams - Read large JSON arrays item by item
+
+iter_json_array decodes the items of a top-level JSON array with
+JSONDecoder.raw_decode over a sliding text buffer, so memory is bounded by
+the largest item rather than the file. batched groups any iterable into
+lists for set-based database work, and JsonArrayWriter writes arrays of any
+length the same way, one item at a time.
+"""
+import json
+import re
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, TextIO
+
+READ_SIZE = 1 << 16
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def iter_json_array(fp: TextIO, read_size: int = READ_SIZE) -> Iterator[Any]:
+    """Yield each item of the JSON array in a text file; raises ValueError on malformed input."""
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+
+    def read_more(minimum: int) -> None:
+        nonlocal buffer, pos, eof
+        # Grow reads with the pending text so a huge item is not re-parsed per block
+        chunk = fp.read(max(minimum, len(buffer) - pos))
+        buffer, pos = buffer[pos:] + chunk, 0
+        eof = not chunk
+
+    def next_char() -> str:
+        nonlocal pos
+        while True:
+            pos = WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer):
+                return buffer[pos]
+            if eof:
+                raise ValueError("Unexpected end of JSON input")
+            read_more(read_size)
+
+    if next_char() != "[":
+        raise ValueError("Expected a JSON array")
+    pos += 1
+    if next_char() == "]":
+        return
+
+    while True:
+        next_char()
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                read_more(read_size)
+                continue
+            # A number cut by the block boundary ("12", "0.", "1e") decodes
+            # short; only trust it once the ',' or ']' after it is buffered
+            after = WHITESPACE.match(buffer, end).end()
+            if not eof and (after == len(buffer) or buffer[after] not in ",]"):
+                read_more(read_size)
+                continue
+            break
+        yield item
+        pos = end
+
+        char = next_char()
+        if char == "]":
+            return
+        if char != ",":
+            raise ValueError(f"Expected ',' or ']' in JSON array, got {char!r}")
+        pos += 1
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Consecutive lists of up to `size` items."""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class JsonArrayWriter:
+    """Write a JSON array item by item; use as a context manager to close the array."""
+
+    def __init__(self, fp: TextIO):
+        self.fp = fp
+        self.count = 0
+
+    def __enter__(self) -> "JsonArrayWriter":
+        self.fp.write("[")
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.fp.write("\n]\n" if self.count else "]\n")
+
+    def write(self, item: Any) -> None:
+        self.fp.write(",\n" if self.count else "\n")
+        self.fp.write(json.dumps(item, separators=(",", ":")))
+        self.count += 1
+
+    def write_many(self, items: Iterable[Any]) -> None:
+        for item in items:
+            self.write(item)
@@ -0,0 +1,32 @@
+"""
+Keyset Pagination - Opaque cursor helpers shared by list endpoints
+"""
+import base64
+import json
+from typing import Any, List
+
+
+def clamp_limit(limit: int, default: int, maximum: int) -> int:
+    """Keep a client supplied page size inside [1, maximum]."""
+    if not limit:
+        return default
+    return max(1, min(int(limit), maximum))
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row of a page into an opaque cursor."""
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(values, list) or not values:
+        raise ValueError("Invalid cursor")
+    return values
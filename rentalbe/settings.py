@@ -93,6 +93,69 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# Local-memory by default; point CACHES at Redis/Memcached for multi-worker setups.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'rentalbe',
+    }
+}
+
+# Vehicle search result cache (any alias from CACHES)
+VEHICLE_SEARCH_CACHE_ALIAS = os.getenv("VEHICLE_SEARCH_CACHE_ALIAS", "default")
+VEHICLE_SEARCH_CACHE_TIMEOUT = int(os.getenv("VEHICLE_SEARCH_CACHE_TIMEOUT", "300"))
+
+# Read-through vehicle cache (per-worker LRU, version stamps in CACHES[alias])
+VEHICLE_CACHE_ALIAS = os.getenv("VEHICLE_CACHE_ALIAS", "default")
+VEHICLE_CACHE_MAX_ENTRIES = int(os.getenv("VEHICLE_CACHE_MAX_ENTRIES", "2048"))
+VEHICLE_CACHE_TTL = int(os.getenv("VEHICLE_CACHE_TTL", "300"))
+
+
+# Reservation availability index
+# When enabled, /api/reservations/check-availability answers from an in-process
+# interval index. Each vehicle's intervals are re-read from the database once
+# they are older than the TTL (seconds), which bounds staleness across workers.
+
+RESERVATION_AVAILABILITY_INDEX = os.getenv("RESERVATION_AVAILABILITY_INDEX", "False") == "True"
+RESERVATION_AVAILABILITY_INDEX_TTL = int(os.getenv("RESERVATION_AVAILABILITY_INDEX_TTL", "30"))
+
+
+# Signed bearer tokens issued by /api/users/login (see user.auth)
+# Seconds a token stays valid; /api/users/token/refresh extends it without a password,
+# but only up to USER_TOKEN_MAX_LIFETIME seconds after the login that started the chain.
+
+USER_TOKEN_MAX_AGE = int(os.getenv("USER_TOKEN_MAX_AGE", "3600"))
+USER_TOKEN_MAX_LIFETIME = int(os.getenv("USER_TOKEN_MAX_LIFETIME", "86400"))
+
+# /api/users/bulk-register is for onboarding services, not the public: it needs
+# `Authorization: Bearer <USER_BULK_REGISTER_TOKEN>` (unset disables it) and takes
+# at most USER_BULK_REGISTER_MAX_USERS users, each hashed inside the request.
+# Larger imports go through the load_users command.
+
+USER_BULK_REGISTER_TOKEN = os.getenv("USER_BULK_REGISTER_TOKEN", "")
+USER_BULK_REGISTER_MAX_USERS = int(os.getenv("USER_BULK_REGISTER_MAX_USERS", "50"))
+
+# Login throttle (see user.throttle)
+# Token buckets per username and per client IP, checked before password hashing.
+# "memory" keeps buckets per worker; "cache" shares them through CACHES[alias].
+# X-Forwarded-For is only read when the request comes from a trusted proxy
+# (comma-separated addresses); otherwise the client IP is REMOTE_ADDR.
+
+LOGIN_THROTTLE_ENABLED = os.getenv("LOGIN_THROTTLE_ENABLED", "True") == "True"
+LOGIN_THROTTLE_BACKEND = os.getenv("LOGIN_THROTTLE_BACKEND", "memory")
+LOGIN_THROTTLE_CACHE_ALIAS = os.getenv("LOGIN_THROTTLE_CACHE_ALIAS", "default")
+LOGIN_THROTTLE_USERNAME_BURST = int(os.getenv("LOGIN_THROTTLE_USERNAME_BURST", "5"))
+LOGIN_THROTTLE_USERNAME_PER_MINUTE = float(os.getenv("LOGIN_THROTTLE_USERNAME_PER_MINUTE", "5"))
+LOGIN_THROTTLE_IP_BURST = int(os.getenv("LOGIN_THROTTLE_IP_BURST", "20"))
+LOGIN_THROTTLE_IP_PER_MINUTE = float(os.getenv("LOGIN_THROTTLE_IP_PER_MINUTE", "30"))
+LOGIN_THROTTLE_TRUSTED_PROXIES = [
+    address.strip() for address in os.getenv("LOGIN_THROTTLE_TRUSTED_PROXIES", "").split(",") if address.strip()
+]
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
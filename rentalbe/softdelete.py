@@ -0,0 +1,29 @@
+"""
+Soft Delete - Tombstone flag shared by models whose deletes are deferred
+
+Deleting flips `is_deleted`; the default manager hides tombstoned rows from
+every read, and `purge_deleted` removes them (and their reservations) later
+in small batches.
+"""
+from django.db import models
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    """QuerySet of a model with an `is_deleted` tombstone"""
+
+    def soft_delete(self) -> int:
+        """Tombstone the live rows of the queryset; returns how many were flipped."""
+        return self.filter(is_deleted=False).update(is_deleted=True)
+
+    def tombstoned(self) -> "SoftDeleteQuerySet":
+        return self.filter(is_deleted=True)
+
+
+class LiveManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    """Default manager: tombstoned rows are invisible to reads."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
+AllObjectsManager = models.Manager.from_queryset(SoftDeleteQuerySet)
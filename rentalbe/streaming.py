@@ -0,0 +1,32 @@
+"""
+Streaming Responses - Serve blocking chunk iterators under both WSGI and ASGI
+"""
+from typing import AsyncIterator, Iterator
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+_DONE = object()
+
+
+async def aiterate(chunks: Iterator) -> AsyncIterator:
+    """Async view of a blocking iterator, advanced one item per worker-thread hop."""
+    # thread_sensitive keeps every step on the request's thread, where the
+    # iterator's database cursor lives
+    advance = sync_to_async(next, thread_sensitive=True)
+    while True:
+        chunk = await advance(chunks, _DONE)
+        if chunk is _DONE:
+            return
+        yield chunk
+
+
+def streaming_response(request, chunks: Iterator, content_type: str) -> StreamingHttpResponse:
+    """
+    StreamingHttpResponse that stays streamed under ASGI too (Django buffers
+    synchronous iterators there).
+    """
+    if isinstance(request, ASGIRequest):
+        chunks = aiterate(chunks)
+    return StreamingHttpResponse(chunks, content_type=content_type)
@@ -1,72 +1,157 @@
 """
 Reservation API - HTTP Endpoints
 """
-from ninja import Router
+import base64
+import json
+from datetime import date
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from ninja import Router, Query
 from uuid import UUID
-from typing import List
+from typing import List, Optional
 
-from reservation.services import ReservationService
+from rentalbe.streaming import streaming_response
+from reservation.booking import BookingBusy
+from reservation.services import ReservationService, DEFAULT_PAGE_SIZE
 from reservation.schemas import (
     AddReservationRequest,
     UpdateReservationRequest,
     SearchReservationRequest,
     IsVehicleAvailableRequest,
+    BatchAvailabilityRequest,
+    BatchAvailabilityResponse,
+    CalendarResponse,
     ReservationResponse,
+    ReservationPageResponse,
     MessageResponse,
     ErrorResponse,
 )
 
 router = Router(tags=["Reservations"])
 
+NDJSON_CHUNK_LINES = 500
+# Seconds a client should wait before retrying a write that lost a lock race
+BUSY_RETRY_AFTER = 1
+
 
 # ==================== ENDPOINTS ====================
 
-@router.get("/", response=List[ReservationResponse])
-def list_reservations(request):
-    """Get all reservations."""
-    return ReservationService.get_all()
+@router.get("/", response={200: ReservationPageResponse, 400: ErrorResponse})
+async def list_reservations(
+    request,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    stream: bool = False
+):
+    """
+    Get reservations page by page (pass `next` back as `cursor`).
+    With stream=true every reservation is streamed as NDJSON instead.
+    """
+    if stream:
+        rows = ReservationService.iter_all()
+        # A few hundred lines per chunk keeps writes (and ASGI thread hops) few
+        chunks = (
+            "".join(json.dumps(row, cls=DjangoJSONEncoder) + "\n" for row in batch)
+            for batch in iter(lambda: list(islice(rows, NDJSON_CHUNK_LINES)), [])
+        )
+        return streaming_response(request, chunks, "application/x-ndjson")
+    
+    try:
+        reservations, next_cursor = await ReservationService.aget_page(cursor, limit)
+    except ValueError as e:
+        return 400, {"error": str(e)}
+    return 200, {"items": reservations, "next": next_cursor}
 
 
 @router.post("/search", response=List[ReservationResponse])
-def search_reservations(request, payload: SearchReservationRequest):
+async def search_reservations(request, payload: SearchReservationRequest):
     """Search reservations with optional filters."""
-    return ReservationService.search(payload)
+    return await ReservationService.asearch(payload)
 
 
 @router.post("/check-availability", response={200: dict, 400: ErrorResponse})
-def check_vehicle_availability(request, payload: IsVehicleAvailableRequest):
+async def check_vehicle_availability(request, payload: IsVehicleAvailableRequest):
     """Check if vehicle is available for the given dates."""
-    is_available = ReservationService.is_vehicle_available(payload)
+    is_available = await ReservationService.acheck_availability(payload)
     return 200, {"available": is_available}
 
 
+@router.post("/check-availability/batch", response={200: BatchAvailabilityResponse, 400: ErrorResponse})
+def check_vehicle_availability_batch(request, payload: BatchAvailabilityRequest):
+    """Check availability of many vehicles/date ranges in one call (results keep input order)."""
+    try:
+        flags = ReservationService.check_availability_batch(payload.items)
+    except ValueError as e:
+        return 400, {"error": str(e)}
+    
+    results = [
+        {
+            "vehicle_id": item.vehicle_id,
+            "start_date": item.start_date,
+            "end_date": item.end_date,
+            "available": available,
+        }
+        for item, available in zip(payload.items, flags)
+    ]
+    return 200, {"results": results}
+
+
+@router.get("/calendar", response={200: CalendarResponse, 400: ErrorResponse})
+def availability_calendar(
+    request,
+    vehicle_ids: List[int] = Query(..., description="Vehicle ids (repeat the parameter)"),
+    start_date: date = Query(..., description="First day of the calendar"),
+    days: int = Query(90, description="Number of days, up to 366")
+):
+    """Get a base64 booked-days bitmap per vehicle (bit i = start_date + i days)."""
+    try:
+        bitmaps = ReservationService.availability_calendar(vehicle_ids, start_date, days)
+    except ValueError as e:
+        return 400, {"error": str(e)}
+    
+    vehicles = [
+        {"vehicle_id": vehicle_id, "booked": base64.b64encode(bitmap).decode()}
+        for vehicle_id, bitmap in bitmaps.items()
+    ]
+    return 200, {"start_date": start_date, "days": days, "vehicles": vehicles}
+
+
 @router.get("/{reservation_id}", response={200: ReservationResponse, 404: ErrorResponse})
-def get_reservation(request, reservation_id: int):
+async def get_reservation(request, reservation_id: int):
     """Get reservation by ID."""
-    reservation = ReservationService.get_by_id(reservation_id)
+    reservation = await ReservationService.aget_by_id(reservation_id)
     if not reservation:
         return 404, {"error": "Reservation not found"}
     return 200, reservation
 
 
-@router.post("/", response={201: ReservationResponse, 400: ErrorResponse})
-def create_reservation(request, payload: AddReservationRequest):
-    """Create a new reservation."""
+def _busy(response: HttpResponse):
+    response["Retry-After"] = str(BUSY_RETRY_AFTER)
+    return 503, {"error": "The booking could not be saved because of concurrent writes, retry the request"}
+
+
+@router.post("/", response={201: ReservationResponse, 400: ErrorResponse, 503: ErrorResponse})
+def create_reservation(request, response: HttpResponse, payload: AddReservationRequest):
+    """Create a new reservation (503 with Retry-After when it lost a lock race)."""
     try:
-        print("Oi New Reservation")
         reservation = ReservationService.create(payload)
-        print("RESERVATION", reservation)
         return 201, reservation
     except ValueError as e:
         return 400, {"error": str(e)}
+    except BookingBusy:
+        return _busy(response)
 
 
-@router.put("/", response={200: ReservationResponse, 400: ErrorResponse, 404: ErrorResponse})
-def update_reservation(request, payload: UpdateReservationRequest):
-    """Update a reservation."""
+@router.put("/", response={200: ReservationResponse, 400: ErrorResponse, 404: ErrorResponse, 503: ErrorResponse})
+def update_reservation(request, response: HttpResponse, payload: UpdateReservationRequest):
+    """Update a reservation (503 with Retry-After when it lost a lock race)."""
     try:
         reservation = ReservationService.update(payload)
         return 200, reservation
+    except BookingBusy:
+        return _busy(response)
     except ValueError as e:
         error_msg = str(e)
         if "not found" in error_msg.lower():
@@ -0,0 +1,158 @@
+"""
+Availability Index - In-process interval index over active reservations
+"""
+import threading
+import time
+from bisect import bisect_right, insort
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+
+from reservation.models import Reservation
+
+
+class VehicleIntervals:
+    """
+    Date ranges of one vehicle's active reservations, sorted by start date.
+    A running maximum of end dates lets overlap queries stop after a binary
+    search plus the few intervals that can still reach the requested range.
+    """
+
+    __slots__ = ("_entries", "_starts", "_max_ends", "loaded_at")
+
+    def __init__(self, entries: Iterable[Tuple[date, date, int]] = ()):
+        self._entries = sorted(entries)
+        self._reindex()
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def reservation_ids(self) -> Iterable[int]:
+        """Ids of the reservations held in this set."""
+        return [entry[2] for entry in self._entries]
+
+    def _reindex(self) -> None:
+        """Rebuild the start keys and running max of end dates."""
+        self._starts = [entry[0] for entry in self._entries]
+        self._max_ends = []
+        current = None
+        for _, end, _ in self._entries:
+            if current is None or end > current:
+                current = end
+            self._max_ends.append(current)
+
+    def add(self, reservation_id: int, start: date, end: date) -> None:
+        """Insert or replace the interval of a reservation."""
+        self.discard(reservation_id)
+        insort(self._entries, (start, end, reservation_id))
+        self._reindex()
+
+    def discard(self, reservation_id: int) -> bool:
+        """Remove the interval of a reservation if present."""
+        for position, entry in enumerate(self._entries):
+            if entry[2] == reservation_id:
+                del self._entries[position]
+                self._reindex()
+                return True
+        return False
+
+    def overlaps(self, start: date, end: date, exclude_id: Optional[int] = None) -> bool:
+        """Return True if any interval intersects [start, end] (inclusive)."""
+        # Only intervals starting on or before `end` can overlap
+        position = bisect_right(self._starts, end)
+        for index in range(position - 1, -1, -1):
+            if self._max_ends[index] < start:
+                return False
+            _, entry_end, reservation_id = self._entries[index]
+            if entry_end >= start and reservation_id != exclude_id:
+                return True
+        return False
+
+
+class AvailabilityIndex:
+    """
+    Per-vehicle interval index, loaded lazily from the database on first use.
+    Reservation write paths keep loaded vehicles current through sync/discard;
+    entries older than `ttl` seconds are reloaded to pick up other workers' writes.
+    """
+
+    def __init__(self, ttl: float = 0):
+        self.ttl = ttl
+        self._vehicles: Dict[int, VehicleIntervals] = {}
+        self._owners: Dict[int, int] = {}
+        self._writes = 0
+        self._lock = threading.RLock()
+
+    def is_available(
+        self,
+        vehicle_id: int,
+        start: date,
+        end: date,
+        exclude_id: Optional[int] = None
+    ) -> bool:
+        """Check if vehicle has no active reservation overlapping [start, end]."""
+        intervals = self._intervals(vehicle_id)
+        with self._lock:
+            return not intervals.overlaps(start, end, exclude_id)
+
+    def sync(self, reservation: Reservation) -> None:
+        """Reflect a created or updated reservation in the index."""
+        with self._lock:
+            self._writes += 1
+            self._forget(reservation.id)
+
+            intervals = self._vehicles.get(reservation.vehicle_id)
+            if intervals is None or reservation.status not in Reservation.ACTIVE_STATUSES:
+                return
+            intervals.add(reservation.id, reservation.start_date, reservation.end_date)
+            self._owners[reservation.id] = reservation.vehicle_id
+
+    def discard(self, reservation_id: int) -> None:
+        """Remove a deleted reservation from the index."""
+        with self._lock:
+            self._writes += 1
+            self._forget(reservation_id)
+
+    def clear(self) -> None:
+        """Drop every loaded vehicle; they are reloaded on next use."""
+        with self._lock:
+            self._writes += 1
+            self._vehicles.clear()
+            self._owners.clear()
+
+    def _forget(self, reservation_id: int) -> None:
+        vehicle_id = self._owners.pop(reservation_id, None)
+        if vehicle_id is not None and vehicle_id in self._vehicles:
+            self._vehicles[vehicle_id].discard(reservation_id)
+
+    def _intervals(self, vehicle_id: int) -> VehicleIntervals:
+        with self._lock:
+            intervals = self._vehicles.get(vehicle_id)
+            writes_before = self._writes
+        if intervals is not None and not self._expired(intervals):
+            return intervals
+
+        intervals = VehicleIntervals(
+            Reservation.objects.filter(
+                vehicle_id=vehicle_id,
+                status__in=Reservation.ACTIVE_STATUSES
+            ).values_list('start_date', 'end_date', 'id')
+        )
+
+        with self._lock:
+            # A write landed while loading; answer from the fresh rows but do
+            # not cache them, they may already miss that write
+            if self._writes != writes_before:
+                return intervals
+
+            stale = self._vehicles.get(vehicle_id)
+            if stale is not None:
+                for reservation_id in stale.reservation_ids():
+                    self._owners.pop(reservation_id, None)
+            self._vehicles[vehicle_id] = intervals
+            for reservation_id in intervals.reservation_ids():
+                self._owners[reservation_id] = vehicle_id
+        return intervals
+
+    def _expired(self, intervals: VehicleIntervals) -> bool:
+        return bool(self.ttl) and time.monotonic() - intervals.loaded_at > self.ttl
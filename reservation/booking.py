@@ -0,0 +1,186 @@
+"""
+Booking - Single-statement, race-free reservation writes
+
+Each write checks for an overlapping active reservation inside the same
+statement that inserts or updates the row, so there is no separate
+availability round trip and no window between check and write.
+
+- PostgreSQL enforces the rule with the `reservations_no_overlap` exclusion
+  constraint (migration 0003), so inserts carry no overlap condition and a
+  conflict surfaces as an IntegrityError.
+- Other backends (SQLite) add WHERE NOT EXISTS (overlap) to the insert. SQLite
+  serialises writers, so the conditional statement alone is race-free.
+
+Inserts are INSERT ... SELECT ... WHERE EXISTS (live vehicle) everywhere, so
+a booking is one statement.
+
+A write that loses a lock or serialization race ("database is locked" on
+SQLite, serialization failure or deadlock on PostgreSQL) raises BookingBusy;
+the request can simply be retried.
+
+Soft-deleted vehicles cannot be booked; a booking racing the delete is
+removed with the vehicle by purge_deleted.
+"""
+from contextlib import contextmanager
+from datetime import date
+from typing import Optional
+
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.models import Exists, OuterRef
+
+from reservation.models import Reservation
+from vehicle.models import Vehicle
+
+NO_OVERLAP_CONSTRAINT = "reservations_no_overlap"
+
+
+class VehicleUnavailable(Exception):
+    """Raised when the requested dates overlap an active reservation."""
+
+
+class BookingBusy(Exception):
+    """Raised when a booking write hit a lock or serialization failure; retry it."""
+
+
+@contextmanager
+def _retryable():
+    try:
+        yield
+    except OperationalError as e:
+        raise BookingBusy(str(e)) from e
+
+
+def conflicts(vehicle_id: int, start_date: date, end_date: date, exclude_id: Optional[int] = None):
+    """Queryset of active reservations overlapping [start_date, end_date]."""
+    queryset = Reservation.objects.filter(
+        vehicle_id=vehicle_id,
+        start_date__lte=end_date,
+        end_date__gte=start_date,
+        status__in=Reservation.ACTIVE_STATUSES
+    )
+    if exclude_id:
+        queryset = queryset.exclude(id=exclude_id)
+    return queryset
+
+
+def insert_if_available(
+    user_id: int,
+    vehicle_id: int,
+    start_date: date,
+    end_date: date,
+    status: str = "pending"
+) -> Reservation:
+    """
+    Insert a reservation unless it overlaps an active one; raise
+    VehicleUnavailable on conflict and BookingBusy on a lock failure.
+    """
+    with _retryable():
+        return _insert_if_available(user_id, vehicle_id, start_date, end_date, status)
+
+
+def _insert_if_available(
+    user_id: int,
+    vehicle_id: int,
+    start_date: date,
+    end_date: date,
+    status: str,
+) -> Reservation:
+    meta = Reservation._meta
+    quote = connection.ops.quote_name
+    table = quote(meta.db_table)
+    columns = {name: quote(meta.get_field(name).column) for name in (
+        "id", "user", "vehicle", "start_date", "end_date", "status"
+    )}
+    vehicles = quote(Vehicle._meta.db_table)
+    returning = connection.features.can_return_columns_from_insert
+    adapt = connection.ops.adapt_datefield_value
+    # The exclusion constraint checks overlaps on PostgreSQL
+    check_overlap = connection.vendor != "postgresql"
+
+    sql = (
+        f"INSERT INTO {table} ({columns['user']}, {columns['vehicle']}, "
+        f"{columns['start_date']}, {columns['end_date']}, {columns['status']}) "
+        f"SELECT %s, %s, %s, %s, %s "
+        f"WHERE EXISTS (SELECT 1 FROM {vehicles} WHERE {quote('id')} = %s AND NOT {quote('is_deleted')})"
+    )
+    params = [user_id, vehicle_id, adapt(start_date), adapt(end_date), status, vehicle_id]
+    if check_overlap:
+        active = ", ".join(["%s"] * len(Reservation.ACTIVE_STATUSES))
+        sql += (
+            f" AND NOT EXISTS (SELECT 1 FROM {table} WHERE {columns['vehicle']} = %s "
+            f"AND {columns['status']} IN ({active}) "
+            f"AND {columns['start_date']} <= %s AND {columns['end_date']} >= %s)"
+        )
+        params += [vehicle_id, *Reservation.ACTIVE_STATUSES, adapt(end_date), adapt(start_date)]
+    if returning:
+        sql += f" RETURNING {columns['id']}"
+
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                if returning:
+                    row = cursor.fetchone()
+                    reservation_id = row[0] if row else None
+                else:
+                    reservation_id = cursor.lastrowid if cursor.rowcount else None
+    except IntegrityError as e:
+        if NO_OVERLAP_CONSTRAINT in str(e):
+            raise VehicleUnavailable()
+        raise
+
+    if reservation_id is None:
+        raise VehicleUnavailable()
+
+    return Reservation.from_db(
+        connection.alias,
+        ["id", "user_id", "vehicle_id", "start_date", "end_date", "status"],
+        [reservation_id, user_id, vehicle_id, start_date, end_date, status],
+    )
+
+
+def update_if_available(reservation: Reservation) -> None:
+    """
+    Persist the reservation's vehicle, user and dates with one conditional UPDATE.
+    Raises VehicleUnavailable if the new range overlaps another active
+    reservation and BookingBusy on a lock failure.
+    """
+    overlapping = conflicts(
+        reservation.vehicle_id,
+        reservation.start_date,
+        reservation.end_date,
+        exclude_id=reservation.id
+    )
+    try:
+        with _retryable(), transaction.atomic():
+            updated = (
+                Reservation.objects.filter(id=reservation.id)
+                .filter(~Exists(overlapping))
+                .filter(Exists(Vehicle.objects.filter(id=reservation.vehicle_id)))
+                .update(
+                    vehicle_id=reservation.vehicle_id,
+                    user_id=reservation.user_id,
+                    start_date=reservation.start_date,
+                    end_date=reservation.end_date
+                )
+            )
+    except IntegrityError as e:
+        if NO_OVERLAP_CONSTRAINT in str(e):
+            raise VehicleUnavailable()
+        raise
+
+    if not updated:
+        raise VehicleUnavailable()
+
+
+def double_booking_count() -> int:
+    """Number of active reservations that overlap another active reservation of the same vehicle."""
+    overlapping = Reservation.objects.filter(
+        vehicle_id=OuterRef('vehicle_id'),
+        start_date__lte=OuterRef('end_date'),
+        end_date__gte=OuterRef('start_date'),
+        status__in=Reservation.ACTIVE_STATUSES
+    ).exclude(id=OuterRef('id'))
+    return Reservation.objects.filter(
+        status__in=Reservation.ACTIVE_STATUSES
+    ).filter(Exists(overlapping)).count()
@@ -0,0 +1,116 @@
+"""
+Reservation Loader - Batched import of reservation history from JSON
+
+Items are parsed one at a time from the file and handled in chunks: user
+and vehicle ids are checked against sets loaded once, duplicates of stored
+rows are found with one query per chunk, and new rows go in with
+bulk_create. Memory stays flat whatever the file size.
+
+bulk_create skips the booking path, so the no-overlap rule is checked here:
+a pending/confirmed row overlapping an active stored row (one more query
+per chunk) or an earlier active row of the file is skipped as a conflict.
+"""
+from collections import defaultdict
+from datetime import date
+from typing import Any, Dict, Iterable, List, Set, TextIO, Tuple
+
+from django.db import transaction
+
+from rentalbe.jsonstream import batched, iter_json_array
+from reservation.models import Reservation
+from user.models import User
+from vehicle.infrastructure.search_cache import vehicle_search_cache
+from vehicle.models import Vehicle
+
+LOAD_BATCH_SIZE = 1000
+STATUSES = {value for value, _ in Reservation.STATUS_CHOICES}
+
+# (user_id, vehicle_id, start_date, end_date) identifies a reservation for dedup
+Key = Tuple[int, int, date, date]
+
+
+def load_reservations(fp: TextIO, batch_size: int = LOAD_BATCH_SIZE) -> Dict[str, int]:
+    """Import the JSON array in fp; returns created/duplicate/conflict/missing/invalid counts."""
+    user_ids = set(User.objects.values_list("id", flat=True))
+    vehicle_ids = set(Vehicle.objects.values_list("id", flat=True))
+    counts = {"created": 0, "duplicates": 0, "conflicts": 0, "missing_user": 0, "missing_vehicle": 0, "invalid": 0}
+    touched_vehicles: Set[int] = set()
+
+    for chunk in batched(iter_json_array(fp), batch_size):
+        rows: Dict[Key, str] = {}
+        for item in chunk:
+            try:
+                key = (
+                    int(item["user"]),
+                    int(item["vehicle"]),
+                    date.fromisoformat(item["start_date"]),
+                    date.fromisoformat(item["end_date"]),
+                )
+                status = item.get("status", "pending")
+            except (KeyError, TypeError, ValueError):
+                counts["invalid"] += 1
+                continue
+            if status not in STATUSES or key[2] > key[3]:
+                counts["invalid"] += 1
+            elif key[0] not in user_ids:
+                counts["missing_user"] += 1
+            elif key[1] not in vehicle_ids:
+                counts["missing_vehicle"] += 1
+            elif key in rows:
+                counts["duplicates"] += 1
+            else:
+                rows[key] = status
+
+        existing = _existing_keys(rows)
+        counts["duplicates"] += len(existing)
+        for key in existing:
+            del rows[key]
+        booked = _active_intervals(key for key, status in rows.items() if status in Reservation.ACTIVE_STATUSES)
+        new = []
+        for (user_id, vehicle_id, start, end), status in rows.items():
+            if status in Reservation.ACTIVE_STATUSES:
+                intervals = booked[vehicle_id]
+                if any(start <= other_end and end >= other_start for other_start, other_end in intervals):
+                    counts["conflicts"] += 1
+                    continue
+                intervals.append((start, end))
+            new.append(
+                Reservation(user_id=user_id, vehicle_id=vehicle_id, start_date=start, end_date=end, status=status)
+            )
+        with transaction.atomic():
+            Reservation.objects.bulk_create(new, batch_size=batch_size)
+        counts["created"] += len(new)
+        touched_vehicles.update(reservation.vehicle_id for reservation in new)
+
+    vehicle_search_cache.invalidate_vehicles(touched_vehicles)
+    return counts
+
+
+def _existing_keys(keys: Iterable[Key]) -> Set[Key]:
+    """The keys already stored, with one query over the chunk's vehicles and date span."""
+    keys = set(keys)
+    if not keys:
+        return set()
+    stored = Reservation.objects.filter(
+        vehicle_id__in={key[1] for key in keys},
+        start_date__gte=min(key[2] for key in keys),
+        start_date__lte=max(key[2] for key in keys),
+    ).values_list("user_id", "vehicle_id", "start_date", "end_date")
+    return keys.intersection(stored)
+
+
+def _active_intervals(keys: Iterable[Key]) -> Dict[int, List[Tuple[date, date]]]:
+    """Vehicle id -> (start, end) of its stored active reservations in the keys' date span, one query."""
+    keys = list(keys)
+    intervals: Dict[int, List[Tuple[date, date]]] = defaultdict(list)
+    if not keys:
+        return intervals
+    stored = Reservation.objects.filter(
+        vehicle_id__in={key[1] for key in keys},
+        start_date__lte=max(key[3] for key in keys),
+        end_date__gte=min(key[2] for key in keys),
+        status__in=Reservation.ACTIVE_STATUSES,
+    ).values_list("vehicle_id", "start_date", "end_date")
+    for vehicle_id, start, end in stored:
+        intervals[vehicle_id].append((start, end))
+    return intervals
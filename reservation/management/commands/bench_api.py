@@ -0,0 +1,124 @@
+import io
+import json
+import platform
+import random
+from datetime import date
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from rentalbe.apibench import SCENARIOS, BenchData, run_scenarios
+from rentalbe.benchmarking import api_client, regressions, throwaway_database
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the hot API endpoints on generated datasets of several sizes and compare "
+        "p50/p95/p99 latency and query counts against a stored JSON baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scales", type=int, nargs="+", default=[10_000, 100_000],
+            help="Reservation counts to benchmark",
+        )
+        parser.add_argument("--per-vehicle", type=int, default=20, help="Reservations per vehicle")
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--requests", type=int, default=200, help="Timed requests per scenario")
+        parser.add_argument("--warmup", type=int, default=3, help="Untimed requests per scenario")
+        parser.add_argument(
+            "--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS),
+            help="Scenarios to run (default: all)",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--baseline", type=Path, default=Path(settings.BASE_DIR) / "benchmarks" / "api_baseline.json",
+            help="Baseline JSON file; written on the first run",
+        )
+        parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with this run")
+        parser.add_argument(
+            "--threshold", type=float, default=0.25,
+            help="Allowed latency increase over the baseline (0.25 = 25%%)",
+        )
+        parser.add_argument(
+            "--min-delta-ms", type=float, default=1.0,
+            help="Ignore latency increases smaller than this",
+        )
+
+    def handle(self, *args, **options):
+        if options["per_vehicle"] < 1 or options["users"] < 1 or options["requests"] < 1:
+            raise CommandError("--per-vehicle, --users and --requests must be at least 1")
+
+        client = api_client()
+        # Anchored on today: new reservations must not start in the past.
+        # The data is the same relative to the anchor on every run.
+        anchor = date.today()
+        results = {}
+        with throwaway_database():
+            for scale in options["scales"]:
+                call_command(
+                    "generate_dataset", users=options["users"],
+                    vehicles=max(1, scale // options["per_vehicle"]), reservations=scale,
+                    seed=options["seed"], anchor=anchor, flush=True, stdout=io.StringIO(),
+                )
+                # Same requests at every scale and on every run
+                rng = random.Random(options["seed"])
+                data = BenchData.load(anchor)
+                try:
+                    results[str(scale)] = run_scenarios(
+                        client, rng, data, options["requests"], options["warmup"], options["scenarios"]
+                    )
+                except AssertionError as e:
+                    raise CommandError(f"{scale} reservations: {e}")
+                self._report(scale, len(data.vehicle_ids), results[str(scale)])
+
+        run = {
+            "settings": {
+                name: options[name]
+                for name in ("per_vehicle", "users", "requests", "warmup", "seed")
+            },
+            "environment": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": settings.DATABASES["default"]["ENGINE"].rsplit(".", 1)[-1],
+            },
+            "results": results,
+        }
+        baseline_path = options["baseline"]
+        if options["update_baseline"] or not baseline_path.exists():
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(run, indent=2) + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {baseline_path}"))
+            return
+
+        baseline = json.loads(baseline_path.read_text())
+        for section in ("settings", "environment"):
+            if baseline.get(section) != run[section]:
+                self.stdout.write(self.style.WARNING(
+                    f"Baseline {section} differ ({baseline.get(section)} vs {run[section]}); "
+                    "numbers may not be comparable"
+                ))
+        found = [
+            f"{scale} reservations: {problem}"
+            for scale, scenarios in results.items()
+            for problem in regressions(
+                scenarios, baseline["results"].get(scale, {}), options["threshold"], options["min_delta_ms"]
+            )
+        ]
+        if found:
+            raise CommandError("Performance regressions against the baseline:\n  " + "\n  ".join(found))
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {baseline_path}"))
+
+    def _report(self, scale, vehicles, scenarios):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{scale:,} reservations, {vehicles:,} vehicles"))
+        self.stdout.write(
+            f"  {'scenario':<20} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}"
+        )
+        for name, stats in scenarios.items():
+            self.stdout.write(
+                f"  {name:<20} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} "
+                f"{stats['queries_max']:>8}"
+            )
@@ -0,0 +1,61 @@
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from rentalbe.benchmarking import SEED_START, seed_fleet, summarize, throwaway_database, time_calls
+from reservation.availability_index import AvailabilityIndex
+from reservation.schemas import IsVehicleAvailableRequest
+from reservation.services import ReservationService
+
+
+class Command(BaseCommand):
+    help = "Compare database and in-memory index availability checks on a throwaway database"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+            help="Reservation counts to benchmark",
+        )
+        parser.add_argument("--per-vehicle", type=int, default=100, help="Reservations per vehicle")
+        parser.add_argument("--queries", type=int, default=2000, help="Availability checks per path")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+
+        with throwaway_database():
+            for size in options["sizes"]:
+                vehicle_ids = seed_fleet(rng, max(1, size // options["per_vehicle"]), size)
+                self._run(rng, size, vehicle_ids, options["queries"])
+
+    def _run(self, rng, size, vehicle_ids, query_count):
+        # Seeded reservations cover one week slot per reservation per vehicle
+        horizon_days = max(7, size // len(vehicle_ids) * 7)
+        payloads = []
+        for _ in range(query_count):
+            start = SEED_START + timedelta(days=rng.randint(0, horizon_days))
+            payloads.append(
+                IsVehicleAvailableRequest(
+                    vehicle_id=rng.choice(vehicle_ids),
+                    start_date=start,
+                    end_date=start + timedelta(days=rng.randint(1, 5)),
+                )
+            )
+
+        database = time_calls(ReservationService.is_vehicle_available, [(p,) for p in payloads])
+
+        index = AvailabilityIndex()
+        calls = [(p.vehicle_id, p.start_date, p.end_date) for p in payloads]
+        cold = time_calls(index.is_available, calls)
+        warm = time_calls(index.is_available, calls)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{size:,} reservations, {len(vehicle_ids):,} vehicles"))
+        for label, samples in (("database", database), ("index (cold)", cold), ("index (warm)", warm)):
+            stats = summarize(samples)
+            self.stdout.write(
+                f"  {label:<14} mean {stats['mean_ms']:.3f} ms  "
+                f"p50 {stats['p50_ms']:.3f} ms  p99 {stats['p99_ms']:.3f} ms"
+            )
+        speedup = summarize(database)["mean_ms"] / max(summarize(warm)["mean_ms"], 1e-9)
+        self.stdout.write(self.style.SUCCESS(f"  warm index is {speedup:.0f}x faster than the database"))
@@ -0,0 +1,143 @@
+import time
+from contextlib import ExitStack
+from datetime import date
+from pathlib import Path
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connection, transaction
+
+from rentalbe.datagen import (
+    DATASET_ANCHOR, GENERATED_PASSWORD, RESERVATION_FIELDS, USER_FIELDS, VEHICLE_FIELDS,
+    insert_rows, locations, reservation_rows, user_rows, vehicle_rows,
+)
+from rentalbe.jsonstream import JsonArrayWriter, batched
+from reservation.models import Reservation
+from reservation.services import availability_index
+from user.models import User
+from vehicle.models import Vehicle
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic dataset (users, vehicles, reservations) into the "
+        "database and/or JSON files readable by the load_* commands"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1_000)
+        parser.add_argument("--vehicles", type=int, default=1_000)
+        parser.add_argument("--locations", type=int, default=10)
+        parser.add_argument("--reservations", type=int, default=100_000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--anchor", type=date.fromisoformat, default=DATASET_ANCHOR,
+            help="'Today' of the dataset: history before it, bookings after it (YYYY-MM-DD)",
+        )
+        parser.add_argument("--batch-size", type=int, default=50_000, help="Rows per insert statement")
+        parser.add_argument(
+            "--json-dir", type=Path, default=None,
+            help="Also write users.json, vehicles.json and reservations.json here",
+        )
+        parser.add_argument(
+            "--no-db", action="store_true",
+            help="Only write JSON; reservations then reference ids 1..N as in a freshly loaded database",
+        )
+        parser.add_argument(
+            "--flush", action="store_true",
+            help="Delete ALL existing reservations, vehicles and users first",
+        )
+
+    def handle(self, *args, **options):
+        if min(options["users"], options["vehicles"], options["reservations"]) < 0:
+            raise CommandError("Counts must not be negative")
+        if options["locations"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--locations and --batch-size must be at least 1")
+        if options["reservations"] and not (options["users"] and options["vehicles"]):
+            raise CommandError("Reservations need at least one user and one vehicle")
+        if options["no_db"] and options["json_dir"] is None:
+            raise CommandError("--no-db needs --json-dir")
+
+        self.write_db = not options["no_db"]
+        self.batch_size = options["batch_size"]
+        self.verbosity = options["verbosity"]
+        json_dir = options["json_dir"]
+        if json_dir is not None:
+            json_dir.mkdir(parents=True, exist_ok=True)
+        seed = options["seed"]
+        started = time.perf_counter()
+
+        if self.write_db and options["flush"]:
+            Reservation.objects.all().delete()
+            Vehicle.all_objects.all().delete()
+            User.all_objects.all().delete()
+
+        try:
+            with ExitStack() as files:
+                def writer(name):
+                    if json_dir is None:
+                        return None
+                    return files.enter_context(JsonArrayWriter(files.enter_context(open(json_dir / name, "w"))))
+
+                user_ids = self._write(
+                    User, USER_FIELDS, user_rows(options["users"], seed), writer("users.json"),
+                    lambda row: {"username": row[0], "password": GENERATED_PASSWORD},
+                )
+                vehicle_ids = self._write(
+                    Vehicle, VEHICLE_FIELDS,
+                    vehicle_rows(options["vehicles"], locations(options["locations"]), seed),
+                    writer("vehicles.json"),
+                    lambda row: dict(zip(VEHICLE_FIELDS[:-1], row)),
+                )
+                self._write(
+                    Reservation, RESERVATION_FIELDS,
+                    reservation_rows(options["reservations"], user_ids, vehicle_ids, seed, options["anchor"]),
+                    writer("reservations.json"),
+                    lambda row: {
+                        "user": row[0], "vehicle": row[1], "start_date": row[2], "end_date": row[3], "status": row[4],
+                    },
+                    ids=False,
+                )
+        except IntegrityError as exc:
+            raise CommandError(f"{exc} (generated usernames and plates already exist; rerun with --flush)")
+
+        if self.write_db:
+            # Fresh statistics for the planner; cached searches and availability are stale
+            with connection.cursor() as cursor:
+                for model in (User, Vehicle, Reservation):
+                    cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+            for cache in caches.all():
+                cache.clear()
+            availability_index.clear()
+
+        elapsed = time.perf_counter() - started
+        rows = options["users"] + options["vehicles"] + options["reservations"]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {options['users']} users, {options['vehicles']} vehicles and "
+                f"{options['reservations']} reservations (seed {seed}) in {elapsed:.1f}s "
+                f"({rows / elapsed:,.0f} rows/s)"
+            )
+        )
+
+    def _write(self, model, fields, rows, json_writer, to_json, ids=True):
+        """Insert and/or dump the rows in batches; returns the new rows' ids in order when `ids`."""
+        manager = getattr(model, "all_objects", model.objects)
+        last_id = (manager.order_by("-id").values_list("id", flat=True).first() or 0) if self.write_db else 0
+
+        count = 0
+        for batch in batched(rows, self.batch_size):
+            if self.write_db:
+                with transaction.atomic():
+                    insert_rows(model, fields, batch)
+            if json_writer is not None:
+                json_writer.write_many(map(to_json, batch))
+            count += len(batch)
+            if self.verbosity > 1:
+                self.stdout.write(f"{model._meta.db_table}: {count:,} rows")
+
+        if not ids:
+            return None
+        if not self.write_db:
+            return list(range(1, count + 1))
+        return list(manager.filter(id__gt=last_id).order_by("id").values_list("id", flat=True))
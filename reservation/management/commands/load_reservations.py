@@ -1,72 +1,37 @@
-import json
 from pathlib import Path
 
 from django.conf import settings
 from django.core.management.base import BaseCommand
 
-from user.models import User
-from reservation.models import Reservation
-from vehicle.models import Vehicle
+from reservation.loader import LOAD_BATCH_SIZE, load_reservations
 
 
 class Command(BaseCommand):
     help = "Load reservations from JSON file"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file", type=Path, default=Path(settings.BASE_DIR) / "data" / "reservations.json",
+            help="JSON array of reservations",
+        )
+        parser.add_argument("--batch-size", type=int, default=LOAD_BATCH_SIZE, help="Rows per chunk")
+
     def handle(self, *args, **options):
-        data_file = Path(settings.BASE_DIR) / "data" / "reservations.json"
+        data_file = options["file"]
 
         if not data_file.exists():
-            self.stderr.write(self.style.ERROR("reservations.json not found"))
+            self.stderr.write(self.style.ERROR(f"{data_file.name} not found"))
             return
 
         with open(data_file, "r") as f:
-            reservations = json.load(f)
-
-        created_count = 0
-        skipped_count = 0
-
-        for item in reservations:
-            try:
-                user = User.objects.get(id=item["user"])
-                vehicle = Vehicle.objects.get(id=item["vehicle"])
-
-                if Reservation.objects.filter(
-                    user=user,
-                    vehicle=vehicle,
-                    start_date=item["start_date"],
-                    end_date=item["end_date"]
-                ).exists():
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f"Reservation for user {user.username} and vehicle {vehicle.name} "
-                            f"on {item['start_date']} already exists, skipped"
-                        )
-                    )
-                    skipped_count += 1
-                    continue
-
-                reservation = Reservation.objects.create(
-                    user=user,
-                    vehicle=vehicle,
-                    start_date=item["start_date"],
-                    end_date=item["end_date"],
-                    status=item["status"],
-                )
-                created_count += 1
-
-            except User.DoesNotExist:
-                self.stderr.write(
-                    self.style.ERROR(f"User with id {item['user']} not found")
-                )
-                skipped_count += 1
-            except Vehicle.DoesNotExist:
-                self.stderr.write(
-                    self.style.ERROR(f"Vehicle with id {item['vehicle']} not found")
-                )
-                skipped_count += 1
+            counts = load_reservations(f, options["batch_size"])
 
+        skipped_count = sum(count for name, count in counts.items() if name != "created")
         self.stdout.write(
             self.style.SUCCESS(
-                f"Successfully created {created_count} reservations (skipped: {skipped_count})"
+                f"Successfully created {counts['created']} reservations (skipped: {skipped_count} - "
+                f"{counts['duplicates']} already exist, {counts['conflicts']} overlap an active booking, "
+                f"{counts['missing_user']} unknown users, "
+                f"{counts['missing_vehicle']} unknown vehicles, {counts['invalid']} invalid)"
             )
         )
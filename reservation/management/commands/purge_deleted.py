@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from reservation.purge import purge_deleted
+
+
+class Command(BaseCommand):
+    help = "Remove soft-deleted vehicles and users, and their reservations, in small batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows per transaction")
+        parser.add_argument("--pause", type=float, default=0.1, help="Seconds to sleep between batches")
+
+    def handle(self, *args, **options):
+        counts = purge_deleted(options["batch_size"], options["pause"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Purged {counts['vehicles']} vehicles, {counts['users']} users "
+                f"and {counts['reservations']} reservations"
+            )
+        )
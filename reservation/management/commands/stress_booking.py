@@ -0,0 +1,93 @@
+import random
+import threading
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from rentalbe.benchmarking import throwaway_database
+from reservation.booking import BookingBusy, double_booking_count
+from reservation.schemas import AddReservationRequest
+from reservation.services import ReservationService
+from user.models import User
+from vehicle.models import Vehicle
+
+
+class Command(BaseCommand):
+    help = "Book the same vehicles from many threads at once and check for double bookings"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--attempts", type=int, default=200, help="Booking attempts per thread")
+        parser.add_argument("--vehicles", type=int, default=5)
+        parser.add_argument("--horizon", type=int, default=60, help="Days of calendar to compete for")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            user = User.objects.create(username="stress", password="!")
+            vehicle_ids = [
+                Vehicle.objects.create(
+                    name=f"Stress {i}", brand="Stress", model="S", year=2024,
+                    plate_number=f"STRESS {i}", color="Grey", daily_rate=300000,
+                    is_available=True, location="Jakarta",
+                ).id
+                for i in range(options["vehicles"])
+            ]
+            counts, elapsed = self._run(user.id, vehicle_ids, options)
+            doubles = double_booking_count()
+
+        self.stdout.write(
+            f"{options['threads']} threads x {options['attempts']} attempts on "
+            f"{len(vehicle_ids)} vehicles in {elapsed:.2f}s"
+        )
+        self.stdout.write(
+            f"  booked {counts['booked']}  rejected {counts['rejected']}  "
+            f"lock errors {counts['errors']}"
+        )
+        self.stdout.write(f"  {counts['booked'] / elapsed:.0f} bookings/s, "
+                          f"{sum(counts.values()) / elapsed:.0f} attempts/s")
+        style = self.style.SUCCESS if doubles == 0 else self.style.ERROR
+        self.stdout.write(style(f"  double bookings: {doubles}"))
+
+    def _run(self, user_id, vehicle_ids, options):
+        counts = {"booked": 0, "rejected": 0, "errors": 0}
+        lock = threading.Lock()
+        barrier = threading.Barrier(options["threads"])
+        first_day = date.today() + timedelta(days=1)
+
+        def worker(number):
+            rng = random.Random(options["seed"] + number)
+            local = {"booked": 0, "rejected": 0, "errors": 0}
+            barrier.wait()
+            try:
+                for _ in range(options["attempts"]):
+                    start = first_day + timedelta(days=rng.randint(0, options["horizon"]))
+                    payload = AddReservationRequest(
+                        user_id=user_id,
+                        vehicle_id=rng.choice(vehicle_ids),
+                        start_date=start,
+                        end_date=start + timedelta(days=rng.randint(1, 4)),
+                    )
+                    try:
+                        ReservationService.create(payload)
+                        local["booked"] += 1
+                    except ValueError:
+                        local["rejected"] += 1
+                    except BookingBusy:
+                        local["errors"] += 1
+            finally:
+                connection.close()
+                with lock:
+                    for key, value in local.items():
+                        counts[key] += value
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(options["threads"])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return counts, elapsed
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservation', '0001_initial'),
+        ('vehicle', '0002_alter_vehicle_table'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['vehicle', 'start_date', 'end_date'], name='reservation_vehicle_a2ca8f_idx'),
+        ),
+    ]
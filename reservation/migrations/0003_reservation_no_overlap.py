@@ -0,0 +1,39 @@
+# Generated by Django 6.0.1 on 2026-10-17 10:05
+
+from django.db import migrations
+
+# PostgreSQL only: reject overlapping pending/confirmed reservations of the
+# same vehicle at the database level. Other backends rely on the conditional
+# statements in reservation.booking.
+CREATE_CONSTRAINT = """
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+ALTER TABLE reservations ADD CONSTRAINT reservations_no_overlap
+    EXCLUDE USING gist (
+        vehicle_id WITH =,
+        daterange(start_date, end_date, '[]') WITH &&
+    )
+    WHERE (status IN ('pending', 'confirmed'));
+"""
+
+DROP_CONSTRAINT = "ALTER TABLE reservations DROP CONSTRAINT IF EXISTS reservations_no_overlap;"
+
+
+def add_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_CONSTRAINT)
+
+
+def drop_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_CONSTRAINT)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservation', '0002_reservation_vehicle_range_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_constraint, drop_constraint),
+    ]
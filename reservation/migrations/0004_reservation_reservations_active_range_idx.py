@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-17 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservation', '0003_reservation_no_overlap'),
+        ('user', '0001_initial'),
+        ('vehicle', '0003_vehicle_vehicles_location_lower_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'confirmed'])), fields=['vehicle', 'start_date', 'end_date'], name='reservations_active_range_idx'),
+        ),
+    ]
@@ -4,6 +4,12 @@ from user.models import User
 from vehicle.models import Vehicle
 
 
+class ReservationQuerySet(models.QuerySet):
+    def visible(self) -> "ReservationQuerySet":
+        """Reservations whose vehicle and user are not soft-deleted."""
+        return self.filter(vehicle__is_deleted=False, user__is_deleted=False)
+
+
 class Reservation(models.Model):
     STATUS_CHOICES = [
         ("pending", "Pending"),
@@ -11,6 +17,8 @@ class Reservation(models.Model):
         ("cancelled", "Cancelled"),
         ("completed", "Completed"),
     ]
+    # Statuses that block the vehicle for their date range
+    ACTIVE_STATUSES = ("pending", "confirmed")
 
     # id otomatis dibuat Django sebagai AutoField (integer)
     user = models.ForeignKey(
@@ -31,11 +39,20 @@ class Reservation(models.Model):
         default="pending"
     )
 
+    objects = ReservationQuerySet.as_manager()
+
     class Meta:
         db_table = "reservations"
 
         indexes = [
             models.Index(fields=['vehicle', 'start_date', 'end_date']),
+            # Overlap lookups only consider active rows; keeps the index small
+            # as completed/cancelled history grows
+            models.Index(
+                fields=['vehicle', 'start_date', 'end_date'],
+                condition=models.Q(status__in=["pending", "confirmed"]),
+                name='reservations_active_range_idx',
+            ),
         ]
 
     def __str__(self):
@@ -0,0 +1,29 @@
+"""
+Occupancy Bitmaps - Compact per-day booking calendars
+Bit i (least significant bit first, bytes in order) is set when day
+start_date + i is covered by an active reservation.
+"""
+from datetime import date, timedelta
+from typing import Iterable, List, Tuple
+
+
+def occupancy_bitmap(ranges: Iterable[Tuple[date, date]], start_date: date, days: int) -> bytes:
+    """Build the bitmap of days in [start_date, start_date + days) covered by the ranges."""
+    mask = 0
+    for range_start, range_end in ranges:
+        # Reservation end dates are inclusive, like the availability check
+        low = max((range_start - start_date).days, 0)
+        high = min((range_end - start_date).days, days - 1)
+        if low <= high:
+            mask |= ((1 << (high - low + 1)) - 1) << low
+    return mask.to_bytes((days + 7) // 8, "little")
+
+
+def booked_days(bitmap: bytes, start_date: date) -> List[date]:
+    """Decode a bitmap back into the list of booked dates."""
+    mask = int.from_bytes(bitmap, "little")
+    return [
+        start_date + timedelta(days=offset)
+        for offset in range(len(bitmap) * 8)
+        if mask >> offset & 1
+    ]
@@ -0,0 +1,57 @@
+"""
+Purge - Remove soft-deleted vehicles and users with their reservations
+
+Work is split into short transactions of at most `batch_size` rows with a
+pause in between, so a purge never holds long locks or saturates the
+database while the API is serving traffic.
+"""
+import time
+from typing import Callable, Dict
+
+from django.db import transaction
+
+from reservation.models import Reservation
+from user.models import User
+from vehicle.models import Vehicle
+
+# Tombstoned model -> reservation foreign key
+PURGED_MODELS = ((Vehicle, "vehicle"), (User, "user"))
+
+
+def purge_deleted(
+    batch_size: int = 500,
+    pause: float = 0.1,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Dict[str, int]:
+    """Delete every tombstoned row and its reservations; returns counts per table."""
+    counts = {"vehicles": 0, "users": 0, "reservations": 0}
+    for model, field in PURGED_MODELS:
+        while True:
+            ids = list(
+                model.all_objects.tombstoned()
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+
+            # Reservations first, so deleting the parents cascades to nothing
+            while True:
+                batch = list(
+                    Reservation.objects.filter(**{f"{field}_id__in": ids})
+                    .values_list("id", flat=True)[:batch_size]
+                )
+                if not batch:
+                    break
+                with transaction.atomic():
+                    deleted, _ = Reservation.objects.filter(id__in=batch).delete()
+                counts["reservations"] += deleted
+                sleep(pause)
+
+            with transaction.atomic():
+                # Bookings that raced the sweep still cascade here
+                _, per_model = model.all_objects.filter(id__in=ids, is_deleted=True).delete()
+            counts[model._meta.db_table] += per_model.get(model._meta.label, 0)
+            counts["reservations"] += per_model.get(Reservation._meta.label, 0)
+            sleep(pause)
+    return counts
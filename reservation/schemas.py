@@ -3,7 +3,7 @@ Reservation Schemas - Request/Response Contracts
 """
 from ninja import Schema
 from datetime import date
-from typing import Optional
+from typing import List, Optional
 
 
 # ========== REQUEST ==========
@@ -36,6 +36,10 @@ class IsVehicleAvailableRequest(Schema):
     exclude_id: Optional[int] = None
 
 
+class BatchAvailabilityRequest(Schema):
+    items: List[IsVehicleAvailableRequest]
+
+
 # ========== RESPONSE ==========
 
 class ReservationResponse(Schema):
@@ -47,6 +51,33 @@ class ReservationResponse(Schema):
     status: str
 
 
+class ReservationPageResponse(Schema):
+    items: List[ReservationResponse]
+    next: Optional[str] = None
+
+
+class AvailabilityResult(Schema):
+    vehicle_id: int
+    start_date: date
+    end_date: date
+    available: bool
+
+
+class BatchAvailabilityResponse(Schema):
+    results: List[AvailabilityResult]
+
+
+class VehicleCalendar(Schema):
+    vehicle_id: int
+    booked: str  # base64 occupancy bitmap, see reservation.occupancy
+
+
+class CalendarResponse(Schema):
+    start_date: date
+    days: int
+    vehicles: List[VehicleCalendar]
+
+
 class MessageResponse(Schema):
     message: str
 
@@ -1,45 +1,136 @@
 """
 Reservation Service - Business Logic Layer
 """
-from typing import List, Optional
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from uuid import UUID
-from datetime import date
+from datetime import date, timedelta
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from rentalbe.pagination import clamp_limit, decode_cursor, encode_cursor
+from reservation.availability_index import AvailabilityIndex, VehicleIntervals
+from reservation.booking import VehicleUnavailable, conflicts, insert_if_available, update_if_available
 from reservation.models import Reservation
+from reservation.occupancy import occupancy_bitmap
 from reservation.schemas import (
     AddReservationRequest,
     UpdateReservationRequest,
     SearchReservationRequest,
     IsVehicleAvailableRequest
 )
+from vehicle.infrastructure.search_cache import vehicle_search_cache
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+STREAM_CHUNK_SIZE = 2000
+MAX_AVAILABILITY_BATCH = 500
+MAX_CALENDAR_DAYS = 366
+MAX_CALENDAR_VEHICLES = 200
+
+availability_index = AvailabilityIndex(ttl=settings.RESERVATION_AVAILABILITY_INDEX_TTL)
 
 
 class ReservationService:
     """Handles all reservation business operations."""
     
     @staticmethod
-    def get_all() -> List[ReservationResponse]:
+    def get_all() -> List[Reservation]:
         """Get all reservations."""
         try:
-            return list(Reservation.objects.all())
+            return list(Reservation.objects.visible())
         except Exception as e:
             print(e.__str__())
             return []
     
+    @staticmethod
+    def get_page(
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Tuple[List[Reservation], Optional[str]]:
+        """
+        Get one page of reservations ordered by id.
+        Returns the page and the cursor of the next page (None on the last page).
+        """
+        queryset, limit = ReservationService._page_queryset(cursor, limit)
+        return ReservationService._split_page(list(queryset), limit)
+    
+    @staticmethod
+    async def aget_page(
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> Tuple[List[Reservation], Optional[str]]:
+        """Async get_page."""
+        queryset, limit = ReservationService._page_queryset(cursor, limit)
+        return ReservationService._split_page([r async for r in queryset], limit)
+    
+    @staticmethod
+    def _page_queryset(cursor: Optional[str], limit: int):
+        """Queryset of the page after cursor, with one extra row to detect a next page."""
+        limit = clamp_limit(limit, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        queryset = Reservation.objects.visible().order_by('id')
+        
+        if cursor:
+            last_id = decode_cursor(cursor)[0]
+            if not isinstance(last_id, int):
+                raise ValueError("Invalid cursor")
+            queryset = queryset.filter(id__gt=last_id)
+        
+        return queryset[:limit + 1], limit
+    
+    @staticmethod
+    def _split_page(
+        reservations: List[Reservation],
+        limit: int
+    ) -> Tuple[List[Reservation], Optional[str]]:
+        """Trim the extra row and build the next cursor."""
+        if len(reservations) <= limit:
+            return reservations, None
+        
+        reservations = reservations[:limit]
+        return reservations, encode_cursor(reservations[-1].id)
+    
+    @staticmethod
+    def iter_all(chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+        """Iterate over every reservation in id order, fetching chunk_size rows at a time."""
+        return (
+            Reservation.objects.visible().order_by('id')
+            .values('id', 'vehicle_id', 'user_id', 'start_date', 'end_date', 'status')
+            .iterator(chunk_size=chunk_size)
+        )
+    
     @staticmethod
     def get_by_id(reservation_id: int) -> Optional[Reservation]:
         """Get reservation by ID."""
         try:
-            return Reservation.objects.get(id=reservation_id)
+            return Reservation.objects.visible().get(id=reservation_id)
         except:
             return None
     
+    @staticmethod
+    async def aget_by_id(reservation_id: int) -> Optional[Reservation]:
+        """Async get_by_id."""
+        return await Reservation.objects.visible().filter(id=reservation_id).afirst()
+    
     @staticmethod
     def search(
        payload: SearchReservationRequest
     ) -> List[Reservation]:
         """Search reservations with optional filters."""
-        queryset = Reservation.objects.all()
+        return list(ReservationService._search_queryset(payload))
+    
+    @staticmethod
+    async def asearch(
+       payload: SearchReservationRequest
+    ) -> List[Reservation]:
+        """Async search."""
+        return [r async for r in ReservationService._search_queryset(payload)]
+    
+    @staticmethod
+    def _search_queryset(payload: SearchReservationRequest):
+        """Queryset of reservations matching the search filters."""
+        queryset = Reservation.objects.visible()
         
         if payload.user_id:
             queryset = queryset.filter(user_id=payload.user_id)
@@ -50,27 +141,125 @@ class ReservationService:
         if payload.end_date:
             queryset = queryset.filter(end_date__lte=payload.end_date)
         
-        return list(queryset)
+        return queryset
     
     @staticmethod
     def is_vehicle_available(payload: IsVehicleAvailableRequest) -> bool:
         """Check if vehicle is available for the given dates."""
-        queryset = Reservation.objects.filter(
-            vehicle_id=payload.vehicle_id,
-            start_date__lte=payload.end_date,
-            end_date__gte=payload.start_date,
-            status__in=['pending', 'confirmed']
+        return not conflicts(
+            payload.vehicle_id,
+            payload.start_date,
+            payload.end_date,
+            exclude_id=payload.exclude_id
+        ).exists()
+    
+    @staticmethod
+    def check_availability(payload: IsVehicleAvailableRequest) -> bool:
+        """
+        Check availability for read-only callers.
+        Answers from the in-process index when RESERVATION_AVAILABILITY_INDEX
+        is enabled, otherwise falls back to the database query.
+        """
+        if not settings.RESERVATION_AVAILABILITY_INDEX:
+            return ReservationService.is_vehicle_available(payload)
+        
+        return availability_index.is_available(
+            payload.vehicle_id,
+            payload.start_date,
+            payload.end_date,
+            exclude_id=payload.exclude_id
         )
+    
+    @staticmethod
+    async def acheck_availability(payload: IsVehicleAvailableRequest) -> bool:
+        """Async check_availability."""
+        if settings.RESERVATION_AVAILABILITY_INDEX:
+            # The index is lock-protected and loads from the database on a miss
+            return await sync_to_async(availability_index.is_available)(
+                payload.vehicle_id,
+                payload.start_date,
+                payload.end_date,
+                exclude_id=payload.exclude_id
+            )
+        
+        return not await conflicts(
+            payload.vehicle_id,
+            payload.start_date,
+            payload.end_date,
+            exclude_id=payload.exclude_id
+        ).aexists()
+    
+    @staticmethod
+    def check_availability_batch(payloads: List[IsVehicleAvailableRequest]) -> List[bool]:
+        """
+        Check many vehicle/date-range pairs with a single query.
+        Results are returned in the same order as the payloads; an item whose
+        start date is not before its end date rejects the whole batch.
+        """
+        if len(payloads) > MAX_AVAILABILITY_BATCH:
+            raise ValueError(f"At most {MAX_AVAILABILITY_BATCH} items per batch")
+        if not payloads:
+            return []
+        for index, p in enumerate(payloads):
+            if p.start_date >= p.end_date:
+                raise ValueError(f"Item {index}: start date must be before end date")
         
-        if payload.exclude_id:
-            queryset = queryset.exclude(id=payload.exclude_id)
+        # One range query covering every requested window, grouped by vehicle
+        rows = Reservation.objects.filter(
+            vehicle_id__in={p.vehicle_id for p in payloads},
+            start_date__lte=max(p.end_date for p in payloads),
+            end_date__gte=min(p.start_date for p in payloads),
+            status__in=Reservation.ACTIVE_STATUSES
+        ).values_list('vehicle_id', 'start_date', 'end_date', 'id')
         
-        return not queryset.exists()
+        grouped = defaultdict(list)
+        for vehicle_id, start_date, end_date, reservation_id in rows:
+            grouped[vehicle_id].append((start_date, end_date, reservation_id))
+        intervals = {vehicle_id: VehicleIntervals(entries) for vehicle_id, entries in grouped.items()}
+        
+        empty = VehicleIntervals()
+        return [
+            not intervals.get(p.vehicle_id, empty).overlaps(p.start_date, p.end_date, p.exclude_id)
+            for p in payloads
+        ]
+    
+    @staticmethod
+    def availability_calendar(
+        vehicle_ids: List[int],
+        start_date: date,
+        days: int
+    ) -> Dict[int, bytes]:
+        """
+        Build a booked-days bitmap per vehicle for [start_date, start_date + days).
+        Uses one range query over the (vehicle, start_date, end_date) index.
+        """
+        if not 1 <= days <= MAX_CALENDAR_DAYS:
+            raise ValueError(f"Days must be between 1 and {MAX_CALENDAR_DAYS}")
+        vehicle_ids = list(dict.fromkeys(vehicle_ids))
+        if not vehicle_ids:
+            raise ValueError("At least one vehicle_id is required")
+        if len(vehicle_ids) > MAX_CALENDAR_VEHICLES:
+            raise ValueError(f"At most {MAX_CALENDAR_VEHICLES} vehicles per calendar")
+        
+        rows = Reservation.objects.filter(
+            vehicle_id__in=vehicle_ids,
+            start_date__lte=start_date + timedelta(days=days - 1),
+            end_date__gte=start_date,
+            status__in=Reservation.ACTIVE_STATUSES
+        ).values_list('vehicle_id', 'start_date', 'end_date')
+        
+        ranges = defaultdict(list)
+        for vehicle_id, range_start, range_end in rows:
+            ranges[vehicle_id].append((range_start, range_end))
+        
+        return {
+            vehicle_id: occupancy_bitmap(ranges[vehicle_id], start_date, days)
+            for vehicle_id in vehicle_ids
+        }
     
     @staticmethod
     def create(payload: AddReservationRequest) -> Reservation:
-        """Create a new reservation."""
-        print("Creating reservation...")
+        """Create a new reservation (BookingBusy from reservation.booking propagates)."""
         # Validate dates
         if payload.start_date >= payload.end_date:
             raise ValueError("Start date must be before end date")
@@ -78,29 +267,18 @@ class ReservationService:
         if payload.start_date < date.today():
             raise ValueError("Start date cannot be in the past")
         
+        # Availability is checked by the insert itself (see reservation.booking)
         try:
-            # Check availability
-            availability_check = IsVehicleAvailableRequest(
+            reservation = insert_if_available(
+                user_id=payload.user_id,
                 vehicle_id=payload.vehicle_id,
                 start_date=payload.start_date,
                 end_date=payload.end_date
-        )
-        except Exception as e:
-            raise ValueError("Vehicle is not available for the selected dates")
-        
-        if not ReservationService.is_vehicle_available(availability_check):
+            )
+        except VehicleUnavailable:
             raise ValueError("Vehicle is not available for the selected dates")
-        
-        # Create reservation
-        print("Creating reservation...")
-        reservation = Reservation.objects.create(
-            user_id=payload.user_id,
-            vehicle_id=payload.vehicle_id,
-            start_date=payload.start_date,
-            end_date=payload.end_date,
-            status='pending'
-        )
-        print("Reservation created successfully")
+        availability_index.sync(reservation)
+        vehicle_search_cache.invalidate_vehicles([reservation.vehicle_id])
         return reservation
     
     @staticmethod
@@ -117,20 +295,11 @@ class ReservationService:
         # Validate dates if being changed
         new_start = payload.start_date or reservation.start_date
         new_end = payload.end_date or reservation.end_date
-        new_vehicle = payload.vehicle_id or reservation.vehicle_id
         
         if new_start >= new_end:
             raise ValueError("Start date must be before end date")
         
-        # Check availability (excluding current reservation)
-        availability_check = IsVehicleAvailableRequest(
-            vehicle_id=new_vehicle,
-            start_date=new_start,
-            end_date=new_end,
-            exclude_id=payload.reservation_id
-        )
-        if not ReservationService.is_vehicle_available(availability_check):
-            raise ValueError("Vehicle is not available for the selected dates")
+        previous_vehicle_id = reservation.vehicle_id
         
         # Update fields
         if payload.vehicle_id:
@@ -142,7 +311,13 @@ class ReservationService:
         if payload.end_date:
             reservation.end_date = payload.end_date
         
-        reservation.save()
+        # Availability (excluding this reservation) is checked by the update itself
+        try:
+            update_if_available(reservation)
+        except VehicleUnavailable:
+            raise ValueError("Vehicle is not available for the selected dates")
+        availability_index.sync(reservation)
+        vehicle_search_cache.invalidate_vehicles([previous_vehicle_id, reservation.vehicle_id])
         return reservation
     
     @staticmethod
@@ -152,9 +327,30 @@ class ReservationService:
         if not reservation:
             return False
         
+        reservation_id = reservation.id
         reservation.delete()
+        availability_index.discard(reservation_id)
+        if reservation.status in Reservation.ACTIVE_STATUSES:
+            vehicle_search_cache.invalidate_vehicles([reservation.vehicle_id])
         return True
     
+    @staticmethod
+    def release_user(user_id: int) -> int:
+        """
+        Cancel every active reservation of a user (used when the user is deleted).
+        Returns how many reservations were cancelled.
+        """
+        active = Reservation.objects.filter(user_id=user_id, status__in=Reservation.ACTIVE_STATUSES)
+        released = list(active.values_list('id', 'vehicle_id'))
+        if not released:
+            return 0
+        
+        Reservation.objects.filter(id__in=[r[0] for r in released]).update(status='cancelled')
+        for reservation_id, _ in released:
+            availability_index.discard(reservation_id)
+        vehicle_search_cache.invalidate_vehicles([vehicle_id for _, vehicle_id in released])
+        return len(released)
+    
     @staticmethod
     def cancel(reservation_id: UUID) -> Reservation:
         """Cancel a reservation."""
@@ -170,6 +366,8 @@ class ReservationService:
         
         reservation.status = 'cancelled'
         reservation.save()
+        availability_index.sync(reservation)
+        vehicle_search_cache.invalidate_vehicles([reservation.vehicle_id])
         return reservation
     
     @staticmethod
@@ -184,4 +382,5 @@ class ReservationService:
         
         reservation.status = 'confirmed'
         reservation.save()
+        availability_index.sync(reservation)
         return reservation
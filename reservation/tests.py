@@ -1,13 +1,35 @@
 """
 Reservation Tests - Unit Tests for Reservation Domain
 """
-from django.test import TestCase
+import base64
+import io
+import json
+import random
+import tempfile
+import threading
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from datetime import date, timedelta
 from uuid import uuid4
 
+from reservation.availability_index import VehicleIntervals
+from rentalbe.apibench import BenchData, run_scenarios
+from rentalbe.benchmarking import api_client, measure_requests, percentile, regressions
+from rentalbe.datagen import DATASET_ANCHOR, reservation_rows
+from rentalbe.jsonstream import iter_json_array
+from reservation.booking import BookingBusy, double_booking_count
+from reservation.loader import load_reservations
 from reservation.models import Reservation
-from reservation.services import ReservationService
-from reservation.schemas import AddReservationRequest, UpdateReservationRequest
+from reservation.occupancy import booked_days, occupancy_bitmap
+from reservation.purge import purge_deleted
+from reservation.services import ReservationService, availability_index
+from reservation.schemas import AddReservationRequest, UpdateReservationRequest, IsVehicleAvailableRequest
 from user.models import User
 from vehicle.models import Vehicle
 
@@ -404,3 +426,700 @@ class ReservationServiceTest(TestCase):
             ReservationService.confirm(reservation.id)
         
         self.assertIn("Cannot confirm", str(context.exception))
+
+
+class ReservationPaginationTest(TestCase):
+    """Tests for keyset pagination and NDJSON streaming of reservations."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create(
+            username='testuser',
+            password='hashedpassword123'
+        )
+        self.vehicle = Vehicle.objects.create(
+            name='Toyota Avanza',
+            brand='Toyota',
+            model='Avanza',
+            year=2022,
+            plate_number='B 1234 ABC',
+            color='Black',
+            daily_rate=350000,
+            is_available=True,
+            location='Jakarta'
+        )
+        for offset in range(5):
+            Reservation.objects.create(
+                user=self.user,
+                vehicle=self.vehicle,
+                start_date=date.today() + timedelta(days=offset * 10),
+                end_date=date.today() + timedelta(days=offset * 10 + 2),
+                status='pending'
+            )
+    
+    def test_get_page_walks_all_rows(self):
+        """Test following next cursors returns every reservation once."""
+        seen = []
+        cursor = None
+        while True:
+            page, cursor = ReservationService.get_page(cursor, limit=2)
+            seen.extend(r.id for r in page)
+            if cursor is None:
+                break
+        
+        expected = list(Reservation.objects.order_by('id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+    
+    def test_get_page_last_page_has_no_cursor(self):
+        """Test next cursor is None when the page holds the remaining rows."""
+        page, cursor = ReservationService.get_page(limit=5)
+        self.assertEqual(len(page), 5)
+        self.assertIsNone(cursor)
+    
+    def test_get_page_invalid_cursor(self):
+        """Test get_page rejects a tampered cursor."""
+        with self.assertRaises(ValueError):
+            ReservationService.get_page('not-a-cursor')
+    
+    def test_list_endpoint_bounds_page_size(self):
+        """Test the list endpoint clamps limit and returns a next cursor."""
+        response = self.client.get('/api/reservations/', {'limit': 3})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(len(body['items']), 3)
+        self.assertIsNotNone(body['next'])
+    
+    def test_list_endpoint_stream_ndjson(self):
+        """Test stream=true returns one JSON object per line."""
+        response = self.client.get('/api/reservations/', {'stream': 'true'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(json.loads(lines[0])['vehicle_id'], self.vehicle.id)
+    
+    async def test_async_reads_match_sync(self):
+        """Test the async page, get and search return the sync results."""
+        page, cursor = await ReservationService.aget_page(limit=2)
+        sync_page, _ = await sync_to_async(ReservationService.get_page)(limit=2)
+        self.assertEqual([r.id for r in page], [r.id for r in sync_page])
+        self.assertIsNotNone(cursor)
+        
+        reservation = await ReservationService.aget_by_id(page[0].id)
+        self.assertEqual(reservation.vehicle_id, self.vehicle.id)
+        self.assertIsNone(await ReservationService.aget_by_id(0))
+        
+        response = await self.async_client.get('/api/reservations/', {'limit': 3})
+        self.assertEqual(len(response.json()['items']), 3)
+        response = await self.async_client.get(f'/api/reservations/{page[0].id}')
+        self.assertEqual(response.json()['id'], page[0].id)
+
+
+class AvailabilityIndexTest(TestCase):
+    """Tests for the in-process availability index."""
+    
+    def setUp(self):
+        """Set up test data."""
+        availability_index.clear()
+        self.user = User.objects.create(
+            username='testuser',
+            password='hashedpassword123'
+        )
+        self.vehicle = Vehicle.objects.create(
+            name='Toyota Avanza',
+            brand='Toyota',
+            model='Avanza',
+            year=2022,
+            plate_number='B 1234 ABC',
+            color='Black',
+            daily_rate=350000,
+            is_available=True,
+            location='Jakarta'
+        )
+        self.start = date.today() + timedelta(days=1)
+        self.end = date.today() + timedelta(days=3)
+    
+    def test_intervals_overlap(self):
+        """Test overlap detection including inclusive boundaries and exclusions."""
+        intervals = VehicleIntervals([
+            (date(2030, 1, 1), date(2030, 1, 20), 1),
+            (date(2030, 1, 5), date(2030, 1, 6), 2),
+            (date(2030, 2, 1), date(2030, 2, 3), 3),
+        ])
+        self.assertTrue(intervals.overlaps(date(2030, 1, 10), date(2030, 1, 12)))
+        self.assertTrue(intervals.overlaps(date(2030, 2, 3), date(2030, 2, 5)))
+        self.assertFalse(intervals.overlaps(date(2030, 1, 21), date(2030, 1, 31)))
+        self.assertFalse(intervals.overlaps(date(2030, 1, 10), date(2030, 1, 12), exclude_id=1))
+    
+    def test_index_tracks_create_and_cancel(self):
+        """Test write paths keep a loaded vehicle current."""
+        self.assertTrue(availability_index.is_available(self.vehicle.id, self.start, self.end))
+        
+        reservation = ReservationService.create(AddReservationRequest(
+            user_id=self.user.id,
+            vehicle_id=self.vehicle.id,
+            start_date=self.start,
+            end_date=self.end
+        ))
+        self.assertFalse(availability_index.is_available(self.vehicle.id, self.start, self.end))
+        
+        ReservationService.cancel(reservation.id)
+        self.assertTrue(availability_index.is_available(self.vehicle.id, self.start, self.end))
+    
+    def test_index_tracks_delete(self):
+        """Test deleted reservations leave the index."""
+        reservation = ReservationService.create(AddReservationRequest(
+            user_id=self.user.id,
+            vehicle_id=self.vehicle.id,
+            start_date=self.start,
+            end_date=self.end
+        ))
+        self.assertFalse(availability_index.is_available(self.vehicle.id, self.start, self.end))
+        
+        ReservationService.delete(reservation.id)
+        self.assertTrue(availability_index.is_available(self.vehicle.id, self.start, self.end))
+    
+    @override_settings(RESERVATION_AVAILABILITY_INDEX=True)
+    def test_check_availability_endpoint_uses_index(self):
+        """Test /check-availability answers from the index when enabled."""
+        Reservation.objects.create(
+            user=self.user,
+            vehicle=self.vehicle,
+            start_date=self.start,
+            end_date=self.end,
+            status='confirmed'
+        )
+        response = self.client.post(
+            '/api/reservations/check-availability',
+            {
+                'vehicle_id': self.vehicle.id,
+                'start_date': str(self.start),
+                'end_date': str(self.end)
+            },
+            content_type='application/json'
+        )
+        self.assertEqual(response.json(), {'available': False})
+
+
+class BatchAvailabilityTest(TestCase):
+    """Tests for batch availability checks."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create(
+            username='testuser',
+            password='hashedpassword123'
+        )
+        self.vehicle = Vehicle.objects.create(
+            name='Toyota Avanza',
+            brand='Toyota',
+            model='Avanza',
+            year=2022,
+            plate_number='B 1234 ABC',
+            color='Black',
+            daily_rate=350000,
+            is_available=True,
+            location='Jakarta'
+        )
+        self.vehicle2 = Vehicle.objects.create(
+            name='Honda Brio',
+            brand='Honda',
+            model='Brio',
+            year=2023,
+            plate_number='B 5678 XYZ',
+            color='White',
+            daily_rate=280000,
+            is_available=True,
+            location='Bandung'
+        )
+        self.booked = Reservation.objects.create(
+            user=self.user,
+            vehicle=self.vehicle,
+            start_date=date.today() + timedelta(days=2),
+            end_date=date.today() + timedelta(days=5),
+            status='confirmed'
+        )
+    
+    def _item(self, vehicle, start_offset, end_offset, exclude_id=None):
+        return IsVehicleAvailableRequest(
+            vehicle_id=vehicle.id,
+            start_date=date.today() + timedelta(days=start_offset),
+            end_date=date.today() + timedelta(days=end_offset),
+            exclude_id=exclude_id
+        )
+    
+    def test_batch_matches_single_checks_in_order(self):
+        """Test batch results equal per-item checks and keep input order."""
+        items = [
+            self._item(self.vehicle2, 2, 5),
+            self._item(self.vehicle, 1, 3),
+            self._item(self.vehicle, 6, 8),
+            self._item(self.vehicle, 1, 3, exclude_id=self.booked.id),
+        ]
+        
+        with self.assertNumQueries(1):
+            result = ReservationService.check_availability_batch(items)
+        
+        self.assertEqual(result, [True, False, True, True])
+        self.assertEqual(result, [ReservationService.is_vehicle_available(i) for i in items])
+    
+    def test_batch_endpoint(self):
+        """Test batch endpoint echoes each item with its availability."""
+        response = self.client.post(
+            '/api/reservations/check-availability/batch',
+            {'items': [
+                {'vehicle_id': self.vehicle.id, 'start_date': str(date.today() + timedelta(days=3)),
+                 'end_date': str(date.today() + timedelta(days=4))},
+                {'vehicle_id': self.vehicle2.id, 'start_date': str(date.today() + timedelta(days=3)),
+                 'end_date': str(date.today() + timedelta(days=4))},
+            ]},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([r['vehicle_id'] for r in results], [self.vehicle.id, self.vehicle2.id])
+        self.assertEqual([r['available'] for r in results], [False, True])
+    
+    def test_batch_rejects_empty_or_reversed_ranges(self):
+        """Test items whose start date is not before the end date are rejected before querying."""
+        for start_offset, end_offset in ((4, 4), (9, 1)):
+            items = [self._item(self.vehicle2, 2, 5), self._item(self.vehicle2, start_offset, end_offset)]
+            with self.assertNumQueries(0), self.assertRaises(ValueError) as raised:
+                ReservationService.check_availability_batch(items)
+            self.assertIn('Item 1', str(raised.exception))
+        
+        response = self.client.post(
+            '/api/reservations/check-availability/batch',
+            {'items': [{'vehicle_id': self.vehicle.id, 'start_date': str(date.today() + timedelta(days=4)),
+                        'end_date': str(date.today() + timedelta(days=3))}]},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class AvailabilityCalendarTest(TestCase):
+    """Tests for the occupancy bitmap calendar."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create(
+            username='testuser',
+            password='hashedpassword123'
+        )
+        self.vehicle = Vehicle.objects.create(
+            name='Toyota Avanza',
+            brand='Toyota',
+            model='Avanza',
+            year=2022,
+            plate_number='B 1234 ABC',
+            color='Black',
+            daily_rate=350000,
+            is_available=True,
+            location='Jakarta'
+        )
+        self.start = date(2030, 3, 1)
+        Reservation.objects.create(
+            user=self.user,
+            vehicle=self.vehicle,
+            start_date=date(2030, 2, 27),
+            end_date=date(2030, 3, 2),
+            status='confirmed'
+        )
+        Reservation.objects.create(
+            user=self.user,
+            vehicle=self.vehicle,
+            start_date=date(2030, 3, 10),
+            end_date=date(2030, 3, 11),
+            status='pending'
+        )
+        Reservation.objects.create(
+            user=self.user,
+            vehicle=self.vehicle,
+            start_date=date(2030, 3, 20),
+            end_date=date(2030, 3, 22),
+            status='cancelled'
+        )
+    
+    def test_bitmap_round_trip(self):
+        """Test bitmaps clip ranges to the horizon and decode back to dates."""
+        bitmap = occupancy_bitmap([(date(2030, 2, 27), date(2030, 3, 2))], self.start, 10)
+        self.assertEqual(len(bitmap), 2)
+        self.assertEqual(booked_days(bitmap, self.start), [date(2030, 3, 1), date(2030, 3, 2)])
+    
+    def test_calendar_marks_active_reservations_only(self):
+        """Test calendar covers pending/confirmed days and skips cancelled ones."""
+        with self.assertNumQueries(1):
+            calendars = ReservationService.availability_calendar([self.vehicle.id], self.start, 90)
+        
+        self.assertEqual(
+            booked_days(calendars[self.vehicle.id], self.start),
+            [date(2030, 3, 1), date(2030, 3, 2), date(2030, 3, 10), date(2030, 3, 11)]
+        )
+    
+    def test_calendar_rejects_long_horizon(self):
+        """Test horizons longer than a year are rejected."""
+        with self.assertRaises(ValueError):
+            ReservationService.availability_calendar([self.vehicle.id], self.start, 400)
+    
+    def test_calendar_endpoint(self):
+        """Test calendar endpoint returns one base64 bitmap per vehicle."""
+        response = self.client.get('/api/reservations/calendar', {
+            'vehicle_ids': [self.vehicle.id],
+            'start_date': str(self.start),
+            'days': 365
+        })
+        self.assertEqual(response.status_code, 200)
+        vehicles = response.json()['vehicles']
+        self.assertEqual(len(vehicles), 1)
+        bitmap = base64.b64decode(vehicles[0]['booked'])
+        self.assertEqual(len(bitmap), 46)
+        self.assertEqual(len(booked_days(bitmap, self.start)), 4)
+
+
+class BookingConcurrencyTest(TransactionTestCase):
+    """Tests for race-free booking under concurrent requests."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create(
+            username='testuser',
+            password='hashedpassword123'
+        )
+        self.vehicle = Vehicle.objects.create(
+            name='Toyota Avanza',
+            brand='Toyota',
+            model='Avanza',
+            year=2022,
+            plate_number='B 1234 ABC',
+            color='Black',
+            daily_rate=350000,
+            is_available=True,
+            location='Jakarta'
+        )
+    
+    def test_concurrent_creates_book_once(self):
+        """Test threads racing for the same dates produce exactly one booking."""
+        payload = AddReservationRequest(
+            user_id=self.user.id,
+            vehicle_id=self.vehicle.id,
+            start_date=date.today() + timedelta(days=1),
+            end_date=date.today() + timedelta(days=3)
+        )
+        barrier = threading.Barrier(8)
+        outcomes = []
+        
+        def book():
+            barrier.wait()
+            try:
+                ReservationService.create(payload)
+                outcomes.append('booked')
+            except (ValueError, BookingBusy):
+                outcomes.append('rejected')
+            finally:
+                connection.close()
+        
+        threads = [threading.Thread(target=book) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(outcomes.count('booked'), 1)
+        self.assertEqual(double_booking_count(), 0)
+    
+    def test_update_into_booked_range_fails(self):
+        """Test update is rejected when the new dates overlap another booking."""
+        ReservationService.create(AddReservationRequest(
+            user_id=self.user.id,
+            vehicle_id=self.vehicle.id,
+            start_date=date.today() + timedelta(days=1),
+            end_date=date.today() + timedelta(days=3)
+        ))
+        second = ReservationService.create(AddReservationRequest(
+            user_id=self.user.id,
+            vehicle_id=self.vehicle.id,
+            start_date=date.today() + timedelta(days=5),
+            end_date=date.today() + timedelta(days=7)
+        ))
+        
+        with self.assertRaises(ValueError) as context:
+            ReservationService.update(UpdateReservationRequest(
+                reservation_id=second.id,
+                start_date=date.today() + timedelta(days=2)
+            ))
+        
+        self.assertIn("not available", str(context.exception))
+        second.refresh_from_db()
+        self.assertEqual(second.start_date, date.today() + timedelta(days=5))
+    
+    def test_locked_database_is_retryable(self):
+        """Test a write that hits a lock failure answers 503 with Retry-After, not 500."""
+        def locked(execute, sql, params, many, context):
+            if sql.lstrip().upper().startswith('INSERT'):
+                raise OperationalError('database is locked')
+            return execute(sql, params, many, context)
+        
+        with connection.execute_wrapper(locked):
+            response = self.client.post(
+                '/api/reservations/',
+                json.dumps({
+                    'user_id': self.user.id, 'vehicle_id': self.vehicle.id,
+                    'start_date': str(date.today() + timedelta(days=1)),
+                    'end_date': str(date.today() + timedelta(days=3)),
+                }),
+                content_type='application/json',
+            )
+        
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertFalse(Reservation.objects.exists())
+
+
+class PurgeDeletedTest(TestCase):
+    """Tests for the batched purge of soft-deleted vehicles and users."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create(username='purgeuser', password='hashed')
+        self.gone_user = User.objects.create(username='goneuser', password='hashed')
+        self.vehicles = [
+            Vehicle.objects.create(
+                name=f'Car {i}', brand='Toyota', model='Avanza', year=2022,
+                plate_number=f'B {i} PRG', color='Black', daily_rate=350000, location='Jakarta'
+            )
+            for i in range(3)
+        ]
+        start = date(2024, 1, 1)
+        for index in range(9):
+            Reservation.objects.create(
+                user=self.gone_user if index == 0 else self.user,
+                vehicle=self.vehicles[index % 3],
+                start_date=start + timedelta(days=index * 7),
+                end_date=start + timedelta(days=index * 7 + 2),
+                status='completed'
+            )
+        Vehicle.objects.filter(id__in=[self.vehicles[0].id, self.vehicles[1].id]).soft_delete()
+        User.objects.filter(id=self.gone_user.id).soft_delete()
+    
+    def test_purge_removes_tombstones_in_batches(self):
+        """Test purge deletes tombstoned rows and their reservations, pausing per batch."""
+        pauses = []
+        
+        counts = purge_deleted(batch_size=2, pause=0.5, sleep=pauses.append)
+        
+        self.assertEqual(counts, {'vehicles': 2, 'users': 1, 'reservations': 6})
+        self.assertEqual(list(Vehicle.all_objects.values_list('id', flat=True)), [self.vehicles[2].id])
+        self.assertEqual(list(User.all_objects.values_list('id', flat=True)), [self.user.id])
+        self.assertEqual(Reservation.objects.count(), 3)
+        # 3 reservation batches + 1 vehicle batch + 1 user batch (nothing left to delete)
+        self.assertEqual(len(pauses), 5)
+        self.assertTrue(all(p == 0.5 for p in pauses))
+    
+    def test_purge_is_idempotent(self):
+        """Test a second purge finds nothing to do."""
+        purge_deleted(pause=0)
+        
+        self.assertEqual(purge_deleted(pause=0), {'vehicles': 0, 'users': 0, 'reservations': 0})
+
+
+class ReservationLoaderTest(TestCase):
+    """Tests for the batched, streaming reservation loader."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create(username='loader', password='hashed')
+        self.vehicles = [
+            Vehicle.objects.create(
+                name=f'Car {i}', brand='Toyota', model='Avanza', year=2022,
+                plate_number=f'B {i} LDR', color='Black', daily_rate=350000, location='Jakarta'
+            )
+            for i in range(2)
+        ]
+        Reservation.objects.create(
+            user=self.user, vehicle=self.vehicles[0],
+            start_date=date(2024, 1, 1), end_date=date(2024, 1, 3), status='completed'
+        )
+    
+    def item(self, car, day, **overrides):
+        item = {
+            'user': self.user.id, 'vehicle': car.id,
+            'start_date': f'2024-02-{day:02d}', 'end_date': f'2024-02-{day + 2:02d}', 'status': 'completed',
+        }
+        item.update(overrides)
+        return item
+    
+    def test_iter_json_array_small_reads(self):
+        """Test items are decoded incrementally, whatever the read size."""
+        data = [{'a': [1, 2.5e-3, 'x, ]']}, 123456789, None, 'tail']
+        text = json.dumps(data, indent=2)
+        
+        for read_size in (1, 3, 64):
+            self.assertEqual(list(iter_json_array(io.StringIO(text), read_size)), data)
+        with self.assertRaises(ValueError):
+            list(iter_json_array(io.StringIO('{"not": "an array"}')))
+    
+    def test_load_counts_and_dedup(self):
+        """Test new rows are created and duplicates, unknown ids and bad rows are skipped."""
+        items = [
+            self.item(self.vehicles[0], 1),
+            self.item(self.vehicles[1], 1),
+            self.item(self.vehicles[0], 1),
+            self.item(self.vehicles[0], 0, start_date='2024-01-01', end_date='2024-01-03'),
+            self.item(self.vehicles[0], 5, user=999999),
+            self.item(self.vehicles[0], 5, vehicle=999999),
+            self.item(self.vehicles[0], 5, status='lost'),
+            {'user': self.user.id},
+            self.item(self.vehicles[1], 10, status='pending'),
+        ]
+        
+        counts = load_reservations(io.StringIO(json.dumps(items)), batch_size=2)
+        
+        self.assertEqual(counts, {
+            'created': 3, 'duplicates': 2, 'conflicts': 0, 'missing_user': 1, 'missing_vehicle': 1, 'invalid': 2,
+        })
+        self.assertEqual(Reservation.objects.count(), 4)
+        self.assertEqual(Reservation.objects.filter(status='pending').count(), 1)
+    
+    def test_active_overlaps_are_conflicts(self):
+        """Test active rows overlapping stored or earlier active rows are skipped, not double-booked."""
+        Reservation.objects.create(
+            user=self.user, vehicle=self.vehicles[0],
+            start_date=date(2024, 2, 10), end_date=date(2024, 2, 12), status='confirmed'
+        )
+        items = [
+            self.item(self.vehicles[0], 11, status='pending'),
+            self.item(self.vehicles[0], 9, status='cancelled'),
+            self.item(self.vehicles[1], 1, status='confirmed'),
+            self.item(self.vehicles[1], 3, status='pending'),
+            self.item(self.vehicles[1], 4, status='completed'),
+            self.item(self.vehicles[1], 5, status='confirmed'),
+        ]
+        
+        with CaptureQueriesContext(connection) as queries:
+            counts = load_reservations(io.StringIO(json.dumps(items)))
+        
+        self.assertEqual((counts['created'], counts['conflicts']), (4, 2))
+        self.assertEqual(double_booking_count(), 0)
+        # 2 id sets + existing rows, active rows, savepoint, insert, release + cache invalidation
+        self.assertLessEqual(len(queries), 2 + 5 + 1)
+    
+    def test_queries_per_chunk(self):
+        """Test the loader runs a fixed number of queries per chunk, not per row."""
+        items = [self.item(self.vehicles[i % 2], 1 + i // 2 % 20, end_date='2024-03-01') for i in range(40)]
+        items += [dict(item, user=self.user.id) for item in items]
+        
+        with CaptureQueriesContext(connection) as queries:
+            counts = load_reservations(io.StringIO(json.dumps(items)), batch_size=40)
+        
+        self.assertEqual((counts['created'], counts['duplicates']), (40, 40))
+        # 2 id sets + per chunk: existing rows, savepoint, insert, release
+        self.assertLessEqual(len(queries), 2 + 2 * 4 + 1)
+
+
+class GenerateDatasetTest(TestCase):
+    """Tests for the synthetic dataset generator."""
+    
+    def generate(self, *args):
+        call_command(
+            'generate_dataset', '--users', '4', '--vehicles', '6', '--locations', '3',
+            '--reservations', '300', '--batch-size', '64', *args, stdout=io.StringIO(),
+        )
+    
+    def test_same_seed_same_dataset(self):
+        """Test datasets depend only on the seed and sizes."""
+        rows = list(reservation_rows(500, [1, 2], [10, 11, 12], seed=7))
+        
+        self.assertEqual(rows, list(reservation_rows(500, [1, 2], [10, 11, 12], seed=7)))
+        self.assertNotEqual(rows, list(reservation_rows(500, [1, 2], [10, 11, 12], seed=8)))
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            self.generate('--no-db', '--json-dir', first)
+            self.generate('--no-db', '--json-dir', second)
+            for name in ('users.json', 'vehicles.json', 'reservations.json'):
+                self.assertEqual((Path(first) / name).read_text(), (Path(second) / name).read_text())
+        self.assertFalse(Reservation.objects.exists())
+    
+    def test_database_rows_are_consistent(self):
+        """Test generated rows land in the database with no double bookings."""
+        self.generate()
+        
+        self.assertEqual(User.objects.filter(username__startswith='gen_user_').count(), 4)
+        self.assertEqual(Vehicle.objects.count(), 6)
+        self.assertEqual(Reservation.objects.count(), 300)
+        self.assertEqual(double_booking_count(), 0)
+        # History before the anchor, bookings after it
+        self.assertFalse(Reservation.objects.filter(end_date__lt=DATASET_ANCHOR, status='pending').exists())
+        self.assertFalse(Reservation.objects.filter(start_date__gt=DATASET_ANCHOR, status='completed').exists())
+        self.assertTrue(User.objects.first().check_password('password123'))
+    
+    def test_json_round_trips_through_loaders(self):
+        """Test the JSON files are read back by load_reservations."""
+        with tempfile.TemporaryDirectory() as json_dir:
+            self.generate('--json-dir', json_dir)
+            Reservation.objects.all().delete()
+            with open(Path(json_dir) / 'reservations.json') as f:
+                counts = load_reservations(f)
+        
+        self.assertEqual(counts['created'] + counts['duplicates'], 300)
+        self.assertEqual(counts['invalid'] + counts['missing_user'] + counts['missing_vehicle'], 0)
+        self.assertEqual(double_booking_count(), 0)
+    
+    def test_existing_rows_need_flush(self):
+        """Test rerunning fails cleanly unless --flush replaces the data."""
+        self.generate()
+        
+        with self.assertRaises(CommandError):
+            self.generate()
+        self.generate('--flush')
+        self.assertEqual(Reservation.objects.count(), 300)
+
+
+class ApiBenchmarkTest(TestCase):
+    """Tests for the API benchmark suite and its baseline comparison."""
+    
+    def test_scenarios_record_latency_and_queries(self):
+        """Test every scenario runs against generated data and reports percentiles."""
+        call_command(
+            'generate_dataset', '--users', '5', '--vehicles', '10', '--reservations', '200',
+            '--anchor', str(date.today()), stdout=io.StringIO(),
+        )
+        names = ['vehicle_search', 'vehicle_list', 'reservation_list', 'check_availability', 'reservation_create']
+        
+        results = run_scenarios(
+            api_client(), random.Random(1), BenchData.load(date.today()),
+            requests=6, warmup=1, names=names,
+        )
+        
+        self.assertEqual(list(results), names)
+        for stats in results.values():
+            self.assertEqual(stats['count'], 6)
+            self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+            self.assertGreaterEqual(stats['queries_max'], 1)
+        self.assertEqual(Reservation.objects.count(), 200 + 7)
+    
+    def test_unexpected_status_fails(self):
+        """Test timing an error response is refused."""
+        client = api_client()
+        
+        with self.assertRaises(AssertionError):
+            measure_requests([lambda: client.get('/api/reservations/999999')])
+    
+    def test_percentile_nearest_rank(self):
+        """Test percentiles pick the nearest-rank sample."""
+        samples = list(range(1, 101))
+        
+        self.assertEqual([percentile(samples, pct) for pct in (50, 95, 99, 100)], [50, 95, 99, 100])
+        self.assertEqual(percentile([2.0, 1.0], 50), 1.0)
+        self.assertEqual(percentile([3.0, 1.0, 2.0], 50), 2.0)
+        self.assertEqual(percentile([5.0], 0), 5.0)
+        self.assertEqual(percentile([], 95), 0.0)
+    
+    def test_regressions(self):
+        """Test slower percentiles and extra queries are reported, jitter is not."""
+        base = {'p50_ms': 10.0, 'p95_ms': 20.0, 'p99_ms': 0.2, 'queries_max': 2}
+        
+        self.assertEqual(regressions({'a': dict(base, p99_ms=0.9)}, {'a': base}, 0.25), [])
+        self.assertEqual(regressions({'new': base}, {}, 0.25), [])
+        found = regressions({'a': dict(base, p50_ms=13.0, queries_max=3)}, {'a': base}, 0.25)
+        self.assertEqual(len(found), 2)
+        self.assertIn('p50_ms', found[0])
+        self.assertIn('queries', found[1])
+
@@ -1,15 +1,24 @@
 """
 User API - HTTP Endpoints
 """
+from django.conf import settings
+from django.db import IntegrityError
+from django.http import HttpResponse
 from ninja import Router
 from uuid import UUID
 from typing import List
 
+from user.auth import can_refresh, issue_token, service_auth, token_auth
 from user.services import UserService
+from user.throttle import client_ip, login_throttle
 from user.schemas import (
     RegisterRequest,
+    BulkRegisterRequest,
+    BulkRegisterResponse,
     LoginRequest,
     UserResponse,
+    TokenResponse,
+    ThrottleStatsResponse,
     MessageResponse,
     ErrorResponse,
 )
@@ -27,16 +36,71 @@ def register(request, payload: RegisterRequest):
         return 400, {"error": str(e)}
 
 
-@router.post("/login", response={200: UserResponse, 401: ErrorResponse})
-def login(request, payload: LoginRequest):
-    """Login user."""
+@router.post(
+    "/bulk-register",
+    response={200: BulkRegisterResponse, 400: ErrorResponse, 409: ErrorResponse},
+    auth=service_auth,
+)
+def bulk_register(request, payload: BulkRegisterRequest):
+    """
+    Register many users at once (corporate onboarding services only).
+    Needs the service token and at most USER_BULK_REGISTER_MAX_USERS users;
+    passwords are hashed in this worker, not a process pool.
+    Per-user results come back in input order; failed users are not created.
+    """
+    limit = settings.USER_BULK_REGISTER_MAX_USERS
+    if len(payload.users) > limit:
+        return 400, {"error": f"At most {limit} users per request, use load_users for larger imports"}
+    try:
+        return 200, UserService.bulk_register([(u.username, u.password) for u in payload.users], workers=1)
+    except ValueError as e:
+        return 400, {"error": str(e)}
+    except IntegrityError:
+        return 409, {"error": "A username was taken by a concurrent registration, retry the request"}
+
+
+@router.post("/login", response={200: TokenResponse, 401: ErrorResponse, 429: ErrorResponse})
+def login(request, response: HttpResponse, payload: LoginRequest):
+    """
+    Login user and issue a bearer token.
+    Send it as `Authorization: Bearer <token>` instead of logging in again.
+    Attempts over the per-username or per-IP limit get 429 before any hashing.
+    """
+    allowed, retry_after = login_throttle.check(payload.username, client_ip(request))
+    if not allowed:
+        response["Retry-After"] = str(max(1, round(retry_after)))
+        return 429, {"error": "Too many login attempts, try again later"}
+    
     try:
         user = UserService.login(payload.username, payload.password)
-        return 200, user
+        return 200, _token_response(user)
     except ValueError as e:
         return 401, {"error": str(e)}
 
 
+@router.get("/login/throttle-stats", response=ThrottleStatsResponse, auth=token_auth)
+def login_throttle_stats(request):
+    """Login attempt and throttle counters (this worker)."""
+    return login_throttle.stats()
+
+
+@router.post("/token/refresh", response={200: TokenResponse, 401: ErrorResponse}, auth=token_auth)
+def refresh_token(request):
+    """
+    Issue a fresh token for a valid one (no password check), up to
+    USER_TOKEN_MAX_LIFETIME after the login and while the user exists.
+    """
+    if not can_refresh(request.auth):
+        return 401, {"error": "Token can no longer be refreshed, log in again"}
+    return 200, _token_response(request.auth)
+
+
+@router.get("/me", response=UserResponse, auth=token_auth)
+def me(request):
+    """The user of the bearer token, read from the token alone."""
+    return request.auth
+
+
 @router.get("/", response=List[UserResponse])
 def list_users(request):
     """Get all users."""
@@ -58,3 +122,12 @@ def delete_user(request, user_id: UUID):
     if UserService.delete(user_id):
         return 200, {"message": "User deleted"}
     return 404, {"error": "User not found"}
+
+
+def _token_response(user) -> dict:
+    return {
+        "id": user.id,
+        "username": user.username,
+        "token": issue_token(user),
+        "expires_in": settings.USER_TOKEN_MAX_AGE,
+    }
@@ -0,0 +1,82 @@
+"""
+User Auth - Signed bearer tokens
+
+Tokens are issued by /users/login and carry the user id and username,
+timestamped and HMAC-signed with SECRET_KEY (django.core.signing). Checking
+one is a constant-time signature comparison plus an age check: no database
+query and no password hashing. A token stays valid until it expires, even
+if the user is deleted meanwhile, so USER_TOKEN_MAX_AGE is kept short.
+
+Refreshed tokens keep the login time ("iat") of the token they replace.
+can_refresh refuses chains older than USER_TOKEN_MAX_LIFETIME and users
+that no longer exist, so a stolen token cannot be renewed forever.
+"""
+import hmac
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
+from django.conf import settings
+from django.core import signing
+from ninja.security import HttpBearer
+
+from user.models import User
+
+TOKEN_SALT = "user.auth.token"
+
+
+@dataclass(frozen=True)
+class TokenUser:
+    """The user a valid token was issued to, and when they logged in"""
+    id: int
+    username: str
+    issued_at: int = field(default=0, compare=False)
+
+
+def issue_token(user: Union[User, TokenUser]) -> str:
+    """
+    Signed, timestamped token for a user, or for the user of a valid token
+    (keeping that token's login time).
+    """
+    issued_at = getattr(user, "issued_at", None) or int(time.time())
+    return signing.dumps({"id": user.id, "username": user.username, "iat": issued_at}, salt=TOKEN_SALT)
+
+
+def verify_token(token: str, max_age: Optional[int] = None) -> Optional[TokenUser]:
+    """The token's user, or None if the token is forged, malformed or expired."""
+    if max_age is None:
+        max_age = settings.USER_TOKEN_MAX_AGE
+    try:
+        payload = signing.loads(token, salt=TOKEN_SALT, max_age=max_age)
+        return TokenUser(id=payload["id"], username=payload["username"], issued_at=payload["iat"])
+    except (signing.BadSignature, KeyError, TypeError):
+        # SignatureExpired is a BadSignature
+        return None
+
+
+def can_refresh(user: TokenUser) -> bool:
+    """Whether the token's login is recent enough and its user still exists (one query)."""
+    if time.time() - user.issued_at > settings.USER_TOKEN_MAX_LIFETIME:
+        return False
+    return User.objects.filter(id=user.id).exists()
+
+
+class TokenAuth(HttpBearer):
+    """Ninja auth for `Authorization: Bearer <token>`; sets request.auth to a TokenUser"""
+
+    def authenticate(self, request, token: str) -> Optional[TokenUser]:
+        return verify_token(token)
+
+
+class ServiceTokenAuth(HttpBearer):
+    """Ninja auth for the shared USER_BULK_REGISTER_TOKEN; rejects everyone while it is unset"""
+
+    def authenticate(self, request, token: str) -> Optional[str]:
+        expected = settings.USER_BULK_REGISTER_TOKEN
+        if expected and hmac.compare_digest(token.encode(), expected.encode()):
+            return "service"
+        return None
+
+
+token_auth = TokenAuth()
+service_auth = ServiceTokenAuth()
@@ -0,0 +1,64 @@
+"""
+Password Hashing - Hash many passwords on every CPU
+
+PBKDF2 is deliberately slow (hundreds of milliseconds per password), so
+bulk registration and imports hash in a process pool. Where processes are
+unavailable (some serverless sandboxes have no /dev/shm for the pool's
+locks) hashing falls back to this process.
+"""
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Sequence
+
+from django.contrib.auth.hashers import make_password
+
+
+def pool_size(workers: Optional[int] = None) -> int:
+    """Requested worker count, or one per CPU."""
+    return workers or os.cpu_count() or 1
+
+
+@contextmanager
+def password_pool(workers: Optional[int] = None) -> Iterator[Optional[Executor]]:
+    """
+    A process pool to reuse across hash_passwords calls, or None when one
+    worker is asked for or processes are unavailable.
+    """
+    workers = pool_size(workers)
+    if workers <= 1:
+        yield None
+        return
+    try:
+        # Spawned, not forked: a forked child would share (and on exit close)
+        # the parent's database connection
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    except (OSError, NotImplementedError):
+        yield None
+        return
+    with pool:
+        yield pool
+
+
+def hash_passwords(
+    passwords: Sequence[str],
+    workers: Optional[int] = None,
+    pool: Optional[Executor] = None,
+) -> List[str]:
+    """make_password for each password, in input order (on `pool` when given)."""
+    if pool is None:
+        workers = min(pool_size(workers), len(passwords))
+        if workers > 1:
+            with password_pool(workers) as pool:
+                if pool is not None:
+                    return hash_passwords(passwords, pool=pool)
+        return [make_password(password) for password in passwords]
+
+    # Large chunks keep pickling overhead negligible next to the hashing
+    chunksize = max(1, len(passwords) // (pool_size() * 4))
+    try:
+        return list(pool.map(make_password, passwords, chunksize=chunksize))
+    except (OSError, BrokenProcessPool):
+        return [make_password(password) for password in passwords]
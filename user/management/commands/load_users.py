@@ -1,42 +1,69 @@
-import json
+import time
 from pathlib import Path
 
 from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
-from user.models import User
+from rentalbe.jsonstream import batched, iter_json_array
+from user.hashing import password_pool, pool_size
+from user.services import BULK_BATCH_SIZE, MAX_BULK_USERS, UserService
 
 
 class Command(BaseCommand):
     help = "Load users from JSON file"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file", type=Path, default=Path(settings.BASE_DIR) / "data" / "users.json",
+            help="JSON array of {username, password}",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=None,
+            help="Hashing processes (default: one per CPU; 1 hashes in this process)",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=BULK_BATCH_SIZE * 4, help=f"Users per chunk (max {MAX_BULK_USERS})"
+        )
+
     def handle(self, *args, **options):
-        data_file = Path(settings.BASE_DIR) / "data" / "users.json"
+        data_file = options["file"]
+        batch_size = options["batch_size"]
+        if not 1 <= batch_size <= MAX_BULK_USERS:
+            raise CommandError(f"--batch-size must be between 1 and {MAX_BULK_USERS}")
 
         if not data_file.exists():
-            self.stderr.write(self.style.ERROR("users.json not found"))
+            self.stderr.write(self.style.ERROR(f"{data_file.name} not found"))
             return
 
-        with open(data_file, "r") as f:
-            users = json.load(f)
+        workers = pool_size(options["workers"])
+        created_count = skipped_count = processed = 0
+        started = time.perf_counter()
 
-        created_count = 0
-
-        for item in users:
-            username = item["username"]
-            password = item["password"]
+        # One pool for the whole file: workers start once, not per chunk
+        with open(data_file, "r") as f, password_pool(workers) as pool:
+            if pool is None and workers > 1:
+                self.stdout.write(self.style.WARNING("Process pool unavailable, hashing in this process"))
+            for chunk in batched(iter_json_array(f), batch_size):
+                result = UserService.bulk_register(
+                    [(item.get("username", ""), item.get("password", "")) for item in chunk],
+                    workers=1,
+                    pool=pool,
+                )
+                for outcome in result["results"]:
+                    if outcome["error"]:
+                        self.stdout.write(
+                            self.style.WARNING(f"User '{outcome['username']}' skipped: {outcome['error']}")
+                        )
+                created_count += result["created"]
+                skipped_count += result["failed"]
+                processed += len(chunk)
 
-            if User.objects.filter(username=username).exists():
+                elapsed = time.perf_counter() - started
                 self.stdout.write(
-                    self.style.WARNING(f"User '{username}' already exists, skipped")
+                    f"{processed:,} processed, {created_count:,} created "
+                    f"({created_count / elapsed:,.0f} users/s, {workers} workers)"
                 )
-                continue
-
-            # Use our User.create factory method
-            user = User.create(username=username, password=password)
-            user.save()
-            created_count += 1
 
         self.stdout.write(
-            self.style.SUCCESS(f"Successfully created {created_count} users")
+            self.style.SUCCESS(f"Successfully created {created_count} users (skipped: {skipped_count})")
         )
@@ -4,6 +4,8 @@ User Model - Simple DDD + Clean Architecture
 from django.db import models
 from django.contrib.auth.hashers import make_password, check_password
 
+from rentalbe.softdelete import AllObjectsManager, LiveManager
+
 
 class User(models.Model):
     """
@@ -12,11 +14,29 @@ class User(models.Model):
     """
     
     # id otomatis dibuat Django sebagai AutoField (integer)
-    username = models.CharField(max_length=50, unique=True)
+    username = models.CharField(max_length=50)
     password = models.CharField(max_length=255)
+    # Tombstone; see rentalbe.softdelete and the purge_deleted command
+    is_deleted = models.BooleanField(default=False)
+    
+    objects = LiveManager()
+    all_objects = AllObjectsManager()
     
     class Meta:
         db_table = 'users'
+        
+        constraints = [
+            # A username becomes free again once its user is deleted
+            models.UniqueConstraint(
+                fields=['username'],
+                condition=models.Q(is_deleted=False),
+                name='users_username_live_uniq',
+            ),
+        ]
+        indexes = [
+            # purge_deleted scans tombstones only
+            models.Index(fields=['id'], condition=models.Q(is_deleted=True), name='users_tombstone_idx'),
+        ]
     
     def __str__(self):
         return self.username
@@ -33,14 +53,18 @@ class User(models.Model):
         """Check if password matches."""
         return check_password(raw_password, self.password)
     
-    @classmethod
-    def create(cls, username: str, password: str) -> 'User':
-        """Factory method to create user with validation."""
+    @staticmethod
+    def clean_credentials(username: str, password: str) -> str:
+        """Validate credentials without hashing; returns the normalized username."""
         if not username or len(username) < 3:
             raise ValueError("Username must be at least 3 characters")
         if not password or len(password) < 6:
             raise ValueError("Password must be at least 6 characters")
-        
-        user = cls(username=username.strip().lower())
+        return username.strip().lower()
+    
+    @classmethod
+    def create(cls, username: str, password: str) -> 'User':
+        """Factory method to create user with validation."""
+        user = cls(username=cls.clean_credentials(username, password))
         user.set_password(password)
         return user
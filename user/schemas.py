@@ -1,6 +1,8 @@
 """
 User Schemas - Request/Response Contracts
 """
+from typing import List, Optional
+
 from ninja import Schema
 
 
@@ -16,6 +18,10 @@ class LoginRequest(Schema):
     password: str
 
 
+class BulkRegisterRequest(Schema):
+    users: List[RegisterRequest]
+
+
 # ========== RESPONSE ==========
 
 class UserResponse(Schema):
@@ -23,6 +29,32 @@ class UserResponse(Schema):
     username: str
 
 
+class TokenResponse(Schema):
+    id: int
+    username: str
+    token: str
+    expires_in: int
+
+
+class BulkRegisterResult(Schema):
+    username: str
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkRegisterResponse(Schema):
+    created: int
+    failed: int
+    results: List[BulkRegisterResult]
+
+
+class ThrottleStatsResponse(Schema):
+    checked: int
+    throttled: int
+    throttled_username: int
+    throttled_ip: int
+
+
 class MessageResponse(Schema):
     message: str
 
@@ -1,25 +1,88 @@
 """
 User Service - Business Logic Layer
 """
-from typing import Optional, List
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from uuid import UUID
 
+from django.db import IntegrityError, connection, transaction
+
+from reservation.services import ReservationService
+from user.hashing import hash_passwords
 from user.models import User
 
+MAX_BULK_USERS = 5000
+BULK_BATCH_SIZE = 500
+
 
 class UserService:
     """Handles all user business operations."""
     
     @staticmethod
     def register(username: str, password: str) -> User:
-        """Register a new user."""
-        if User.objects.filter(username=username.lower().strip()).exists():
-            raise ValueError("Username already exists")
-        
+        """Register a new user with a single INSERT; the unique constraint catches taken usernames."""
         user = User.create(username=username, password=password)
-        user.save()
+        try:
+            if connection.in_atomic_block:
+                # A failed INSERT must not break the caller's transaction
+                with transaction.atomic():
+                    user.save()
+            else:
+                user.save()
+        except IntegrityError:
+            raise ValueError("Username already exists")
         return user
     
+    @staticmethod
+    def bulk_register(
+        items: Sequence[Tuple[str, str]],
+        workers: Optional[int] = None,
+        pool: Optional[Executor] = None,
+    ) -> Dict[str, Any]:
+        """
+        Register many (username, password) pairs.
+        Invalid, repeated and taken usernames fail per item; the rest are hashed
+        in parallel (on `pool` if given) and inserted in batches, all or nothing.
+        Results keep input order. Raises IntegrityError if a username is taken concurrently.
+        """
+        if len(items) > MAX_BULK_USERS:
+            raise ValueError(f"At most {MAX_BULK_USERS} users per request")
+        
+        results: List[Dict[str, Any]] = []
+        pending: List[Tuple[int, str, str]] = []
+        seen = set()
+        for username, password in items:
+            result = {"username": username, "id": None, "error": None}
+            results.append(result)
+            try:
+                username = User.clean_credentials(username, password)
+            except ValueError as e:
+                result["error"] = str(e)
+                continue
+            result["username"] = username
+            if username in seen:
+                result["error"] = "Duplicate username in request"
+                continue
+            seen.add(username)
+            pending.append((len(results) - 1, username, password))
+        
+        taken = set(User.objects.filter(username__in=seen).values_list('username', flat=True))
+        if taken:
+            for position, username, _ in pending:
+                if username in taken:
+                    results[position]["error"] = "Username already exists"
+            pending = [item for item in pending if item[1] not in taken]
+        
+        hashes = hash_passwords([password for _, _, password in pending], workers, pool)
+        users = [User(username=username, password=hashed) for (_, username, _), hashed in zip(pending, hashes)]
+        with transaction.atomic():
+            User.objects.bulk_create(users, batch_size=BULK_BATCH_SIZE)
+        for (position, _, _), user in zip(pending, users):
+            results[position]["id"] = user.id
+        
+        failed = sum(1 for result in results if result["error"])
+        return {"created": len(results) - failed, "failed": failed, "results": results}
+    
     @staticmethod
     def login(username: str, password: str) -> User:
         """Authenticate user."""
@@ -48,10 +111,11 @@ class UserService:
     
     @staticmethod
     def delete(user_id: UUID) -> bool:
-        """Delete a user."""
-        try:
-            user = User.objects.get(id=user_id)
-            user.delete()
-            return True
-        except User.DoesNotExist:
+        """
+        Soft-delete a user and release their active bookings.
+        purge_deleted removes the row and its reservations later.
+        """
+        if not User.objects.filter(id=user_id).soft_delete():
             return False
+        ReservationService.release_user(user_id)
+        return True
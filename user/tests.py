@@ -1,3 +1,365 @@
-from django.test import TestCase
+"""
+User Tests - Unit Tests for User Domain
+"""
+import io
+import json
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
 
-# Create your tests here.
+from django.contrib.auth.hashers import check_password
+from django.core import signing
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from reservation.models import Reservation
+from user.auth import TokenUser, issue_token, verify_token
+from user.hashing import hash_passwords
+from user.throttle import CacheThrottleBackend, LoginThrottle, client_ip, login_throttle
+from user.models import User
+from user.services import MAX_BULK_USERS, UserService
+from vehicle.models import Vehicle
+
+
+class UserSoftDeleteTest(TestCase):
+    """Test soft-deleted users are hidden and release their bookings"""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.user = UserService.register('deleteme', 'secret123')
+        self.vehicle = Vehicle.objects.create(
+            name='Toyota Avanza',
+            brand='Toyota',
+            model='Avanza',
+            year=2022,
+            plate_number='B 1 USR',
+            color='Black',
+            daily_rate=350000,
+            location='Jakarta'
+        )
+        start = date.today() + timedelta(days=3)
+        self.active = Reservation.objects.create(
+            user=self.user, vehicle=self.vehicle, start_date=start,
+            end_date=start + timedelta(days=2), status='confirmed'
+        )
+        self.completed = Reservation.objects.create(
+            user=self.user, vehicle=self.vehicle, start_date=date(2024, 1, 1),
+            end_date=date(2024, 1, 3), status='completed'
+        )
+    
+    def test_deleted_user_is_hidden(self):
+        """Test a deleted user can no longer be read or log in."""
+        self.assertTrue(UserService.delete(self.user.id))
+        
+        self.assertIsNone(UserService.get_by_id(self.user.id))
+        self.assertEqual(UserService.get_all(), [])
+        with self.assertRaises(ValueError):
+            UserService.login('deleteme', 'secret123')
+        self.assertFalse(UserService.delete(self.user.id))
+    
+    def test_username_is_reusable(self):
+        """Test a deleted user's username can be registered again."""
+        UserService.delete(self.user.id)
+        
+        user = UserService.register('deleteme', 'another123')
+        
+        self.assertNotEqual(user.id, self.user.id)
+        self.assertEqual(UserService.login('deleteme', 'another123'), user)
+    
+    def test_delete_releases_active_reservations(self):
+        """Test deleting a user cancels their active bookings only."""
+        UserService.delete(self.user.id)
+        
+        statuses = dict(Reservation.objects.values_list('id', 'status'))
+        self.assertEqual(statuses[self.active.id], 'cancelled')
+        self.assertEqual(statuses[self.completed.id], 'completed')
+
+
+@override_settings(USER_TOKEN_MAX_AGE=60)
+class UserTokenTest(TestCase):
+    """Test signed bearer tokens"""
+    
+    def setUp(self):
+        """Set up test data."""
+        login_throttle.reset()
+        self.user = UserService.register('tokenuser', 'secret123')
+    
+    def login(self):
+        response = self.client.post(
+            '/api/users/login', {'username': 'tokenuser', 'password': 'secret123'},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+    
+    def test_login_issues_token(self):
+        """Test login returns a token that verifies to the user."""
+        body = self.login()
+        
+        self.assertEqual(body['expires_in'], 60)
+        self.assertEqual(verify_token(body['token']), TokenUser(self.user.id, 'tokenuser'))
+    
+    def test_me_needs_no_query(self):
+        """Test /me authenticates from the token alone."""
+        token = self.login()['token']
+        
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/users/me', HTTP_AUTHORIZATION=f'Bearer {token}')
+        
+        self.assertEqual(response.json(), {'id': self.user.id, 'username': 'tokenuser'})
+    
+    def test_invalid_tokens_are_rejected(self):
+        """Test tampered, foreign-salt, expired and missing tokens get 401."""
+        token = self.login()['token']
+        tampered = token[:-2] + ('AA' if not token.endswith('AA') else 'BB')
+        foreign = signing.dumps({'id': self.user.id, 'username': 'tokenuser'})
+        
+        for header in (f'Bearer {tampered}', f'Bearer {foreign}', 'Bearer nonsense', None):
+            extra = {'HTTP_AUTHORIZATION': header} if header else {}
+            self.assertEqual(self.client.get('/api/users/me', **extra).status_code, 401)
+        self.assertIsNone(verify_token(token, max_age=-1))
+    
+    def test_refresh_issues_new_token(self):
+        """Test a valid token can be exchanged without the password."""
+        token = self.login()['token']
+        
+        response = self.client.post('/api/users/token/refresh', HTTP_AUTHORIZATION=f'Bearer {token}')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(verify_token(response.json()['token']).id, self.user.id)
+    
+    def test_refresh_keeps_login_time_and_is_bounded(self):
+        """Test refreshed tokens keep the login time and stop past the lifetime."""
+        token = self.login()['token']
+        issued_at = verify_token(token).issued_at
+        
+        refreshed = self.client.post('/api/users/token/refresh', HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(verify_token(refreshed.json()['token']).issued_at, issued_at)
+        
+        old = issue_token(TokenUser(self.user.id, 'tokenuser', issued_at=issued_at - 90000))
+        response = self.client.post('/api/users/token/refresh', HTTP_AUTHORIZATION=f'Bearer {old}')
+        self.assertEqual(response.status_code, 401)
+    
+    def test_refresh_refused_for_deleted_user(self):
+        """Test a soft-deleted user's token cannot be renewed."""
+        token = self.login()['token']
+        UserService.delete(self.user.id)
+        
+        response = self.client.post('/api/users/token/refresh', HTTP_AUTHORIZATION=f'Bearer {token}')
+        
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(
+    LOGIN_THROTTLE_ENABLED=True,
+    LOGIN_THROTTLE_USERNAME_BURST=3,
+    LOGIN_THROTTLE_USERNAME_PER_MINUTE=6,
+    LOGIN_THROTTLE_IP_BURST=5,
+    LOGIN_THROTTLE_IP_PER_MINUTE=60,
+)
+class LoginThrottleTest(TestCase):
+    """Test login attempts are limited per username and per IP"""
+    
+    def setUp(self):
+        """Set up test data."""
+        login_throttle.reset()
+        self.now = 1000.0
+        self.throttle = LoginThrottle(clock=lambda: self.now)
+    
+    def login(self, username, ip='10.0.0.1'):
+        return self.client.post(
+            '/api/users/login', {'username': username, 'password': 'wrong-password'},
+            content_type='application/json', REMOTE_ADDR=ip
+        )
+    
+    def test_username_bucket_refills(self):
+        """Test a username's burst is spent and refills at its rate."""
+        results = [self.throttle.check('Alice', f'10.0.0.{i}') for i in range(4)]
+        self.assertEqual([allowed for allowed, _ in results], [True, True, True, False])
+        self.assertAlmostEqual(results[-1][1], 10.0)
+        self.assertFalse(self.throttle.check(' alice ', '10.0.0.9')[0])
+        
+        self.now += 10
+        self.assertTrue(self.throttle.check('alice', '10.0.0.9')[0])
+        self.assertEqual(
+            self.throttle.stats(),
+            {'checked': 6, 'throttled': 2, 'throttled_username': 2, 'throttled_ip': 0}
+        )
+    
+    def test_ip_bucket_spans_usernames(self):
+        """Test one IP cannot spread attempts over many usernames."""
+        results = [self.throttle.check(f'user{i}', '10.0.0.1')[0] for i in range(6)]
+        
+        self.assertEqual(results, [True] * 5 + [False])
+        self.assertTrue(self.throttle.check('user9', '10.0.0.2')[0])
+        self.assertEqual(self.throttle.stats()['throttled_ip'], 1)
+    
+    def test_cache_backend_shares_buckets(self):
+        """Test two throttles on the cache backend share their limits."""
+        cache.clear()
+        first = LoginThrottle(CacheThrottleBackend('default'), clock=lambda: self.now)
+        second = LoginThrottle(CacheThrottleBackend('default'), clock=lambda: self.now)
+        
+        for throttle in (first, second, first):
+            self.assertTrue(throttle.check('bob', '10.0.0.1')[0])
+        self.assertFalse(second.check('bob', '10.0.0.2')[0])
+    
+    def test_throttled_login_skips_hashing(self):
+        """Test the endpoint answers 429 without reading the user or hashing."""
+        UserService.register('carol', 'secret123')
+        for _ in range(3):
+            self.assertEqual(self.login('carol').status_code, 401)
+        
+        with self.assertNumQueries(0):
+            response = self.login('carol')
+        
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        self.assertEqual(self.client.get('/api/users/login/throttle-stats').status_code, 401)
+        token = issue_token(TokenUser(User.objects.get(username='carol').id, 'carol'))
+        stats = self.client.get(
+            '/api/users/login/throttle-stats', HTTP_AUTHORIZATION=f'Bearer {token}'
+        ).json()
+        self.assertEqual((stats['checked'], stats['throttled_username']), (4, 1))
+    
+    def test_forwarded_for_needs_trusted_proxy(self):
+        """Test X-Forwarded-For is ignored unless REMOTE_ADDR is a trusted proxy."""
+        factory = RequestFactory()
+        request = factory.get('/', REMOTE_ADDR='203.0.113.7', HTTP_X_FORWARDED_FOR='10.9.9.9')
+        self.assertEqual(client_ip(request), '203.0.113.7')
+        
+        with override_settings(LOGIN_THROTTLE_TRUSTED_PROXIES=['10.0.0.2', '10.0.0.3']):
+            self.assertEqual(client_ip(request), '203.0.113.7')
+            proxied = factory.get(
+                '/', REMOTE_ADDR='10.0.0.2', HTTP_X_FORWARDED_FOR='1.2.3.4, 198.51.100.5, 10.0.0.3'
+            )
+            self.assertEqual(client_ip(proxied), '198.51.100.5')
+    
+    def test_spoofed_forwarded_for_shares_ip_bucket(self):
+        """Test rotating X-Forwarded-For does not give a client fresh IP buckets."""
+        statuses = [
+            self.client.post(
+                '/api/users/login', {'username': f'user{i}', 'password': 'wrong-password'},
+                content_type='application/json', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'10.1.0.{i}'
+            ).status_code
+            for i in range(6)
+        ]
+        
+        self.assertEqual(statuses, [401] * 5 + [429])
+
+
+class UserRegistrationTest(TestCase):
+    """Test single and bulk registration"""
+    
+    def test_register_is_one_insert(self):
+        """Test registration writes without a prior existence query."""
+        with CaptureQueriesContext(connection) as queries:
+            user = UserService.register('Newcomer', 'secret123')
+        
+        statements = [q['sql'] for q in queries if not q['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        self.assertEqual(len(statements), 1)
+        self.assertTrue(statements[0].startswith('INSERT'))
+        self.assertEqual(user.username, 'newcomer')
+    
+    def test_register_taken_username(self):
+        """Test a taken username maps the constraint error and keeps the transaction usable."""
+        UserService.register('taken', 'secret123')
+        
+        with self.assertRaises(ValueError) as raised:
+            UserService.register(' TAKEN ', 'secret123')
+        
+        self.assertEqual(str(raised.exception), 'Username already exists')
+        self.assertEqual(User.objects.count(), 1)
+    
+    def bulk_register(self, users, token='svc-token'):
+        extra = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        return self.client.post(
+            '/api/users/bulk-register', {'users': users}, content_type='application/json', **extra
+        )
+    
+    @override_settings(USER_BULK_REGISTER_TOKEN='svc-token')
+    def test_bulk_register(self):
+        """Test bulk registration creates valid users and reports failures in order."""
+        UserService.register('existing', 'secret123')
+        
+        response = self.bulk_register([
+            {'username': 'Alpha', 'password': 'secret123'},
+            {'username': 'ab', 'password': 'secret123'},
+            {'username': 'alpha', 'password': 'secret456'},
+            {'username': 'existing', 'password': 'secret123'},
+            {'username': 'beta', 'password': 'secret789'},
+        ])
+        
+        body = response.json()
+        self.assertEqual((body['created'], body['failed']), (2, 3))
+        self.assertEqual(
+            [r['error'] for r in body['results']],
+            [None, 'Username must be at least 3 characters', 'Duplicate username in request',
+             'Username already exists', None]
+        )
+        self.assertEqual(UserService.login('beta', 'secret789').id, body['results'][4]['id'])
+        self.assertEqual(UserService.login('alpha', 'secret123').id, body['results'][0]['id'])
+    
+    def test_bulk_register_needs_service_token(self):
+        """Test bulk registration is refused without the configured service token."""
+        users = [{'username': 'gamma', 'password': 'secret123'}]
+        
+        self.assertEqual(self.bulk_register(users).status_code, 401)
+        with override_settings(USER_BULK_REGISTER_TOKEN='svc-token'):
+            self.assertEqual(self.bulk_register(users, token=None).status_code, 401)
+            self.assertEqual(self.bulk_register(users, token='wrong').status_code, 401)
+        self.assertFalse(User.objects.filter(username='gamma').exists())
+    
+    @override_settings(USER_BULK_REGISTER_TOKEN='svc-token', USER_BULK_REGISTER_MAX_USERS=2)
+    def test_bulk_register_is_capped(self):
+        """Test requests over USER_BULK_REGISTER_MAX_USERS are rejected before hashing."""
+        users = [{'username': f'capped{i}', 'password': 'secret123'} for i in range(3)]
+        
+        with self.assertNumQueries(0):
+            response = self.bulk_register(users)
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('At most 2 users', response.json()['error'])
+    
+    def test_hash_passwords_in_processes(self):
+        """Test pooled hashing returns verifiable hashes in input order."""
+        hashes = hash_passwords(['first-pw', 'second-pw', 'third-pw'], workers=2)
+        
+        self.assertTrue(check_password('first-pw', hashes[0]))
+        self.assertTrue(check_password('third-pw', hashes[2]))
+        self.assertFalse(check_password('first-pw', hashes[1]))
+
+
+class LoadUsersCommandTest(TestCase):
+    """Test the batched load_users command"""
+    
+    def test_load_users(self):
+        """Test new users are created in chunks and existing or invalid ones skipped."""
+        UserService.register('existing', 'secret123')
+        users = [
+            {'username': 'first', 'password': 'secret123'},
+            {'username': 'Existing', 'password': 'secret123'},
+            {'username': 'second', 'password': 'short'},
+            {'username': 'third', 'password': 'secret456'},
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            data_file = Path(directory) / 'users.json'
+            data_file.write_text(json.dumps(users))
+            out = io.StringIO()
+            call_command('load_users', file=data_file, workers=1, batch_size=2, stdout=out)
+        
+        output = out.getvalue()
+        self.assertIn('2 processed, 1 created', output)
+        self.assertIn('4 processed, 2 created', output)
+        self.assertIn('Successfully created 2 users (skipped: 2)', output)
+        self.assertEqual(UserService.login('third', 'secret456').username, 'third')
+        self.assertEqual(User.objects.count(), 3)
+    
+    def test_batch_size_is_validated(self):
+        """Test a batch size outside 1..MAX_BULK_USERS is a command error, not a crash mid-file."""
+        for batch_size in (0, MAX_BULK_USERS + 1):
+            with self.assertRaises(CommandError):
+                call_command('load_users', workers=1, batch_size=batch_size, stdout=io.StringIO())
@@ -0,0 +1,165 @@
+"""
+Login Throttle - Token buckets in front of password hashing
+
+Every login attempt takes a token from the bucket of its username and from
+the bucket of its client IP; an empty bucket rejects the attempt before
+User.check_password runs. Buckets refill continuously at `per_minute`
+tokens a minute up to `burst`.
+
+The memory backend keeps buckets in this process. The cache backend keeps
+them in a Django cache so workers share limits; its read-modify-write is
+not atomic, so concurrent attempts can occasionally both pass.
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class ThrottleBackend(ABC):
+    """Storage of token buckets"""
+
+    @abstractmethod
+    def consume(self, key: str, burst: int, per_minute: float, now: float) -> Tuple[bool, float]:
+        """Take one token; returns (allowed, seconds until a token is available)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Refill every bucket"""
+        raise NotImplementedError
+
+    @staticmethod
+    def _take(state: Optional[Tuple[float, float]], burst: int, per_minute: float, now: float):
+        """Refill a (tokens, updated_at) state up to now and take a token from it"""
+        tokens, updated_at = state if state is not None else (burst, now)
+        rate = per_minute / 60
+        tokens = min(burst, tokens + (now - updated_at) * rate)
+        if tokens >= 1:
+            return True, 0.0, (tokens - 1, now)
+        return False, (1 - tokens) / rate, (tokens, now)
+
+
+class MemoryThrottleBackend(ThrottleBackend):
+    """Buckets in a bounded per-process LRU (least recently used keys are dropped)"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, burst: int, per_minute: float, now: float) -> Tuple[bool, float]:
+        with self._lock:
+            allowed, retry_after, state = self._take(self._buckets.get(key), burst, per_minute, now)
+            self._buckets[key] = state
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheThrottleBackend(ThrottleBackend):
+    """Buckets in a Django cache, shared by every worker using that cache"""
+
+    key_prefix = "login-throttle"
+
+    def __init__(self, alias: str):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def consume(self, key: str, burst: int, per_minute: float, now: float) -> Tuple[bool, float]:
+        cache_key = f"{self.key_prefix}:{key}"
+        allowed, retry_after, state = self._take(self.cache.get(cache_key), burst, per_minute, now)
+        # A bucket left alone this long is full again, so it can expire
+        self.cache.set(cache_key, state, int(burst * 60 / per_minute) + 1)
+        return allowed, retry_after
+
+    def clear(self) -> None:
+        # Buckets expire on their own; clearing the whole cache is left to the caller
+        pass
+
+
+class LoginThrottle:
+    """Per-username and per-IP login limits with throttled-request counters"""
+
+    def __init__(self, backend: Optional[ThrottleBackend] = None, clock=time.time):
+        if backend is None:
+            if settings.LOGIN_THROTTLE_BACKEND == "cache":
+                backend = CacheThrottleBackend(settings.LOGIN_THROTTLE_CACHE_ALIAS)
+            else:
+                backend = MemoryThrottleBackend()
+        self.backend = backend
+        self.clock = clock
+        self._counts = {"checked": 0, "throttled_username": 0, "throttled_ip": 0}
+        self._lock = threading.Lock()
+
+    def check(self, username: str, ip: str) -> Tuple[bool, float]:
+        """
+        Take a token for the IP and then the username.
+        Returns (allowed, retry_after seconds); a rejected IP does not
+        spend the username's token.
+        """
+        if not settings.LOGIN_THROTTLE_ENABLED:
+            return True, 0.0
+        now = self.clock()
+        limits = (
+            ("ip", ip, settings.LOGIN_THROTTLE_IP_BURST, settings.LOGIN_THROTTLE_IP_PER_MINUTE),
+            ("username", username.lower().strip(), settings.LOGIN_THROTTLE_USERNAME_BURST,
+             settings.LOGIN_THROTTLE_USERNAME_PER_MINUTE),
+        )
+        with self._lock:
+            self._counts["checked"] += 1
+        for kind, value, burst, per_minute in limits:
+            allowed, retry_after = self.backend.consume(f"{kind}:{value}", burst, per_minute, now)
+            if not allowed:
+                with self._lock:
+                    self._counts[f"throttled_{kind}"] += 1
+                return False, retry_after
+        return True, 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Attempt and throttle counters of this process"""
+        with self._lock:
+            counts = dict(self._counts)
+        counts["throttled"] = counts["throttled_username"] + counts["throttled_ip"]
+        return counts
+
+    def reset(self) -> None:
+        """Zero the counters and refill the buckets"""
+        with self._lock:
+            for name in self._counts:
+                self._counts[name] = 0
+        self.backend.clear()
+
+
+def client_ip(request) -> str:
+    """
+    Client address. Requests from a LOGIN_THROTTLE_TRUSTED_PROXIES address
+    use the last X-Forwarded-For hop that is not a trusted proxy; anyone
+    else could put any address in that header, so without a trusted proxy
+    it is ignored and REMOTE_ADDR is used.
+    """
+    remote_addr = request.META.get("REMOTE_ADDR", "")
+    trusted = settings.LOGIN_THROTTLE_TRUSTED_PROXIES
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR")
+    if not forwarded or remote_addr not in trusted:
+        return remote_addr
+    for hop in reversed(forwarded.split(",")):
+        hop = hop.strip()
+        if hop and hop not in trusted:
+            return hop
+    return remote_addr
+
+
+login_throttle = LoginThrottle()
@@ -2,26 +2,171 @@
 Vehicle Service Layer - Uses domain entities and repository abstraction
 """
 from datetime import date
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
-from vehicle.domain.entities import Vehicle as VehicleEntity
-from vehicle.domain.repositories import VehicleRepository
+from rentalbe.pagination import clamp_limit, decode_cursor, encode_cursor
+from vehicle.domain.entities import (
+    UpsertResult,
+    Vehicle as VehicleEntity,
+    VehicleFilter,
+    VEHICLE_FIELDS,
+    VEHICLE_SORT_FIELDS,
+)
+from vehicle.domain.pricing import quote_totals, rental_days
+from vehicle.domain.repositories import AsyncVehicleRepository, VehicleRepository
 from vehicle.domain.exceptions import VehicleNotFoundError
+from vehicle.infrastructure.repositories.async_vehicle_repository import (
+    AsyncDjangoVehicleRepository,
+    SyncToAsyncVehicleRepository,
+)
+from vehicle.infrastructure.repositories.cached_vehicle_repository import (
+    AsyncCachedVehicleRepository,
+    CachedVehicleRepository,
+)
 from vehicle.infrastructure.repositories.vehicle_repository import DjangoVehicleRepository
-from vehicle.presentation.schemas import CreateVehicleRequest, UpdateVehicleRequest
+from vehicle.infrastructure.search_cache import VehicleSearchCache, vehicle_search_cache
+from vehicle.presentation.schemas import BulkVehicleItem, CreateVehicleRequest, UpdateVehicleRequest
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+PRICE_BUCKET_SIZE = 100000
+MAX_BULK_VEHICLES = 2000
+BULK_BATCH_SIZE = 500
+MAX_QUOTE_VEHICLES = 5000
 
 
 class VehicleService:
     """Service layer for vehicle operations (decoupled from ORM)"""
 
-    def __init__(self, repository: VehicleRepository = None):
-        self.repository = repository or DjangoVehicleRepository()
+    def __init__(
+        self,
+        repository: VehicleRepository = None,
+        search_cache: VehicleSearchCache = None,
+        async_repository: AsyncVehicleRepository = None,
+    ):
+        if repository is None:
+            repository = CachedVehicleRepository(DjangoVehicleRepository())
+            async_repository = async_repository or AsyncCachedVehicleRepository(
+                AsyncDjangoVehicleRepository(), repository
+            )
+        self.repository = repository
+        # A custom sync repository is also used for async reads, in a worker thread
+        self.async_repository = async_repository or SyncToAsyncVehicleRepository(repository)
+        self.search_cache = search_cache or vehicle_search_cache
 
     def get_all_vehicles(self) -> List[Dict[str, Any]]:
         """Get all vehicles"""
         vehicles = self.repository.list_all()
         return [self._entity_to_dict(v) for v in vehicles]
 
+    def iter_vehicle_rows(self, filters: Optional[VehicleFilter] = None) -> Iterator[Tuple]:
+        """Stream vehicles as tuples in VEHICLE_FIELDS order (read-only fast path)"""
+        return self.repository.iter_rows(filters)
+
+    def list_vehicles(
+        self,
+        filters: Optional[VehicleFilter] = None,
+        sort: str = "id",
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Get one page of vehicles ordered by `sort` ("-" prefix for descending).
+        Returns the page and the cursor of the next page (None on the last page).
+        """
+        field, descending, after, limit = self._page_args(sort, cursor, limit)
+        # Fetch one extra row to know whether there is a next page
+        rows = self.repository.list_page(filters, field, descending, after, limit + 1)
+        return self._page_result(rows, sort, field, limit)
+
+    async def alist_vehicles(
+        self,
+        filters: Optional[VehicleFilter] = None,
+        sort: str = "id",
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Async list_vehicles"""
+        field, descending, after, limit = self._page_args(sort, cursor, limit)
+        rows = await self.async_repository.list_page(filters, field, descending, after, limit + 1)
+        return self._page_result(rows, sort, field, limit)
+
+    def quote_vehicles(
+        self,
+        start_date: date,
+        end_date: date,
+        vehicle_ids: Optional[List[int]] = None,
+        filters: Optional[VehicleFilter] = None,
+        weekday_multiplier: float = 1.0,
+        weekend_multiplier: float = 1.0,
+    ) -> Dict[str, Any]:
+        """
+        Price every selected vehicle over [start_date, end_date)
+        Vehicles are picked by id, by list filters, or both; one query fetches
+        the rates and the day counts are shared by every vehicle
+        """
+        if vehicle_ids is None and (filters is None or filters == VehicleFilter()):
+            raise ValueError("Pass vehicle_ids or at least one filter")
+        if vehicle_ids is not None and len(vehicle_ids) > MAX_QUOTE_VEHICLES:
+            raise ValueError(f"At most {MAX_QUOTE_VEHICLES} vehicle_ids per quote")
+        days = rental_days(start_date, end_date)
+
+        # One row over the cap tells a filter that selects too many vehicles
+        rates = self.repository.list_rates(vehicle_ids, filters, MAX_QUOTE_VEHICLES + 1)
+        if len(rates) > MAX_QUOTE_VEHICLES:
+            raise ValueError(f"The filters select more than {MAX_QUOTE_VEHICLES} vehicles, narrow them")
+        ids = [vehicle_id for vehicle_id, _ in rates]
+        daily_rates = [rate for _, rate in rates]
+
+        missing_ids = []
+        if vehicle_ids is not None and len(ids) < len(set(vehicle_ids)):
+            found = set(ids)
+            missing_ids = sorted({i for i in vehicle_ids if i not in found})
+        # Columns rather than one object per vehicle: no per-row schema work
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "days": days.total,
+            "weekdays": days.weekdays,
+            "weekend_days": days.weekend_days,
+            "vehicle_ids": ids,
+            "daily_rates": daily_rates,
+            "totals": quote_totals(daily_rates, days, weekday_multiplier, weekend_multiplier),
+            "missing_ids": missing_ids,
+        }
+
+    @staticmethod
+    def _page_args(sort: str, cursor: Optional[str], limit: int):
+        """Validate sort, cursor and limit into (field, descending, after, limit)"""
+        descending = sort.startswith("-")
+        field = sort.lstrip("-")
+        if field not in VEHICLE_SORT_FIELDS:
+            raise ValueError(f"Invalid sort, expected one of: {', '.join(VEHICLE_SORT_FIELDS)}")
+        limit = clamp_limit(limit, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+
+        after = None
+        if cursor:
+            # The cursor is bound to its sort so it cannot be replayed against another
+            values = decode_cursor(cursor)
+            value_type = str if field == "name" else int
+            if (
+                len(values) != 3 or values[0] != sort
+                or not isinstance(values[1], value_type) or not isinstance(values[2], int)
+            ):
+                raise ValueError("Invalid cursor")
+            after = (values[1], values[2])
+        return field, descending, after, limit
+
+    @staticmethod
+    def _page_result(rows: List[Tuple], sort: str, field: str, limit: int):
+        """Page items as dicts plus the next cursor (rows holds up to limit + 1)"""
+        items = [dict(zip(VEHICLE_FIELDS, row)) for row in rows[:limit]]
+        if len(rows) <= limit:
+            return items, None
+
+        last = items[-1]
+        return items, encode_cursor(sort, last[field], last["id"])
+
     def get_vehicle_by_id(self, vehicle_id: int) -> Dict[str, Any]:
         """Get a specific vehicle by ID"""
         vehicle = self.repository.get_by_id(vehicle_id)
@@ -29,15 +174,57 @@ class VehicleService:
             raise VehicleNotFoundError(f"Vehicle with id {vehicle_id} not found")
         return self._entity_to_dict(vehicle)
 
+    async def aget_vehicle_by_id(self, vehicle_id: int) -> Dict[str, Any]:
+        """Async get_vehicle_by_id"""
+        vehicle = await self.async_repository.get_by_id(vehicle_id)
+        if not vehicle:
+            raise VehicleNotFoundError(f"Vehicle with id {vehicle_id} not found")
+        return self._entity_to_dict(vehicle)
+
     def search_available_vehicles(
         self,
         start_date: date,
         end_date: date,
         location: str,
-    ) -> List[Dict[str, Any]]:
-        """Get available vehicles by date range and location"""
-        vehicles = self.repository.list_available(location, start_date, end_date)
-        return [self._entity_to_dict(v) for v in vehicles]
+        facets: bool = False,
+        price_bucket: int = PRICE_BUCKET_SIZE,
+    ):
+        """
+        Get available vehicles by date range and location (cached per location)
+        With facets=True returns {"vehicles": [...], "facets": {...}} instead,
+        the facets being computed from the same result set
+        """
+        # Key (and version) taken before the query; see VehicleSearchCache
+        key = self.search_cache.key(location, start_date, end_date)
+        results = self.search_cache.get(key)
+        if results is None:
+            vehicles = self.repository.list_available(location, start_date, end_date)
+            results = [self._entity_to_dict(v) for v in vehicles]
+            self.search_cache.set(key, results)
+
+        if not facets:
+            return results
+        return {"vehicles": results, "facets": self._facets(results, price_bucket)}
+
+    async def asearch_available_vehicles(
+        self,
+        start_date: date,
+        end_date: date,
+        location: str,
+        facets: bool = False,
+        price_bucket: int = PRICE_BUCKET_SIZE,
+    ):
+        """Async search_available_vehicles"""
+        key = await self.search_cache.akey(location, start_date, end_date)
+        results = await self.search_cache.aget(key)
+        if results is None:
+            vehicles = await self.async_repository.list_available(location, start_date, end_date)
+            results = [self._entity_to_dict(v) for v in vehicles]
+            await self.search_cache.aset(key, results)
+
+        if not facets:
+            return results
+        return {"vehicles": results, "facets": self._facets(results, price_bucket)}
 
     def create_vehicle(self, payload: CreateVehicleRequest) -> Dict[str, Any]:
         """Create a new vehicle"""
@@ -55,6 +242,7 @@ class VehicleService:
                 location=payload.location,
             )
             saved = self.repository.save(entity)
+            self.search_cache.invalidate_locations([saved.location])
             return self._entity_to_dict(saved)
         except Exception as e:
             print(f"Error in service.create_vehicle: {e}")
@@ -71,6 +259,7 @@ class VehicleService:
         vehicle = self.repository.get_by_id(vehicle_id)
         if not vehicle:
             raise VehicleNotFoundError(f"Vehicle with id {vehicle_id} not found")
+        previous_location = vehicle.location
 
         if payload.name is not None:
             vehicle.name = payload.name
@@ -92,8 +281,58 @@ class VehicleService:
             vehicle.location = payload.location
 
         updated = self.repository.save(vehicle)
+        # Cached results embed every vehicle field, so any change invalidates
+        self.search_cache.invalidate_locations([previous_location, updated.location])
         return self._entity_to_dict(updated)
 
+    def upsert_vehicles(self, items: List[BulkVehicleItem]) -> Dict[str, Any]:
+        """
+        Create or update vehicles keyed on plate_number, all in one transaction
+        Returns per-item results in input order plus totals; a plate repeated
+        within the request fails on its later occurrences
+        """
+        if len(items) > MAX_BULK_VEHICLES:
+            raise ValueError(f"At most {MAX_BULK_VEHICLES} vehicles per request")
+
+        results: List[Dict[str, Any]] = []
+        entities, positions, seen = [], [], set()
+        for item in items:
+            if item.plate_number in seen:
+                results.append({
+                    "plate_number": item.plate_number,
+                    "status": "failed",
+                    "id": None,
+                    "error": "Duplicate plate_number in request",
+                })
+                continue
+            seen.add(item.plate_number)
+            positions.append(len(results))
+            results.append(None)
+            entities.append(VehicleEntity(id=None, **item.dict()))
+
+        saved = self.repository.save_many(entities, BULK_BATCH_SIZE) if entities else []
+
+        touched_locations = set()
+        for position, result in zip(positions, saved):
+            results[position] = {
+                "plate_number": result.vehicle.plate_number,
+                "status": result.status,
+                "id": result.vehicle.id,
+                "error": None,
+            }
+            if result.status != UpsertResult.UNCHANGED:
+                touched_locations.add(result.vehicle.location)
+                if result.previous is not None:
+                    touched_locations.add(result.previous.location)
+        self.search_cache.invalidate_locations(touched_locations)
+
+        totals = {status: 0 for status in (
+            UpsertResult.CREATED, UpsertResult.UPDATED, UpsertResult.UNCHANGED, "failed"
+        )}
+        for result in results:
+            totals[result["status"]] += 1
+        return {**totals, "results": results}
+
     def delete_vehicle(self, vehicle_id: int) -> str:
         """Delete a vehicle and return success message"""
         vehicle = self.repository.get_by_id(vehicle_id)
@@ -102,8 +341,46 @@ class VehicleService:
         
         vehicle_name = vehicle.name
         self.repository.delete(vehicle_id)
+        self.search_cache.invalidate_locations([vehicle.location])
         return f"Vehicle '{vehicle_name}' deleted successfully"
 
+    @staticmethod
+    def _facets(vehicles: List[Dict[str, Any]], price_bucket: int) -> Dict[str, Any]:
+        """Brand, location and price bucket counts plus rate range, in one pass"""
+        if price_bucket <= 0:
+            raise ValueError("price_bucket must be positive")
+
+        brands: Dict[str, int] = {}
+        locations: Dict[str, int] = {}
+        buckets: Dict[int, int] = {}
+        min_rate = max_rate = None
+        for vehicle in vehicles:
+            rate = vehicle["daily_rate"]
+            brands[vehicle["brand"]] = brands.get(vehicle["brand"], 0) + 1
+            locations[vehicle["location"]] = locations.get(vehicle["location"], 0) + 1
+            bucket = rate // price_bucket * price_bucket
+            buckets[bucket] = buckets.get(bucket, 0) + 1
+            if min_rate is None or rate < min_rate:
+                min_rate = rate
+            if max_rate is None or rate > max_rate:
+                max_rate = rate
+
+        def counts(values: Dict[str, int]) -> List[Dict[str, Any]]:
+            # Most common first, ties by name so the order is stable
+            ordered = sorted(values.items(), key=lambda item: (-item[1], item[0]))
+            return [{"value": value, "count": count} for value, count in ordered]
+
+        return {
+            "brands": counts(brands),
+            "locations": counts(locations),
+            "price_buckets": [
+                {"min": bucket, "max": bucket + price_bucket - 1, "count": buckets[bucket]}
+                for bucket in sorted(buckets)
+            ],
+            "min_daily_rate": min_rate,
+            "max_daily_rate": max_rate,
+        }
+
     @staticmethod
     def _entity_to_dict(vehicle: VehicleEntity) -> Dict[str, Any]:
         """Convert Vehicle entity to dictionary"""
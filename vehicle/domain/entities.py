@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, fields
+from typing import FrozenSet, Optional
 
 
 @dataclass
@@ -16,6 +16,31 @@ class Vehicle:
     is_available: bool
     location: str
 
+    # ========== CHANGE TRACKING ==========
+    # Every field of a new entity counts as changed; repositories call
+    # mark_clean() on entities they load, so later assignments record the
+    # columns an UPDATE has to write. An assignment counts even when the value
+    # matches the loaded one: the entity may come from a cache that is behind
+    # the database, and skipping the write would silently drop it.
+
+    def __post_init__(self):
+        object.__setattr__(self, "_changed", set(VEHICLE_FIELDS))
+
+    def __setattr__(self, name, value):
+        changed = self.__dict__.get("_changed")
+        if changed is not None and name in VEHICLE_FIELDS:
+            changed.add(name)
+        object.__setattr__(self, name, value)
+
+    def changed_fields(self) -> FrozenSet[str]:
+        """Fields assigned since the entity was loaded or saved"""
+        return frozenset(self._changed)
+
+    def mark_clean(self) -> "Vehicle":
+        """Record the entity as matching its stored row"""
+        self._changed.clear()
+        return self
+
     def mark_unavailable(self) -> None:
         """Mark vehicle as not available"""
         self.is_available = False
@@ -27,3 +52,53 @@ class Vehicle:
     def can_be_booked(self) -> bool:
         """Check if vehicle can be booked"""
         return self.is_available
+
+
+@dataclass
+class UpsertResult:
+    """Outcome of one vehicle in VehicleRepository.save_many"""
+    CREATED = "created"
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"
+
+    vehicle: Vehicle
+    status: str
+    previous: Optional[Vehicle] = None
+
+
+# Column order of the tuple rows produced by VehicleRepository.iter_rows
+VEHICLE_FIELDS = tuple(f.name for f in fields(Vehicle))
+
+
+# Columns GET /vehicles/ may sort on; each sort is paired with id as tie-breaker
+VEHICLE_SORT_FIELDS = ("id", "name", "year", "daily_rate")
+
+
+@dataclass
+class VehicleFilter:
+    """Optional list filters; None means "any" (ranges are inclusive)"""
+    brand: Optional[str] = None
+    location: Optional[str] = None
+    min_year: Optional[int] = None
+    max_year: Optional[int] = None
+    min_daily_rate: Optional[int] = None
+    max_daily_rate: Optional[int] = None
+    is_available: Optional[bool] = None
+
+    def matches(self, vehicle: Vehicle) -> bool:
+        """Check a vehicle against the filters (brand/location ignore case)"""
+        if self.brand is not None and vehicle.brand.lower() != self.brand.strip().lower():
+            return False
+        if self.location is not None and vehicle.location.lower() != self.location.strip().lower():
+            return False
+        if self.min_year is not None and vehicle.year < self.min_year:
+            return False
+        if self.max_year is not None and vehicle.year > self.max_year:
+            return False
+        if self.min_daily_rate is not None and vehicle.daily_rate < self.min_daily_rate:
+            return False
+        if self.max_daily_rate is not None and vehicle.daily_rate > self.max_daily_rate:
+            return False
+        if self.is_available is not None and vehicle.is_available != self.is_available:
+            return False
+        return True
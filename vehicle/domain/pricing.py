@@ -0,0 +1,61 @@
+"""
+Pricing - Rental totals from daily rates
+
+A rental from start_date to end_date is charged per day in
+[start_date, end_date), so the days counted are end_date - start_date.
+Saturday and Sunday are weekend days.
+"""
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Sequence
+
+WEEKEND_DAYS = (5, 6)
+
+
+@dataclass(frozen=True)
+class RentalDays:
+    """Weekday/weekend split of a date range"""
+    weekdays: int
+    weekend_days: int
+
+    @property
+    def total(self) -> int:
+        return self.weekdays + self.weekend_days
+
+    def rate_factor(self, weekday_multiplier: float = 1.0, weekend_multiplier: float = 1.0) -> float:
+        """What a daily rate is multiplied by to price the whole range"""
+        return self.weekdays * weekday_multiplier + self.weekend_days * weekend_multiplier
+
+
+def rental_days(start_date: date, end_date: date) -> RentalDays:
+    """Count weekdays and weekend days in [start_date, end_date) without walking the range"""
+    if start_date >= end_date:
+        raise ValueError("Start date must be before end date")
+
+    full_weeks, rest = divmod((end_date - start_date).days, 7)
+    first = start_date.weekday()
+    weekend_days = full_weeks * len(WEEKEND_DAYS) + sum(
+        1 for offset in range(rest) if (first + offset) % 7 in WEEKEND_DAYS
+    )
+    return RentalDays(weekdays=full_weeks * 7 + rest - weekend_days, weekend_days=weekend_days)
+
+
+def quote_totals(
+    daily_rates: Sequence[int],
+    days: RentalDays,
+    weekday_multiplier: float = 1.0,
+    weekend_multiplier: float = 1.0,
+) -> List[int]:
+    """
+    Totals for many daily rates over the same range. The day counts and
+    multipliers collapse into one factor, so each rate costs one multiply.
+    """
+    if weekday_multiplier <= 0 or weekend_multiplier <= 0:
+        raise ValueError("Multipliers must be positive")
+
+    factor = days.rate_factor(weekday_multiplier, weekend_multiplier)
+    if factor == int(factor):
+        # Integer fast path: exact for any rate
+        factor = int(factor)
+        return [rate * factor for rate in daily_rates]
+    return [round(rate * factor) for rate in daily_rates]
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from datetime import date
-from typing import List, Optional
-from vehicle.domain.entities import Vehicle
+from typing import Any, Iterator, List, Optional, Tuple
+from vehicle.domain.entities import UpsertResult, Vehicle, VehicleFilter, VEHICLE_FIELDS
 
 
 class VehicleRepository(ABC):
@@ -13,10 +13,56 @@ class VehicleRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def list_all(self) -> List[Vehicle]:
-        """List all vehicles"""
+    def list_all(self, filters: Optional[VehicleFilter] = None) -> List[Vehicle]:
+        """List all vehicles, optionally filtered"""
         raise NotImplementedError
 
+    def iter_rows(self, filters: Optional[VehicleFilter] = None) -> Iterator[Tuple]:
+        """
+        Stream vehicles as plain tuples in VEHICLE_FIELDS order.
+        Read-only fast path; implementations should avoid building entities.
+        """
+        for vehicle in self.list_all(filters):
+            yield tuple(getattr(vehicle, name) for name in VEHICLE_FIELDS)
+
+    def list_page(
+        self,
+        filters: Optional[VehicleFilter] = None,
+        sort: str = "id",
+        descending: bool = False,
+        after: Optional[Tuple[Any, int]] = None,
+        limit: int = 50,
+    ) -> List[Tuple]:
+        """
+        One page of tuple rows ordered by (sort, id), starting after the
+        (sort value, id) keyset `after`. Sorts list_all() in memory by default.
+        """
+        def key(vehicle):
+            return (getattr(vehicle, sort), vehicle.id)
+
+        vehicles = sorted(self.list_all(filters), key=key, reverse=descending)
+        if after is not None:
+            after = tuple(after)
+            vehicles = [v for v in vehicles if (key(v) < after if descending else key(v) > after)]
+        return [tuple(getattr(v, name) for name in VEHICLE_FIELDS) for v in vehicles[:limit]]
+
+    def list_rates(
+        self,
+        vehicle_ids: Optional[List[int]] = None,
+        filters: Optional[VehicleFilter] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[int, int]]:
+        """
+        (id, daily_rate) pairs in id order, restricted to vehicle_ids when
+        given and to the filters, at most `limit` of them. Filters list_all()
+        in memory by default.
+        """
+        wanted = None if vehicle_ids is None else set(vehicle_ids)
+        return sorted(
+            (v.id, v.daily_rate) for v in self.list_all(filters)
+            if wanted is None or v.id in wanted
+        )[:limit]
+
     @abstractmethod
     def list_available(
         self,
@@ -32,7 +78,47 @@ class VehicleRepository(ABC):
         """Create or update vehicle"""
         raise NotImplementedError
 
+    @abstractmethod
+    def save_many(self, vehicles: List[Vehicle], batch_size: int = 500) -> List[UpsertResult]:
+        """
+        Create or update vehicles keyed on plate_number (ids are ignored), all
+        or nothing. Plate numbers must be unique within `vehicles`. Results
+        keep input order; `previous` holds the stored vehicle before an update.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def delete(self, vehicle_id: int) -> None:
         """Delete vehicle by id"""
         raise NotImplementedError
+
+
+class AsyncVehicleRepository(ABC):
+    """Async repository contract for vehicle reads (writes stay on VehicleRepository)"""
+
+    @abstractmethod
+    async def get_by_id(self, vehicle_id: int) -> Optional[Vehicle]:
+        """Fetch vehicle by id"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_page(
+        self,
+        filters: Optional[VehicleFilter] = None,
+        sort: str = "id",
+        descending: bool = False,
+        after: Optional[Tuple[Any, int]] = None,
+        limit: int = 50,
+    ) -> List[Tuple]:
+        """One page of tuple rows ordered by (sort, id), see VehicleRepository.list_page"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_available(
+        self,
+        location: str,
+        start_date: date,
+        end_date: date,
+    ) -> List[Vehicle]:
+        """List available vehicles filtered by location and date range"""
+        raise NotImplementedError
@@ -0,0 +1,34 @@
+"""
+Cache Versions - Shared version stamps for invalidating groups of cache entries
+
+A version lives in the shared cache so every worker sees bumps. Versions start
+from a timestamp, so an evicted stamp never brings old entries back.
+"""
+import time
+
+
+def get_version(cache, key: str) -> int:
+    """Current version stored under key, creating it if missing"""
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(cache, key: str) -> int:
+    """Async get_version"""
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_version(cache, key: str) -> None:
+    """Invalidate every entry stamped with the current version"""
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Stamp evicted or never set; any fresh value invalidates
+        cache.set(key, time.time_ns(), None)
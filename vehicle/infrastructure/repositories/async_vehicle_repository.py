@@ -0,0 +1,73 @@
+from datetime import date
+from typing import Any, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+
+from vehicle.domain.entities import Vehicle as VehicleEntity, VehicleFilter
+from vehicle.domain.repositories import AsyncVehicleRepository, VehicleRepository
+from vehicle.infrastructure.repositories.vehicle_repository import DjangoVehicleRepository
+from vehicle.models import Vehicle as VehicleModel
+
+
+class AsyncDjangoVehicleRepository(AsyncVehicleRepository):
+    """Async vehicle reads on Django's async ORM (same queries as DjangoVehicleRepository)"""
+
+    async def get_by_id(self, vehicle_id: int) -> Optional[VehicleEntity]:
+        """Fetch vehicle by id"""
+        vehicle = await VehicleModel.objects.filter(id=vehicle_id).afirst()
+        if not vehicle:
+            return None
+        return DjangoVehicleRepository._to_entity(vehicle)
+
+    async def list_page(
+        self,
+        filters: Optional[VehicleFilter] = None,
+        sort: str = "id",
+        descending: bool = False,
+        after: Optional[Tuple[Any, int]] = None,
+        limit: int = 50,
+    ) -> List[Tuple]:
+        """One keyset page of tuple rows ordered by (sort, id)"""
+        rows = DjangoVehicleRepository.page_queryset(filters, sort, descending, after, limit)
+        return [row async for row in rows]
+
+    async def list_available(
+        self,
+        location: str,
+        start_date: date,
+        end_date: date,
+    ) -> List[VehicleEntity]:
+        """List available vehicles filtered by location and date range"""
+        vehicles = DjangoVehicleRepository.available_queryset(location, start_date, end_date)
+        return [DjangoVehicleRepository._to_entity(v) async for v in vehicles]
+
+
+class SyncToAsyncVehicleRepository(AsyncVehicleRepository):
+    """Async reads over any sync VehicleRepository, each call run in a worker thread"""
+
+    def __init__(self, inner: VehicleRepository):
+        self.inner = inner
+
+    async def get_by_id(self, vehicle_id: int) -> Optional[VehicleEntity]:
+        """Fetch vehicle by id"""
+        return await sync_to_async(self.inner.get_by_id)(vehicle_id)
+
+    async def list_page(
+        self,
+        filters: Optional[VehicleFilter] = None,
+        sort: str = "id",
+        descending: bool = False,
+        after: Optional[Tuple[Any, int]] = None,
+        limit: int = 50,
+    ) -> List[Tuple]:
+        """One keyset page of tuple rows ordered by (sort, id)"""
+        return await sync_to_async(self.inner.list_page)(filters, sort, descending, after, limit)
+
+    async def list_available(
+        self,
+        location: str,
+        start_date: date,
+        end_date: date,
+    ) -> List[VehicleEntity]:
+        """List available vehicles filtered by location and date range"""
+        return await sync_to_async(self.inner.list_available)(location, start_date, end_date)
@@ -0,0 +1,228 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from datetime import date
+from typing import Any, Hashable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+from vehicle.domain.entities import UpsertResult, Vehicle as VehicleEntity, VehicleFilter
+from vehicle.domain.repositories import AsyncVehicleRepository, VehicleRepository
+from vehicle.infrastructure.cache_versions import aget_version, bump_version, get_version
+
+
+class CachedVehicleRepository(VehicleRepository):
+    """
+    Read-through cache around any VehicleRepository.
+
+    Entries live in a bounded per-process LRU with a TTL. Each entry is stamped
+    with a version kept in Django's shared cache; save/delete bump the version
+    of the vehicle (and of the full list), so every worker drops its copy on
+    the next read.
+    """
+
+    version_prefix = "vehicle-repo:version"
+
+    def __init__(
+        self,
+        inner: VehicleRepository,
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+        alias: Optional[str] = None,
+    ):
+        self.inner = inner
+        self.max_entries = max_entries or settings.VEHICLE_CACHE_MAX_ENTRIES
+        self.ttl = settings.VEHICLE_CACHE_TTL if ttl is None else ttl
+        self.alias = alias or settings.VEHICLE_CACHE_ALIAS
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def versions(self):
+        return caches[self.alias]
+
+    # ========== READS ==========
+
+    def get_by_id(self, vehicle_id: int) -> Optional[VehicleEntity]:
+        """Fetch vehicle by id, from the cache when fresh"""
+        version = self.vehicle_version(vehicle_id)
+        hit, vehicle = self.lookup_vehicle(vehicle_id, version)
+        if not hit:
+            vehicle = self.inner.get_by_id(vehicle_id)
+            if vehicle is None:
+                return None
+            self.store_vehicle(vehicle_id, version, vehicle)
+        return replace(vehicle).mark_clean()
+
+    def list_all(self, filters: Optional[VehicleFilter] = None) -> List[VehicleEntity]:
+        """List all vehicles, from the cache when fresh (filtered lists are not cached)"""
+        if filters is not None:
+            return self.inner.list_all(filters)
+
+        key = ("all",)
+        version = get_version(self.versions, self._version_key("all"))
+        hit, vehicles = self._lookup(key, version)
+        if not hit:
+            vehicles = self.inner.list_all()
+            self._store(key, version, vehicles)
+        return [replace(v).mark_clean() for v in vehicles]
+
+    def iter_rows(self, filters: Optional[VehicleFilter] = None) -> Iterator[Tuple]:
+        """Not cached; the streaming path never holds the fleet in memory"""
+        return self.inner.iter_rows(filters)
+
+    def list_page(
+        self,
+        filters: Optional[VehicleFilter] = None,
+        sort: str = "id",
+        descending: bool = False,
+        after: Optional[Tuple[Any, int]] = None,
+        limit: int = 50,
+    ) -> List[Tuple]:
+        """Not cached; pages are cheap index seeks"""
+        return self.inner.list_page(filters, sort, descending, after, limit)
+
+    def list_rates(
+        self,
+        vehicle_ids: Optional[List[int]] = None,
+        filters: Optional[VehicleFilter] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[int, int]]:
+        """Not cached; a two-column scan is cheaper than rebuilding it from entries"""
+        return self.inner.list_rates(vehicle_ids, filters, limit)
+
+    def list_available(
+        self,
+        location: str,
+        start_date: date,
+        end_date: date,
+    ) -> List[VehicleEntity]:
+        """Not cached here; depends on reservations (see VehicleSearchCache)"""
+        return self.inner.list_available(location, start_date, end_date)
+
+    # ========== WRITES ==========
+
+    def save(self, vehicle: VehicleEntity) -> VehicleEntity:
+        """Create or update vehicle and invalidate its entries"""
+        saved = self.inner.save(vehicle)
+        self.invalidate(saved.id)
+        return saved
+
+    def save_many(self, vehicles: List[VehicleEntity], batch_size: int = 500) -> List[UpsertResult]:
+        """Upsert vehicles and invalidate the entries of those that changed"""
+        results = self.inner.save_many(vehicles, batch_size)
+        changed = [r.vehicle.id for r in results if r.status != UpsertResult.UNCHANGED]
+        if changed:
+            self.invalidate_many(changed)
+        return results
+
+    def delete(self, vehicle_id: int) -> None:
+        """Delete vehicle and invalidate its entries"""
+        try:
+            self.inner.delete(vehicle_id)
+        finally:
+            self.invalidate(vehicle_id)
+
+    def invalidate(self, vehicle_id: Optional[int] = None) -> None:
+        """Drop a vehicle (and the full list) in every worker"""
+        self.invalidate_many([vehicle_id] if vehicle_id is not None else [])
+
+    def invalidate_many(self, vehicle_ids: List[int]) -> None:
+        """Drop vehicles (and the full list) in every worker"""
+        for vehicle_id in vehicle_ids:
+            bump_version(self.versions, self._version_key(vehicle_id))
+        bump_version(self.versions, self._version_key("all"))
+        with self._lock:
+            for vehicle_id in vehicle_ids:
+                self._entries.pop(("id", vehicle_id), None)
+            self._entries.pop(("all",), None)
+
+    # ========== ENTRIES ==========
+    # Read the version before loading a vehicle and store it under that same
+    # version, so a write racing the load leaves a stale stamp behind.
+
+    def vehicle_version(self, vehicle_id: int) -> int:
+        """Current version stamp of a vehicle's entry"""
+        return get_version(self.versions, self._version_key(vehicle_id))
+
+    async def avehicle_version(self, vehicle_id: int) -> int:
+        """Async vehicle_version"""
+        return await aget_version(self.versions, self._version_key(vehicle_id))
+
+    def lookup_vehicle(self, vehicle_id: int, version: int) -> Tuple[bool, Optional[VehicleEntity]]:
+        """(hit, vehicle) of the entry if it is fresh and has this version"""
+        return self._lookup(("id", vehicle_id), version)
+
+    def store_vehicle(self, vehicle_id: int, version: int, vehicle: VehicleEntity) -> None:
+        """Cache a vehicle loaded under `version`"""
+        self._store(("id", vehicle_id), version, vehicle)
+
+    # ========== LRU ==========
+
+    def _lookup(self, key: Hashable, version: int) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, entry_version, value = entry
+            if entry_version != version or (self.ttl and time.monotonic() > expires_at):
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def _store(self, key: Hashable, version: int, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _version_key(self, suffix: Any) -> str:
+        return f"{self.version_prefix}:{suffix}"
+
+
+class AsyncCachedVehicleRepository(AsyncVehicleRepository):
+    """
+    Async reads through the LRU of a CachedVehicleRepository.
+
+    Shares the entries and version stamps of `cached`, so writes made through
+    the sync repository invalidate async reads too.
+    """
+
+    def __init__(self, inner: AsyncVehicleRepository, cached: CachedVehicleRepository):
+        self.inner = inner
+        self.cached = cached
+
+    async def get_by_id(self, vehicle_id: int) -> Optional[VehicleEntity]:
+        """Fetch vehicle by id, from the cache when fresh"""
+        version = await self.cached.avehicle_version(vehicle_id)
+        hit, vehicle = self.cached.lookup_vehicle(vehicle_id, version)
+        if not hit:
+            vehicle = await self.inner.get_by_id(vehicle_id)
+            if vehicle is None:
+                return None
+            self.cached.store_vehicle(vehicle_id, version, vehicle)
+        return replace(vehicle).mark_clean()
+
+    async def list_page(
+        self,
+        filters: Optional[VehicleFilter] = None,
+        sort: str = "id",
+        descending: bool = False,
+        after: Optional[Tuple[Any, int]] = None,
+        limit: int = 50,
+    ) -> List[Tuple]:
+        """Not cached; pages are cheap index seeks"""
+        return await self.inner.list_page(filters, sort, descending, after, limit)
+
+    async def list_available(
+        self,
+        location: str,
+        start_date: date,
+        end_date: date,
+    ) -> List[VehicleEntity]:
+        """Not cached here; depends on reservations (see VehicleSearchCache)"""
+        return await self.inner.list_available(location, start_date, end_date)
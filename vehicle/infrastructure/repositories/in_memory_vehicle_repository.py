@@ -0,0 +1,220 @@
+import heapq
+from dataclasses import replace
+from datetime import date
+from operator import attrgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from reservation.availability_index import VehicleIntervals
+from reservation.models import Reservation
+from vehicle.domain.entities import UpsertResult, Vehicle as VehicleEntity, VehicleFilter, VEHICLE_FIELDS
+from vehicle.domain.repositories import VehicleRepository
+from vehicle.domain.exceptions import DuplicatePlateNumberError, VehicleNotFoundError
+from vehicle.infrastructure.search_cache import normalize_location
+
+# Columns compared and copied by save_many (everything but the primary key)
+WRITABLE_FIELDS = tuple(name for name in VEHICLE_FIELDS if name != "id")
+
+
+class InMemoryVehicleRepository(VehicleRepository):
+    """
+    Vehicle repository held in process memory, for tests and benchmarks.
+
+    Vehicles are kept by id with a plate number index and a normalised
+    location index. Active reservations are kept per vehicle as
+    VehicleIntervals, so list_available uses the same inclusive overlap rule
+    as the database query. Deleted vehicles are simply dropped, like
+    tombstones are hidden from DjangoVehicleRepository. Not thread-safe.
+    """
+
+    def __init__(self, vehicles: Iterable[VehicleEntity] = ()):
+        self._vehicles: Dict[int, VehicleEntity] = {}
+        self._plates: Dict[str, int] = {}
+        self._locations: Dict[str, Set[int]] = {}
+        self._intervals: Dict[int, VehicleIntervals] = {}
+        self._reservation_vehicles: Dict[int, int] = {}
+        self._next_id = 1
+        self._next_reservation_id = 1
+        for vehicle in vehicles:
+            if vehicle.id:
+                # Keep given ids, e.g. when mirroring a database
+                self._check_plate(vehicle.plate_number)
+                self._store(replace(vehicle))
+            else:
+                self.save(vehicle)
+
+    # ========== RESERVATIONS ==========
+
+    def add_reservation(
+        self,
+        vehicle_id: int,
+        start_date: date,
+        end_date: date,
+        status: str = "pending",
+        reservation_id: Optional[int] = None,
+    ) -> int:
+        """Record a reservation of a vehicle; only active statuses block it"""
+        if reservation_id is None:
+            reservation_id = self._next_reservation_id
+        self._next_reservation_id = max(self._next_reservation_id, reservation_id + 1)
+        self.remove_reservation(reservation_id)
+        if status in Reservation.ACTIVE_STATUSES:
+            self._intervals.setdefault(vehicle_id, VehicleIntervals()).add(reservation_id, start_date, end_date)
+            self._reservation_vehicles[reservation_id] = vehicle_id
+        return reservation_id
+
+    def remove_reservation(self, reservation_id: int) -> None:
+        """Forget a reservation (cancelled, completed or deleted)"""
+        vehicle_id = self._reservation_vehicles.pop(reservation_id, None)
+        if vehicle_id is not None:
+            self._intervals[vehicle_id].discard(reservation_id)
+
+    # ========== READS ==========
+
+    def get_by_id(self, vehicle_id: int) -> Optional[VehicleEntity]:
+        """Fetch vehicle by id"""
+        vehicle = self._vehicles.get(vehicle_id)
+        return None if vehicle is None else self._copy(vehicle)
+
+    def list_all(self, filters: Optional[VehicleFilter] = None) -> List[VehicleEntity]:
+        """List all vehicles in id order, optionally filtered"""
+        return [self._copy(v) for v in self._matching(filters)]
+
+    def iter_rows(self, filters: Optional[VehicleFilter] = None) -> Iterator[Tuple]:
+        """Stream vehicles as tuples in id order"""
+        for vehicle in self._matching(filters):
+            yield tuple(getattr(vehicle, name) for name in VEHICLE_FIELDS)
+
+    def list_page(
+        self,
+        filters: Optional[VehicleFilter] = None,
+        sort: str = "id",
+        descending: bool = False,
+        after: Optional[Tuple[Any, int]] = None,
+        limit: int = 50,
+    ) -> List[Tuple]:
+        """One keyset page ordered by (sort, id); a heap keeps only `limit` candidates"""
+        key = attrgetter(sort, "id")
+        vehicles = self._matching(filters)
+        if after is not None:
+            after = tuple(after)
+            vehicles = [v for v in vehicles if (key(v) < after if descending else key(v) > after)]
+        select = heapq.nlargest if descending else heapq.nsmallest
+        return [tuple(getattr(v, name) for name in VEHICLE_FIELDS) for v in select(limit, vehicles, key=key)]
+
+    def list_rates(
+        self,
+        vehicle_ids: Optional[List[int]] = None,
+        filters: Optional[VehicleFilter] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[int, int]]:
+        """(id, daily_rate) pairs in id order"""
+        if vehicle_ids is None:
+            vehicles = self._matching(filters)
+        else:
+            vehicles = (self._vehicles[i] for i in sorted(set(vehicle_ids)) if i in self._vehicles)
+            vehicles = [v for v in vehicles if filters is None or filters.matches(v)]
+        return [(v.id, v.daily_rate) for v in vehicles][:limit]
+
+    def list_available(
+        self,
+        location: str,
+        start_date: date,
+        end_date: date,
+    ) -> List[VehicleEntity]:
+        """Available vehicles of a location (ignoring case) with no active reservation overlapping the range"""
+        available = []
+        for vehicle_id in sorted(self._locations.get(normalize_location(location), ())):
+            vehicle = self._vehicles[vehicle_id]
+            if not vehicle.is_available:
+                continue
+            intervals = self._intervals.get(vehicle_id)
+            if intervals is None or not intervals.overlaps(start_date, end_date):
+                available.append(self._copy(vehicle))
+        return available
+
+    # ========== WRITES ==========
+
+    def save(self, vehicle: VehicleEntity) -> VehicleEntity:
+        """
+        Create or update vehicle
+        Updates copy only the changed fields, like the single-column UPDATE
+        of DjangoVehicleRepository
+        """
+        if not vehicle.id:
+            self._check_plate(vehicle.plate_number)
+            created = replace(vehicle, id=self._next_id)
+            self._store(created)
+            return self._copy(created)
+
+        stored = self._vehicles.get(vehicle.id)
+        if stored is None:
+            raise VehicleNotFoundError(f"Vehicle with id {vehicle.id} not found")
+        changed = vehicle.changed_fields()
+        if "plate_number" in changed:
+            self._check_plate(vehicle.plate_number, vehicle.id)
+        updated = replace(stored, **{name: getattr(vehicle, name) for name in WRITABLE_FIELDS if name in changed})
+        self._unindex(stored)
+        self._store(updated)
+        return vehicle.mark_clean()
+
+    def save_many(self, vehicles: List[VehicleEntity], batch_size: int = 500) -> List[UpsertResult]:
+        """Upsert keyed on plate_number; unchanged vehicles are not written"""
+        results = []
+        for vehicle in vehicles:
+            stored_id = self._plates.get(vehicle.plate_number)
+            if stored_id is None:
+                created = replace(vehicle, id=self._next_id)
+                self._store(created)
+                results.append(UpsertResult(self._copy(created), UpsertResult.CREATED))
+                continue
+
+            stored = self._vehicles[stored_id]
+            updated = replace(stored, **{name: getattr(vehicle, name) for name in WRITABLE_FIELDS})
+            if updated == stored:
+                results.append(UpsertResult(self._copy(stored), UpsertResult.UNCHANGED, self._copy(stored)))
+                continue
+            self._unindex(stored)
+            self._store(updated)
+            results.append(UpsertResult(self._copy(updated), UpsertResult.UPDATED, self._copy(stored)))
+        return results
+
+    def delete(self, vehicle_id: int) -> None:
+        """Delete vehicle by id; its plate number becomes free again"""
+        vehicle = self._vehicles.pop(vehicle_id, None)
+        if vehicle is None:
+            raise VehicleNotFoundError(f"Vehicle with id {vehicle_id} not found")
+        self._unindex(vehicle)
+
+    # ========== INDEXES ==========
+
+    def _matching(self, filters: Optional[VehicleFilter]) -> List[VehicleEntity]:
+        """Stored vehicles in id order; a location filter goes through its index"""
+        if filters is not None and filters.location is not None:
+            ids = self._locations.get(normalize_location(filters.location), ())
+        else:
+            ids = self._vehicles
+        vehicles = (self._vehicles[vehicle_id] for vehicle_id in sorted(ids))
+        return [v for v in vehicles if filters is None or filters.matches(v)]
+
+    def _check_plate(self, plate_number: str, vehicle_id: Optional[int] = None) -> None:
+        owner = self._plates.get(plate_number)
+        if owner is not None and owner != vehicle_id:
+            raise DuplicatePlateNumberError(f"Plate number {plate_number} already exists")
+
+    def _store(self, vehicle: VehicleEntity) -> None:
+        self._vehicles[vehicle.id] = vehicle
+        self._plates[vehicle.plate_number] = vehicle.id
+        self._locations.setdefault(normalize_location(vehicle.location), set()).add(vehicle.id)
+        self._next_id = max(self._next_id, vehicle.id + 1)
+
+    def _unindex(self, vehicle: VehicleEntity) -> None:
+        self._plates.pop(vehicle.plate_number, None)
+        location = normalize_location(vehicle.location)
+        self._locations[location].discard(vehicle.id)
+        if not self._locations[location]:
+            del self._locations[location]
+
+    @staticmethod
+    def _copy(vehicle: VehicleEntity) -> VehicleEntity:
+        """Detached copy, so callers cannot change the stored vehicle"""
+        return replace(vehicle).mark_clean()
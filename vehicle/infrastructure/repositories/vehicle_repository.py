@@ -1,13 +1,18 @@
 from datetime import date
-from typing import List, Optional
-from django.db.models import Q
+from typing import Any, Iterator, List, Optional, Tuple
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.functions import Lower
 
-from vehicle.domain.entities import Vehicle as VehicleEntity
+from vehicle.domain.entities import UpsertResult, Vehicle as VehicleEntity, VehicleFilter, VEHICLE_FIELDS
 from vehicle.domain.repositories import VehicleRepository
-from vehicle.domain.exceptions import VehicleNotFoundError
+from vehicle.domain.exceptions import DuplicatePlateNumberError, VehicleNotFoundError
 from vehicle.models import Vehicle as VehicleModel
 from reservation.models import Reservation
 
+# Columns written by save_many (everything but the primary key)
+WRITABLE_FIELDS = tuple(name for name in VEHICLE_FIELDS if name != "id")
+
 
 class DjangoVehicleRepository(VehicleRepository):
     """Vehicle repository backed by Django ORM"""
@@ -19,11 +24,46 @@ class DjangoVehicleRepository(VehicleRepository):
             return None
         return self._to_entity(vehicle)
 
-    def list_all(self) -> List[VehicleEntity]:
-        """List all vehicles"""
-        vehicles = VehicleModel.objects.all()
+    def list_all(self, filters: Optional[VehicleFilter] = None) -> List[VehicleEntity]:
+        """List all vehicles, optionally filtered"""
+        vehicles = self._filtered(filters)
         return [self._to_entity(v) for v in vehicles]
 
+    def iter_rows(
+        self,
+        filters: Optional[VehicleFilter] = None,
+        chunk_size: int = 2000,
+    ) -> Iterator[Tuple]:
+        """Stream vehicles as tuples straight from the cursor (no model instances)"""
+        return (
+            self._filtered(filters).order_by("id")
+            .values_list(*VEHICLE_FIELDS)
+            .iterator(chunk_size=chunk_size)
+        )
+
+    def list_page(
+        self,
+        filters: Optional[VehicleFilter] = None,
+        sort: str = "id",
+        descending: bool = False,
+        after: Optional[Tuple[Any, int]] = None,
+        limit: int = 50,
+    ) -> List[Tuple]:
+        """One keyset page of tuple rows ordered by (sort, id)"""
+        return list(self.page_queryset(filters, sort, descending, after, limit))
+
+    def list_rates(
+        self,
+        vehicle_ids: Optional[List[int]] = None,
+        filters: Optional[VehicleFilter] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[int, int]]:
+        """(id, daily_rate) pairs in id order, two columns per row"""
+        vehicles = self._filtered(filters)
+        if vehicle_ids is not None:
+            vehicles = vehicles.filter(id__in=vehicle_ids)
+        return list(vehicles.order_by("id").values_list("id", "daily_rate")[:limit])
+
     def list_available(
         self,
         location: str,
@@ -31,43 +71,174 @@ class DjangoVehicleRepository(VehicleRepository):
         end_date: date,
     ) -> List[VehicleEntity]:
         """List available vehicles filtered by location and date range"""
-        # Find vehicles that have overlapping reservations
-        conflicting_ids = Reservation.objects.filter(
-            Q(start_date__lte=end_date) & Q(end_date__gte=start_date)
-        ).values_list("vehicle_id", flat=True)
-
-        vehicles = (
-            VehicleModel.objects.exclude(id__in=conflicting_ids)
-            .filter(is_available=True, location__iexact=location.strip())
-        )
+        vehicles = self.available_queryset(location, start_date, end_date)
         return [self._to_entity(v) for v in vehicles]
 
     def save(self, vehicle: VehicleEntity) -> VehicleEntity:
-        """Create or update vehicle"""
-        if vehicle.id:
-            db_vehicle = VehicleModel.objects.get(id=vehicle.id)
-        else:
-            db_vehicle = VehicleModel()
-
-        db_vehicle.name = vehicle.name
-        db_vehicle.brand = vehicle.brand
-        db_vehicle.model = vehicle.model
-        db_vehicle.year = vehicle.year
-        db_vehicle.plate_number = vehicle.plate_number
-        db_vehicle.color = vehicle.color
-        db_vehicle.daily_rate = vehicle.daily_rate
-        db_vehicle.is_available = vehicle.is_available
-        db_vehicle.location = vehicle.location
-        db_vehicle.save()
-
-        return self._to_entity(db_vehicle)
+        """
+        Create or update vehicle
+        Updates are a single UPDATE of the changed columns; a missing row is
+        detected from the affected row count
+        """
+        try:
+            if not vehicle.id:
+                db_vehicle = VehicleModel(**{name: getattr(vehicle, name) for name in WRITABLE_FIELDS})
+                db_vehicle.save()
+                return self._to_entity(db_vehicle)
+
+            changed = vehicle.changed_fields()
+            vehicles = VehicleModel.objects.filter(id=vehicle.id)
+            if changed:
+                found = vehicles.update(**{name: getattr(vehicle, name) for name in WRITABLE_FIELDS if name in changed})
+            else:
+                found = vehicles.exists()
+        except IntegrityError as e:
+            raise DuplicatePlateNumberError(str(e))
+        if not found:
+            raise VehicleNotFoundError(f"Vehicle with id {vehicle.id} not found")
+        return vehicle.mark_clean()
+
+    def save_many(self, vehicles: List[VehicleEntity], batch_size: int = 500) -> List[UpsertResult]:
+        """
+        Upsert keyed on plate_number: one SELECT, bulk_create and bulk_update
+        per batch, all inside one transaction. Unchanged rows are not written.
+        """
+        results = []
+        try:
+            with transaction.atomic():
+                for start in range(0, len(vehicles), batch_size):
+                    results += self._save_batch(vehicles[start:start + batch_size])
+        except IntegrityError as e:
+            # A concurrent writer took one of the new plate numbers
+            raise DuplicatePlateNumberError(str(e))
+        return results
+
+    def _save_batch(self, vehicles: List[VehicleEntity]) -> List[UpsertResult]:
+        # Plates are unique among live vehicles only, so no in_bulk()
+        existing = {
+            db_vehicle.plate_number: db_vehicle
+            for db_vehicle in VehicleModel.objects.filter(
+                plate_number__in=[v.plate_number for v in vehicles]
+            )
+        }
+        to_create, to_update, pending = [], [], []
+        changed_fields = set()
+        for vehicle in vehicles:
+            db_vehicle = existing.get(vehicle.plate_number)
+            if db_vehicle is None:
+                db_vehicle = VehicleModel(**{name: getattr(vehicle, name) for name in WRITABLE_FIELDS})
+                to_create.append(db_vehicle)
+                pending.append((db_vehicle, UpsertResult.CREATED, None))
+                continue
+
+            previous = self._to_entity(db_vehicle)
+            changed = False
+            for name in WRITABLE_FIELDS:
+                if getattr(db_vehicle, name) != getattr(vehicle, name):
+                    setattr(db_vehicle, name, getattr(vehicle, name))
+                    changed_fields.add(name)
+                    changed = True
+            if changed:
+                to_update.append(db_vehicle)
+            pending.append((db_vehicle, UpsertResult.UPDATED if changed else UpsertResult.UNCHANGED, previous))
+
+        # Both backends we deploy on return primary keys from bulk_create
+        VehicleModel.objects.bulk_create(to_create)
+        if to_update:
+            # bulk_update builds a CASE per row and column; skip untouched columns
+            fields = [name for name in WRITABLE_FIELDS if name in changed_fields]
+            VehicleModel.objects.bulk_update(to_update, fields)
+        return [
+            UpsertResult(self._to_entity(db_vehicle), status, previous)
+            for db_vehicle, status, previous in pending
+        ]
 
     def delete(self, vehicle_id: int) -> None:
-        """Delete vehicle by id"""
-        deleted, _ = VehicleModel.objects.filter(id=vehicle_id).delete()
+        """
+        Soft-delete vehicle by id: one UPDATE, whatever its reservation count
+        The row and its reservations are removed later by purge_deleted
+        """
+        deleted = VehicleModel.objects.filter(id=vehicle_id).soft_delete()
         if not deleted:
             raise VehicleNotFoundError(f"Vehicle with id {vehicle_id} not found")
 
+    # ========== QUERYSETS (shared with AsyncDjangoVehicleRepository) ==========
+
+    @classmethod
+    def page_queryset(
+        cls,
+        filters: Optional[VehicleFilter],
+        sort: str,
+        descending: bool,
+        after: Optional[Tuple[Any, int]],
+        limit: int,
+    ):
+        """values_list queryset of one keyset page ordered by (sort, id)"""
+        vehicles = cls._filtered(filters)
+        op = "lt" if descending else "gt"
+
+        if after is not None:
+            value, last_id = after
+            if sort == "id":
+                vehicles = vehicles.filter(**{f"id__{op}": last_id})
+            else:
+                # (sort, id) > (value, last_id), spelled out so the
+                # (sort, id) indexes can seek to the start of the page
+                vehicles = vehicles.filter(
+                    Q(**{f"{sort}__{op}": value})
+                    | Q(**{sort: value, f"id__{op}": last_id})
+                )
+
+        order = [f"-{sort}", "-id"] if descending else [sort, "id"]
+        if sort == "id":
+            order = order[1:]
+        return vehicles.order_by(*order).values_list(*VEHICLE_FIELDS)[:limit]
+
+    @staticmethod
+    def available_queryset(location: str, start_date: date, end_date: date):
+        """Available vehicles of a location with no active reservation overlapping the range"""
+        # Active reservation of the outer vehicle overlapping the range
+        conflicting = Reservation.objects.filter(
+            vehicle_id=OuterRef("pk"),
+            start_date__lte=end_date,
+            end_date__gte=start_date,
+            status__in=Reservation.ACTIVE_STATUSES,
+        )
+
+        # LOWER(location) = ... matches the vehicles_location_lower_idx index
+        return (
+            VehicleModel.objects.alias(location_lower=Lower("location"))
+            .filter(is_available=True, location_lower=location.strip().lower())
+            .filter(~Exists(conflicting))
+        )
+
+    @staticmethod
+    def _filtered(filters: Optional[VehicleFilter]):
+        """Queryset with the filters applied (brand/location through their LOWER() indexes)"""
+        vehicles = VehicleModel.objects.all()
+        if filters is None:
+            return vehicles
+
+        if filters.brand is not None:
+            vehicles = vehicles.alias(brand_lower=Lower("brand")).filter(
+                brand_lower=filters.brand.strip().lower()
+            )
+        if filters.location is not None:
+            vehicles = vehicles.alias(location_lower=Lower("location")).filter(
+                location_lower=filters.location.strip().lower()
+            )
+        if filters.min_year is not None:
+            vehicles = vehicles.filter(year__gte=filters.min_year)
+        if filters.max_year is not None:
+            vehicles = vehicles.filter(year__lte=filters.max_year)
+        if filters.min_daily_rate is not None:
+            vehicles = vehicles.filter(daily_rate__gte=filters.min_daily_rate)
+        if filters.max_daily_rate is not None:
+            vehicles = vehicles.filter(daily_rate__lte=filters.max_daily_rate)
+        if filters.is_available is not None:
+            vehicles = vehicles.filter(is_available=filters.is_available)
+        return vehicles
+
     @staticmethod
     def _to_entity(model: VehicleModel) -> VehicleEntity:
         """Map Django ORM model to domain entity"""
@@ -82,4 +253,4 @@ class DjangoVehicleRepository(VehicleRepository):
             daily_rate=model.daily_rate,
             is_available=model.is_available,
             location=model.location,
-        )
+        ).mark_clean()
@@ -0,0 +1,118 @@
+"""
+Vehicle Search Cache - Result cache for VehicleService.search_available_vehicles
+
+Entries are keyed on (normalised location, start_date, end_date) plus a
+per-location version (see cache_versions). Bumping the version invalidates
+every cached search of that location at once; older entries simply expire.
+
+Callers build the key once, before querying, and store the results under
+that same key: a write that bumps the version while the query runs then
+leaves the results under the old version, where nobody reads them.
+"""
+import threading
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import caches
+
+from vehicle.infrastructure.cache_versions import aget_version, bump_version, get_version
+from vehicle.models import Vehicle as VehicleModel
+
+
+def normalize_location(location: str) -> str:
+    """Location as matched by search: trimmed and case-folded"""
+    return location.strip().lower()
+
+
+class VehicleSearchCache:
+    """Search result cache on top of Django's cache framework"""
+
+    key_prefix = "vehicle-search"
+
+    def __init__(self, alias: Optional[str] = None, timeout: Optional[int] = None):
+        self.alias = alias or settings.VEHICLE_SEARCH_CACHE_ALIAS
+        self.timeout = settings.VEHICLE_SEARCH_CACHE_TIMEOUT if timeout is None else timeout
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def key(self, location: str, start_date: date, end_date: date) -> str:
+        """Cache key of a search under the location's current version"""
+        location = normalize_location(location)
+        version = get_version(self.cache, self._version_key(location))
+        return self._format_key(location, version, start_date, end_date)
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Cached results or None; counts a hit or a miss"""
+        results = self.cache.get(key)
+        self._count(results)
+        return results
+
+    async def akey(self, location: str, start_date: date, end_date: date) -> str:
+        """Async key"""
+        location = normalize_location(location)
+        version = await aget_version(self.cache, self._version_key(location))
+        return self._format_key(location, version, start_date, end_date)
+
+    async def aget(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Async get"""
+        results = await self.cache.aget(key)
+        self._count(results)
+        return results
+
+    def set(self, key: str, results: List[Dict[str, Any]]) -> None:
+        """Store search results under a key taken before the query"""
+        self.cache.set(key, results, self.timeout)
+
+    async def aset(self, key: str, results: List[Dict[str, Any]]) -> None:
+        """Async set"""
+        await self.cache.aset(key, results, self.timeout)
+
+    def invalidate_locations(self, locations: Iterable[str]) -> None:
+        """Drop every cached search of the given locations"""
+        for location in {normalize_location(loc) for loc in locations if loc}:
+            bump_version(self.cache, self._version_key(location))
+
+    def invalidate_vehicles(self, vehicle_ids: Iterable[int]) -> None:
+        """Drop cached searches of the locations of the given vehicles"""
+        vehicle_ids = {vehicle_id for vehicle_id in vehicle_ids if vehicle_id}
+        if not vehicle_ids:
+            return
+        self.invalidate_locations(
+            VehicleModel.objects.filter(id__in=vehicle_ids).values_list("location", flat=True)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit and miss counters of this process"""
+        with self._lock:
+            hits, misses = self._hits, self._misses
+        total = hits + misses
+        return {"hits": hits, "misses": misses, "hit_ratio": hits / total if total else 0.0}
+
+    def reset_stats(self) -> None:
+        """Zero the hit and miss counters"""
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+
+    def _count(self, results: Optional[List[Dict[str, Any]]]) -> None:
+        with self._lock:
+            if results is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+
+    def _version_key(self, location: str) -> str:
+        return f"{self.key_prefix}:version:{quote(location)}"
+
+    def _format_key(self, location: str, version: int, start_date: date, end_date: date) -> str:
+        return f"{self.key_prefix}:{quote(location)}:{version}:{start_date.isoformat()}:{end_date.isoformat()}"
+
+
+vehicle_search_cache = VehicleSearchCache()
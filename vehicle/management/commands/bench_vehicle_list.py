@@ -0,0 +1,82 @@
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from rentalbe.benchmarking import seed_fleet, throwaway_database
+from vehicle.application.service import VehicleService
+from vehicle.domain.entities import VEHICLE_FIELDS
+from vehicle.infrastructure.repositories.vehicle_repository import DjangoVehicleRepository
+from vehicle.presentation.schemas import VehicleResponse
+from vehicle.presentation.streaming import json_array_chunks
+
+
+def entity_path(repository, probe=lambda: None):
+    """ORM model -> VehicleEntity -> dict -> response schema -> JSON (previous list endpoint)"""
+    rows = [VehicleService._entity_to_dict(v) for v in repository.list_all()]
+    payload = [VehicleResponse(**row).dict() for row in rows]
+    probe()
+    return json.dumps(payload)
+
+
+def projection_path(repository, probe=lambda: None):
+    """values_list tuples -> JSON chunks (current list endpoint)"""
+    chunks = []
+    for chunk in json_array_chunks(repository.iter_rows(), VEHICLE_FIELDS):
+        chunks.append(chunk)
+        probe()
+    return "".join(chunks)
+
+
+class Command(BaseCommand):
+    help = "Microbenchmark list_all_vehicles: entity path vs tuple projection path"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000], help="Vehicle counts")
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        repository = DjangoVehicleRepository()
+        paths = (("entity", entity_path), ("projection", projection_path))
+
+        self.stdout.write(f"{'vehicles':>10} {'path':<11} {'best s':>8} {'peak blocks':>12} {'peak MiB':>9}")
+        with throwaway_database():
+            for size in options["sizes"]:
+                seed_fleet(random.Random(size), size, 0)
+                for label, path in paths:
+                    assert json.loads(path(repository))[-1]["plate_number"] == f"BENCH {size - 1}"
+                    best = min(self._wall_time(path, repository) for _ in range(options["repeat"]))
+                    blocks, peak = self._allocations(path, repository)
+                    self.stdout.write(
+                        f"{size:>10,} {label:<11} {best:>8.3f} {blocks:>12,} {peak / 2**20:>9.1f}"
+                    )
+
+    @staticmethod
+    def _wall_time(path, repository):
+        gc.collect()
+        started = time.perf_counter()
+        path(repository)
+        return time.perf_counter() - started
+
+    @staticmethod
+    def _allocations(path, repository):
+        """Most memory blocks alive at once while building the body, and traced peak bytes"""
+        gc.collect()
+        before = sys.getallocatedblocks()
+        peak_blocks = 0
+
+        def probe():
+            nonlocal peak_blocks
+            peak_blocks = max(peak_blocks, sys.getallocatedblocks() - before)
+
+        tracemalloc.start()
+        try:
+            path(repository, probe)
+            _, peak_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return peak_blocks, peak_bytes
@@ -0,0 +1,56 @@
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from rentalbe.benchmarking import SEED_START, api_client, seed_fleet, summarize, throwaway_database, time_calls
+
+LOCATIONS = (
+    "Jakarta", "Bandung", "Surabaya", "Medan", "Semarang",
+    "Makassar", "Denpasar", "Yogyakarta", "Malang", "Palembang",
+)
+
+
+class Command(BaseCommand):
+    help = "Measure /api/vehicles/search latency across fleet and reservation counts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fleets", type=int, nargs="+", default=[1_000, 10_000], help="Vehicle counts")
+        parser.add_argument(
+            "--per-vehicle", type=int, nargs="+", default=[10, 100],
+            help="Reservations per vehicle",
+        )
+        parser.add_argument("--queries", type=int, default=200, help="Search requests per scenario")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        client = api_client()
+
+        self.stdout.write(f"{'vehicles':>10} {'reservations':>13} {'results':>8} "
+                          f"{'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        with throwaway_database():
+            for fleet in options["fleets"]:
+                for per_vehicle in options["per_vehicle"]:
+                    reservations = fleet * per_vehicle
+                    seed_fleet(rng, fleet, reservations, LOCATIONS)
+
+                    params = []
+                    for _ in range(options["queries"]):
+                        start = SEED_START + timedelta(days=rng.randint(0, per_vehicle * 7))
+                        params.append({
+                            "location": rng.choice(LOCATIONS).lower(),
+                            "start_date": start.isoformat(),
+                            "end_date": (start + timedelta(days=rng.randint(1, 5))).isoformat(),
+                        })
+
+                    results = len(client.get("/api/vehicles/search", params[0]).json())
+                    samples = time_calls(
+                        lambda query: client.get("/api/vehicles/search", query),
+                        [(query,) for query in params],
+                    )
+                    stats = summarize(samples)
+                    self.stdout.write(
+                        f"{fleet:>10,} {reservations:>13,} {results:>8} {stats['mean_ms']:>9.2f} "
+                        f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}"
+                    )
@@ -0,0 +1,74 @@
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from rentalbe.benchmarking import SEED_START, seed_fleet, summarize, throwaway_database, time_calls
+from reservation.models import Reservation
+from vehicle.application.service import VehicleService
+from vehicle.infrastructure.repositories.in_memory_vehicle_repository import InMemoryVehicleRepository
+from vehicle.infrastructure.repositories.vehicle_repository import DjangoVehicleRepository
+from vehicle.infrastructure.search_cache import VehicleSearchCache
+
+LOCATIONS = ("Jakarta", "Bandung", "Surabaya", "Medan", "Semarang")
+
+
+def mirror(repository: DjangoVehicleRepository) -> InMemoryVehicleRepository:
+    """In-memory copy of the seeded vehicles and their reservations"""
+    memory = InMemoryVehicleRepository(repository.list_all())
+    rows = Reservation.objects.values_list("id", "vehicle_id", "start_date", "end_date", "status")
+    for reservation_id, vehicle_id, start_date, end_date, status in rows.iterator(chunk_size=5000):
+        memory.add_reservation(vehicle_id, start_date, end_date, status, reservation_id)
+    return memory
+
+
+class Command(BaseCommand):
+    help = "Time VehicleService calls on the Django and in-memory repositories (database vs Python cost)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--vehicles", type=int, default=5_000)
+        parser.add_argument("--per-vehicle", type=int, default=10, help="Reservations per vehicle")
+        parser.add_argument("--calls", type=int, default=200, help="Calls per operation")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+
+        with throwaway_database():
+            vehicle_ids = seed_fleet(
+                rng, options["vehicles"], options["vehicles"] * options["per_vehicle"], LOCATIONS
+            )
+            django_repository = DjangoVehicleRepository()
+            repositories = (("django", django_repository), ("memory", mirror(django_repository)))
+
+            searches = []
+            for _ in range(options["calls"]):
+                start = SEED_START + timedelta(days=rng.randint(0, options["per_vehicle"] * 7))
+                searches.append((start, start + timedelta(days=rng.randint(1, 5)), rng.choice(LOCATIONS)))
+            operations = {
+                "get": lambda service: time_calls(
+                    service.get_vehicle_by_id,
+                    [(rng.choice(vehicle_ids),) for _ in range(options["calls"])],
+                ),
+                "page": lambda service: time_calls(
+                    lambda: service.list_vehicles(sort="-daily_rate", limit=50),
+                    [()] * options["calls"],
+                ),
+                "search": lambda service: time_calls(service.search_available_vehicles, searches),
+            }
+
+            self.stdout.write(f"{'operation':<10} {'repository':<11} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8}")
+            for label, operation in operations.items():
+                means = {}
+                for name, repository in repositories:
+                    # A zero timeout stores nothing, so every search reaches the repository
+                    service = VehicleService(repository, search_cache=VehicleSearchCache(timeout=0))
+                    stats = summarize(operation(service))
+                    means[name] = stats["mean_ms"]
+                    self.stdout.write(
+                        f"{label:<10} {name:<11} {stats['mean_ms']:>9.3f} "
+                        f"{stats['p50_ms']:>8.3f} {stats['p95_ms']:>8.3f}"
+                    )
+                if means["django"]:
+                    share = max(0.0, 1 - means["memory"] / means["django"])
+                    self.stdout.write(f"{label:<10} {'db share':<11} {share:>9.0%}")
@@ -0,0 +1,139 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.util import setup_testing_defaults
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+
+from rentalbe.benchmarking import seed_fleet, slow_database, summarize, throwaway_database
+from reservation.models import Reservation
+
+
+def wsgi_get(app, path, query):
+    """Serve one GET through the WSGI handler and return the status code"""
+    environ = {"PATH_INFO": path, "QUERY_STRING": query, "HTTP_HOST": "127.0.0.1"}
+    setup_testing_defaults(environ)
+    status = []
+    body = app(environ, lambda line, headers, exc_info=None: status.append(line))
+    try:
+        for _ in body:
+            pass
+    finally:
+        body.close()
+    return int(status[0].split()[0])
+
+
+async def asgi_get(app, path, query):
+    """Serve one GET through the ASGI handler and return the status code"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "headers": [(b"host", b"127.0.0.1")],
+        "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 80),
+    }
+    disconnect = asyncio.Event()
+    received = False
+    status = []
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    disconnect.set()
+    return status[0]
+
+
+class Command(BaseCommand):
+    help = "Compare WSGI and ASGI throughput of the async read endpoints with a simulated slow database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=400, help="Requests per server")
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 64], help="In-flight requests")
+        parser.add_argument("--threads", type=int, default=8, help="WSGI worker threads")
+        parser.add_argument("--delay-ms", type=float, default=20.0, help="Added latency per query")
+        parser.add_argument("--vehicles", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+
+        with throwaway_database():
+            seed_fleet(rng, options["vehicles"], options["vehicles"] * 5)
+            reservation_ids = list(Reservation.objects.values_list("id", flat=True))
+            # Uncached read endpoints, so every request reaches the database
+            requests = [
+                rng.choice([
+                    ("/api/vehicles/", f"limit=20&sort=-daily_rate&min_daily_rate={rng.randrange(200000, 600000, 25000)}"),
+                    ("/api/reservations/", "limit=20"),
+                    (f"/api/reservations/{rng.choice(reservation_ids)}", ""),
+                ])
+                for _ in range(options["requests"])
+            ]
+
+            wsgi, asgi = get_wsgi_application(), get_asgi_application()
+            delay = options["delay_ms"] / 1000
+            self.stdout.write(
+                f"{options['requests']} requests, {options['delay_ms']:.0f} ms per query, "
+                f"{options['threads']} WSGI threads"
+            )
+            self.stdout.write(f"{'server':<6} {'in flight':>9} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+            with slow_database(delay):
+                for concurrency in options["concurrency"]:
+                    self._report("wsgi", concurrency, *self._run_wsgi(wsgi, requests, concurrency, options["threads"]))
+                    self._report("asgi", concurrency, *asyncio.run(self._run_asgi(asgi, requests, concurrency)))
+
+    def _report(self, server, concurrency, elapsed, latencies, failures):
+        stats = summarize(latencies)
+        line = (
+            f"{server:<6} {concurrency:>9} {len(latencies) / elapsed:>8.1f} "
+            f"{stats['p50_ms']:>8.1f} {stats['p99_ms']:>8.1f}"
+        )
+        if failures:
+            line += self.style.ERROR(f"  {failures} non-200 responses")
+        self.stdout.write(line)
+
+    @staticmethod
+    def _run_wsgi(app, requests, concurrency, threads):
+        """`concurrency` clients against `threads` workers; latency includes the wait for a worker"""
+        workers = threading.BoundedSemaphore(threads)
+
+        def timed(request):
+            started = time.perf_counter()
+            with workers:
+                status = wsgi_get(app, *request)
+            return time.perf_counter() - started, status
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(timed, requests))
+        elapsed = time.perf_counter() - started
+        return elapsed, [r[0] for r in results], sum(1 for r in results if r[1] != 200)
+
+    @staticmethod
+    async def _run_asgi(app, requests, concurrency):
+        """One event loop keeping `concurrency` requests in flight"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed(request):
+            async with semaphore:
+                started = time.perf_counter()
+                status = await asgi_get(app, *request)
+                return time.perf_counter() - started, status
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(timed(r) for r in requests))
+        elapsed = time.perf_counter() - started
+        return elapsed, [r[0] for r in results], sum(1 for r in results if r[1] != 200)
@@ -1,41 +1,80 @@
-import json
+from pathlib import Path
+
 from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
+from rentalbe.jsonstream import batched, iter_json_array
+from vehicle.application.service import MAX_BULK_VEHICLES, VehicleService
 from vehicle.models import Vehicle
+from vehicle.presentation.schemas import BulkVehicleItem
 
 
 class Command(BaseCommand):
-    help = "Load vehicles from JSON file"
+    help = "Load vehicles from JSON file (streamed in chunks; --upsert updates existing plates)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file", type=Path, default=Path(settings.BASE_DIR) / "data" / "vehicles.json",
+            help="JSON array of vehicles",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000, help=f"Vehicles per chunk (max {MAX_BULK_VEHICLES})")
+        parser.add_argument(
+            "--upsert", action="store_true",
+            help="Update vehicles whose plate_number already exists instead of skipping them",
+        )
 
     def handle(self, *args, **options):
-        file_path = settings.BASE_DIR / "data" / "vehicles.json"
+        file_path = options["file"]
+        batch_size = options["batch_size"]
+        if not 1 <= batch_size <= MAX_BULK_VEHICLES:
+            raise CommandError(f"--batch-size must be between 1 and {MAX_BULK_VEHICLES}")
 
         if not file_path.exists():
-            self.stderr.write("vehicles.json not found")
+            self.stderr.write(f"{file_path.name} not found")
             return
 
+        service = VehicleService()
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0, "existing": 0, "duplicates": 0, "invalid": 0}
+        processed = 0
+
         with open(file_path, "r") as f:
-            data = json.load(f)
-
-        vehicles = []
-        for item in data:
-            vehicles.append(
-                Vehicle(
-                    name=item["name"],
-                    brand=item["brand"],
-                    model=item["model"],
-                    year=item["year"],
-                    plate_number=item["plate_number"],
-                    color=item["color"],
-                    daily_rate=item["daily_rate"],
-                    is_available=item["is_available"],
-                    location=item["location"],
-                )
-            )
+            for chunk in batched(iter_json_array(f), batch_size):
+                items, plates = [], set()
+                for raw in chunk:
+                    try:
+                        item = BulkVehicleItem(**raw)
+                    except (TypeError, ValueError):
+                        counts["invalid"] += 1
+                        continue
+                    if item.plate_number in plates:
+                        counts["duplicates"] += 1
+                        continue
+                    plates.add(item.plate_number)
+                    items.append(item)
+
+                if not options["upsert"]:
+                    existing = set(
+                        Vehicle.objects.filter(plate_number__in=plates).values_list("plate_number", flat=True)
+                    )
+                    counts["existing"] += len(existing)
+                    items = [item for item in items if item.plate_number not in existing]
 
-        Vehicle.objects.bulk_create(vehicles, ignore_conflicts=True)
+                # Plates are matched with one query per chunk and written with
+                # bulk_create/bulk_update; cached searches are invalidated
+                result = service.upsert_vehicles(items)
+                counts["inserted"] += result["created"]
+                counts["updated"] += result["updated"]
+                counts["unchanged"] += result["unchanged"]
+                counts["duplicates"] += result["failed"]
+                processed += len(chunk)
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"{processed:,} processed")
 
+        skipped = counts["unchanged"] + counts["existing"] + counts["duplicates"] + counts["invalid"]
         self.stdout.write(
-            self.style.SUCCESS(f"Inserted {len(vehicles)} vehicles")
-        )
\ No newline at end of file
+            self.style.SUCCESS(
+                f"Inserted {counts['inserted']} vehicles, updated {counts['updated']}, skipped {skipped} "
+                f"({counts['unchanged']} unchanged, {counts['existing']} already exist, "
+                f"{counts['duplicates']} duplicate plates, {counts['invalid']} invalid)"
+            )
+        )
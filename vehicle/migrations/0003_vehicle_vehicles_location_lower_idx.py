@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-17 11:20
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicle', '0002_alter_vehicle_table'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(django.db.models.functions.text.Lower('location'), models.F('is_available'), name='vehicles_location_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-17 13:05
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicle', '0003_vehicle_vehicles_location_lower_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(django.db.models.functions.text.Lower('brand'), models.F('daily_rate'), models.F('id'), name='vehicles_brand_rate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['daily_rate', 'id'], name='vehicles_rate_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['year', 'id'], name='vehicles_year_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['name', 'id'], name='vehicles_name_id_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-17 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicle', '0004_vehicle_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehicle',
+            name='is_deleted',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name='vehicle',
+            name='plate_number',
+            field=models.CharField(max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(condition=models.Q(('is_deleted', True)), fields=['id'], name='vehicles_tombstone_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='vehicle',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_deleted', False)), fields=('plate_number',), name='vehicles_plate_number_live_uniq'),
+        ),
+    ]
@@ -1,18 +1,48 @@
 from django.db import models
+from django.db.models import F, Q
+from django.db.models.functions import Lower
+
+from rentalbe.softdelete import AllObjectsManager, LiveManager
 
 class Vehicle(models.Model):
     name = models.CharField(max_length=100)
     brand = models.CharField(max_length=50)
     model = models.CharField(max_length=50)
     year = models.IntegerField()
-    plate_number = models.CharField(max_length=20, unique=True)
+    plate_number = models.CharField(max_length=20)
     color = models.CharField(max_length=30)
     daily_rate = models.IntegerField()
     is_available = models.BooleanField(default=True)
     location = models.CharField(max_length=50)
+    # Tombstone; see rentalbe.softdelete and the purge_deleted command
+    is_deleted = models.BooleanField(default=False)
+
+    objects = LiveManager()
+    all_objects = AllObjectsManager()
 
     class Meta:
         db_table = "vehicles"
 
+        constraints = [
+            # A plate stays reusable once its vehicle is deleted
+            models.UniqueConstraint(
+                fields=["plate_number"],
+                condition=Q(is_deleted=False),
+                name="vehicles_plate_number_live_uniq",
+            ),
+        ]
+
+        indexes = [
+            # Case-insensitive location search (see DjangoVehicleRepository.list_available)
+            models.Index(Lower("location"), F("is_available"), name="vehicles_location_lower_idx"),
+            # GET /vehicles/ filters and keyset sorts (sort column, id)
+            models.Index(Lower("brand"), F("daily_rate"), F("id"), name="vehicles_brand_rate_idx"),
+            models.Index(fields=["daily_rate", "id"], name="vehicles_rate_id_idx"),
+            models.Index(fields=["year", "id"], name="vehicles_year_id_idx"),
+            models.Index(fields=["name", "id"], name="vehicles_name_id_idx"),
+            # purge_deleted scans tombstones only
+            models.Index(fields=["id"], condition=Q(is_deleted=True), name="vehicles_tombstone_idx"),
+        ]
+
     def __str__(self):
         return self.name
\ No newline at end of file
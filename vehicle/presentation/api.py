@@ -1,16 +1,27 @@
 from datetime import date
 from typing import List
+from rentalbe.streaming import streaming_response
 from ninja import Router, Query
 from ninja.errors import HttpError
 from vehicle.presentation.schemas import (
     VehicleResponse,
+    VehicleListQuery,
+    VehiclePageResponse,
     AvailableVehicleResponse,
+    FacetedSearchResponse,
     CreateVehicleRequest,
+    BulkVehicleRequest,
+    BulkVehicleResponse,
+    QuoteRequest,
+    QuoteResponse,
     UpdateVehicleRequest,
-    MessageResponse
+    MessageResponse,
+    CacheStatsResponse,
 )
-from vehicle.application.service import VehicleService
-from vehicle.domain.exceptions import VehicleNotFoundError
+from vehicle.presentation.streaming import json_array_chunks
+from vehicle.application.service import VehicleService, PRICE_BUCKET_SIZE
+from vehicle.domain.entities import VehicleFilter, VEHICLE_FIELDS
+from vehicle.domain.exceptions import DuplicatePlateNumberError, VehicleNotFoundError
 
 router = Router(tags=["Vehicles"])
 service = VehicleService()
@@ -19,7 +30,7 @@ service = VehicleService()
 # ========== GET ENDPOINTS ==========
 
 @router.get("/search", response=List[AvailableVehicleResponse])
-def search_available_vehicles(
+async def search_available_vehicles(
     request,
     start_date: date = Query(..., description="Start date of reservation"),
     end_date: date = Query(..., description="End date of reservation"),
@@ -30,26 +41,117 @@ def search_available_vehicles(
     Returns vehicles that have no conflicting reservations
     """
     try:
-        return service.search_available_vehicles(start_date, end_date, location)
+        return await service.asearch_available_vehicles(start_date, end_date, location)
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HttpError(500, f"Error searching vehicles: {str(e)}")
 
 
+@router.get("/search/facets", response=FacetedSearchResponse)
+async def search_available_vehicles_with_facets(
+    request,
+    start_date: date = Query(..., description="Start date of reservation"),
+    end_date: date = Query(..., description="End date of reservation"),
+    location: str = Query(..., description="Vehicle location"),
+    price_bucket: int = Query(PRICE_BUCKET_SIZE, description="Width of the daily_rate buckets")
+):
+    """
+    Same search as /search, plus brand/location/price bucket counts and the
+    daily_rate range of the results (no extra queries)
+    """
+    try:
+        return await service.asearch_available_vehicles(
+            start_date, end_date, location, facets=True, price_bucket=price_bucket
+        )
+    except ValueError as e:
+        raise HttpError(400, str(e))
+
+
+@router.get("/search/cache-stats", response=CacheStatsResponse)
+def search_cache_stats(request):
+    """Hit/miss counters of the vehicle search cache (this worker)"""
+    return service.search_cache.stats()
+
+
+@router.post("/bulk", response=BulkVehicleResponse)
+def upsert_vehicles(request, payload: BulkVehicleRequest):
+    """
+    Create or update many vehicles matched on plate_number, in one transaction
+    Per-item results come back in input order
+    (registered before /{vehicle_id} so "bulk" is not taken for an id)
+    """
+    try:
+        return service.upsert_vehicles(payload.items)
+    except ValueError as e:
+        raise HttpError(400, str(e))
+    except DuplicatePlateNumberError:
+        raise HttpError(409, "A plate number was taken by a concurrent write, retry the request")
+
+
+@router.post("/quote", response=QuoteResponse)
+def quote_vehicles(request, payload: QuoteRequest):
+    """
+    Total price of many vehicles over a date range (end date not charged)
+    Pick vehicles by vehicle_ids and/or the list filters; weekday and weekend
+    days can be priced with different multipliers
+    """
+    filters = VehicleFilter(
+        brand=payload.brand,
+        location=payload.location,
+        min_year=payload.min_year,
+        max_year=payload.max_year,
+        min_daily_rate=payload.min_daily_rate,
+        max_daily_rate=payload.max_daily_rate,
+        is_available=payload.is_available,
+    )
+    try:
+        return service.quote_vehicles(
+            payload.start_date,
+            payload.end_date,
+            payload.vehicle_ids,
+            filters,
+            payload.weekday_multiplier,
+            payload.weekend_multiplier,
+        )
+    except ValueError as e:
+        raise HttpError(400, str(e))
+
+
 @router.get("/{vehicle_id}", response=VehicleResponse)
-def get_vehicle(request, vehicle_id: int):
+async def get_vehicle(request, vehicle_id: int):
     """Get a specific vehicle by ID"""
     try:
-        return service.get_vehicle_by_id(vehicle_id)
+        return await service.aget_vehicle_by_id(vehicle_id)
     except VehicleNotFoundError as e:
         raise HttpError(404, str(e))
 
 
-@router.get("/", response=List[VehicleResponse])
-def list_all_vehicles(request):
-    """Get all vehicles"""
-    return service.get_all_vehicles()
+@router.get("/", response=VehiclePageResponse)
+async def list_all_vehicles(request, query: VehicleListQuery = Query(...)):
+    """
+    Get vehicles page by page, filtered and sorted (pass `next` back as `cursor`)
+    With stream=true every matching vehicle is streamed as one JSON array instead
+    """
+    filters = VehicleFilter(
+        brand=query.brand,
+        location=query.location,
+        min_year=query.min_year,
+        max_year=query.max_year,
+        min_daily_rate=query.min_daily_rate,
+        max_daily_rate=query.max_daily_rate,
+        is_available=query.is_available,
+    )
+    if query.stream:
+        # Rows go from the database straight into JSON, no per-row schema
+        chunks = json_array_chunks(service.iter_vehicle_rows(filters), VEHICLE_FIELDS)
+        return streaming_response(request, chunks, "application/json")
+
+    try:
+        items, next_cursor = await service.alist_vehicles(filters, query.sort, query.cursor, query.limit)
+    except ValueError as e:
+        raise HttpError(400, str(e))
+    return {"items": items, "next": next_cursor}
 
 
 # ========== CREATE ENDPOINT ==========
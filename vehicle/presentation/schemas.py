@@ -1,5 +1,6 @@
-from ninja import Schema
-from typing import Optional
+from datetime import date
+from ninja import Field, Schema
+from typing import List, Optional
 
 
 # ========== REQUEST SCHEMAS (Input DTOs) ==========
@@ -29,6 +30,55 @@ class UpdateVehicleRequest(Schema):
     location: Optional[str] = None
 
 
+class BulkVehicleItem(Schema):
+    """One vehicle of a bulk upsert, matched on plate_number"""
+    name: str
+    brand: str
+    model: str
+    year: int
+    plate_number: str
+    color: str
+    daily_rate: int
+    is_available: bool = True
+    location: str
+
+
+class BulkVehicleRequest(Schema):
+    """DTO for bulk vehicle upsert"""
+    items: List[BulkVehicleItem]
+
+
+class VehicleListQuery(Schema):
+    """Query parameters of GET /vehicles/ (filters are optional, ranges inclusive)"""
+    brand: Optional[str] = None
+    location: Optional[str] = None
+    min_year: Optional[int] = None
+    max_year: Optional[int] = None
+    min_daily_rate: Optional[int] = None
+    max_daily_rate: Optional[int] = None
+    is_available: Optional[bool] = None
+    sort: str = Field("id", description="id, name, year or daily_rate; prefix with - for descending")
+    cursor: Optional[str] = None
+    limit: int = 50
+    stream: bool = False
+
+
+class QuoteRequest(Schema):
+    """DTO for a price quote: vehicle_ids and/or list filters, plus the date range"""
+    start_date: date
+    end_date: date
+    vehicle_ids: Optional[List[int]] = None
+    brand: Optional[str] = None
+    location: Optional[str] = None
+    min_year: Optional[int] = None
+    max_year: Optional[int] = None
+    min_daily_rate: Optional[int] = None
+    max_daily_rate: Optional[int] = None
+    is_available: Optional[bool] = None
+    weekday_multiplier: float = Field(1.0, description="Applied to the daily rate Monday to Friday")
+    weekend_multiplier: float = Field(1.0, description="Applied to the daily rate on Saturday and Sunday")
+
+
 # ========== RESPONSE SCHEMAS (Output DTOs) ==========
 
 class VehicleResponse(Schema):
@@ -45,6 +95,12 @@ class VehicleResponse(Schema):
     location: str
 
 
+class VehiclePageResponse(Schema):
+    """One page of vehicles; pass `next` back as `cursor`"""
+    items: List[VehicleResponse]
+    next: Optional[str] = None
+
+
 class AvailableVehicleResponse(Schema):
     """DTO for available vehicles (with availability info)"""
     id: int
@@ -59,6 +115,74 @@ class AvailableVehicleResponse(Schema):
     location: str
 
 
+class FacetCount(Schema):
+    """Number of results sharing a value"""
+    value: str
+    count: int
+
+
+class PriceBucket(Schema):
+    """Number of results whose daily_rate falls in [min, max]"""
+    min: int
+    max: int
+    count: int
+
+
+class SearchFacets(Schema):
+    """Aggregates of a search result set"""
+    brands: List[FacetCount]
+    locations: List[FacetCount]
+    price_buckets: List[PriceBucket]
+    min_daily_rate: Optional[int] = None
+    max_daily_rate: Optional[int] = None
+
+
+class FacetedSearchResponse(Schema):
+    """Available vehicles with their facets"""
+    vehicles: List[AvailableVehicleResponse]
+    facets: SearchFacets
+
+
+class BulkVehicleResult(Schema):
+    """Outcome of one bulk item: created, updated, unchanged or failed"""
+    plate_number: str
+    status: str
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkVehicleResponse(Schema):
+    """Totals and per-item results of a bulk upsert (input order)"""
+    created: int
+    updated: int
+    unchanged: int
+    failed: int
+    results: List[BulkVehicleResult]
+
+
+class QuoteResponse(Schema):
+    """
+    Totals as parallel columns in vehicle id order (totals[i] prices
+    vehicle_ids[i]); missing_ids lists requested ids that were not found
+    """
+    start_date: date
+    end_date: date
+    days: int
+    weekdays: int
+    weekend_days: int
+    vehicle_ids: List[int]
+    daily_rates: List[int]
+    totals: List[int]
+    missing_ids: List[int]
+
+
+class CacheStatsResponse(Schema):
+    """Cache hit/miss counters"""
+    hits: int
+    misses: int
+    hit_ratio: float
+
+
 # ========== ERROR SCHEMAS ==========
 
 class MessageResponse(Schema):
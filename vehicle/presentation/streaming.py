@@ -0,0 +1,32 @@
+"""
+Streaming JSON - Encode repository tuple rows without per-row schema objects
+"""
+import json
+from typing import Iterable, Iterator, Sequence, Tuple
+
+_encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+
+def json_array_chunks(
+    rows: Iterable[Tuple],
+    fields: Sequence[str],
+    chunk_size: int = 500,
+) -> Iterator[str]:
+    """Yield a JSON array of objects built from tuple rows, chunk_size rows at a time"""
+    # Object keys are encoded once; each row only encodes its values
+    prefixes = ["{" + _encode(name) + ":" for name in fields[:1]]
+    prefixes += ["," + _encode(name) + ":" for name in fields[1:]]
+
+    yield "["
+    buffer = []
+    first = True
+    for row in rows:
+        encoded = "".join(prefix + _encode(value) for prefix, value in zip(prefixes, row)) + "}"
+        buffer.append(encoded if first else "," + encoded)
+        first = False
+        if len(buffer) >= chunk_size:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+    yield "]"
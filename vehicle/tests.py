@@ -1,3 +1,1082 @@
+"""
+Vehicle Tests - Unit Tests for Vehicle Domain
+"""
+import io
+import json
+import tempfile
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from datetime import date, timedelta
+from pathlib import Path
+
+from reservation.models import Reservation
+from reservation.schemas import AddReservationRequest
+from reservation.services import ReservationService
+from user.models import User
+from vehicle.application.service import VehicleService
+from vehicle.domain.entities import UpsertResult, Vehicle as VehicleEntity, VehicleFilter
+from vehicle.domain.exceptions import DuplicatePlateNumberError, VehicleNotFoundError
+from vehicle.domain.pricing import quote_totals, rental_days
+from vehicle.infrastructure.repositories.async_vehicle_repository import AsyncDjangoVehicleRepository
+from vehicle.infrastructure.repositories.cached_vehicle_repository import (
+    AsyncCachedVehicleRepository,
+    CachedVehicleRepository,
+)
+from vehicle.infrastructure.repositories.in_memory_vehicle_repository import InMemoryVehicleRepository
+from vehicle.infrastructure.repositories.vehicle_repository import DjangoVehicleRepository
+from vehicle.infrastructure.search_cache import vehicle_search_cache
+from vehicle.models import Vehicle
+from vehicle.presentation.schemas import BulkVehicleItem, UpdateVehicleRequest, VehicleResponse
+from vehicle.presentation.streaming import json_array_chunks
+
+
+class VehicleSearchTest(TestCase):
+    """Tests for DjangoVehicleRepository.list_available."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.repository = DjangoVehicleRepository()
+        self.user = User.objects.create(
+            username='testuser',
+            password='hashedpassword123'
+        )
+        self.vehicle = Vehicle.objects.create(
+            name='Toyota Avanza',
+            brand='Toyota',
+            model='Avanza',
+            year=2022,
+            plate_number='B 1234 ABC',
+            color='Black',
+            daily_rate=350000,
+            is_available=True,
+            location='Jakarta'
+        )
+        self.vehicle2 = Vehicle.objects.create(
+            name='Honda Brio',
+            brand='Honda',
+            model='Brio',
+            year=2023,
+            plate_number='B 5678 XYZ',
+            color='White',
+            daily_rate=280000,
+            is_available=True,
+            location='Jakarta'
+        )
+        self.start = date.today() + timedelta(days=1)
+        self.end = date.today() + timedelta(days=3)
+    
+    def _search(self, location='Jakarta'):
+        return sorted(v.id for v in self.repository.list_available(location, self.start, self.end))
+    
+    def test_location_is_case_insensitive(self):
+        """Test location matching ignores case and surrounding spaces."""
+        self.assertEqual(self._search('  jAKARTA '), [self.vehicle.id, self.vehicle2.id])
+        self.assertEqual(self._search('Bandung'), [])
+    
+    def test_active_overlap_excludes_vehicle(self):
+        """Test a pending/confirmed overlapping reservation hides the vehicle."""
+        Reservation.objects.create(
+            user=self.user,
+            vehicle=self.vehicle,
+            start_date=self.start + timedelta(days=1),
+            end_date=self.end + timedelta(days=2),
+            status='confirmed'
+        )
+        self.assertEqual(self._search(), [self.vehicle2.id])
+    
+    def test_inactive_reservations_do_not_block(self):
+        """Test cancelled and completed reservations are ignored."""
+        for status in ('cancelled', 'completed'):
+            Reservation.objects.create(
+                user=self.user,
+                vehicle=self.vehicle,
+                start_date=self.start,
+                end_date=self.end,
+                status=status
+            )
+        self.assertEqual(self._search(), [self.vehicle.id, self.vehicle2.id])
+    
+    def test_unavailable_flag_excludes_vehicle(self):
+        """Test vehicles flagged is_available=False are not listed."""
+        Vehicle.objects.filter(id=self.vehicle2.id).update(is_available=False)
+        self.assertEqual(self._search(), [self.vehicle.id])
+
+
+class VehicleSearchCacheTest(TestCase):
+    """Tests for cached vehicle search and its invalidation."""
+    
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        vehicle_search_cache.reset_stats()
+        self.service = VehicleService()
+        self.user = User.objects.create(
+            username='testuser',
+            password='hashedpassword123'
+        )
+        self.vehicle = Vehicle.objects.create(
+            name='Toyota Avanza',
+            brand='Toyota',
+            model='Avanza',
+            year=2022,
+            plate_number='B 1234 ABC',
+            color='Black',
+            daily_rate=350000,
+            is_available=True,
+            location='Jakarta'
+        )
+        self.start = date.today() + timedelta(days=1)
+        self.end = date.today() + timedelta(days=3)
+    
+    def _search(self, location='Jakarta'):
+        return [v['id'] for v in self.service.search_available_vehicles(self.start, self.end, location)]
+    
+    def test_repeated_search_hits_cache(self):
+        """Test the second identical search is served without queries."""
+        self.assertEqual(self._search(), [self.vehicle.id])
+        with self.assertNumQueries(0):
+            self.assertEqual(self._search(' JAKARTA'), [self.vehicle.id])
+        self.assertEqual(vehicle_search_cache.stats()['hits'], 1)
+        self.assertEqual(vehicle_search_cache.stats()['misses'], 1)
+    
+    def test_reservation_create_and_cancel_invalidate(self):
+        """Test booking and cancelling refresh cached results of the location."""
+        self._search()
+        reservation = ReservationService.create(AddReservationRequest(
+            user_id=self.user.id,
+            vehicle_id=self.vehicle.id,
+            start_date=self.start,
+            end_date=self.end
+        ))
+        self.assertEqual(self._search(), [])
+        
+        ReservationService.cancel(reservation.id)
+        self.assertEqual(self._search(), [self.vehicle.id])
+    
+    def test_vehicle_location_change_invalidates_both_locations(self):
+        """Test moving a vehicle refreshes the old and the new location."""
+        self._search()
+        self.assertEqual(self._search('Bandung'), [])
+        
+        self.service.update_vehicle(self.vehicle.id, UpdateVehicleRequest(location='Bandung'))
+        
+        self.assertEqual(self._search(), [])
+        self.assertEqual(self._search('Bandung'), [self.vehicle.id])
+    
+    def test_other_location_stays_cached(self):
+        """Test writes only invalidate the affected location."""
+        self._search('Bandung')
+        self.service.update_vehicle(self.vehicle.id, UpdateVehicleRequest(is_available=False))
+        
+        with self.assertNumQueries(0):
+            self._search('Bandung')
+    
+    def test_write_during_query_is_not_cached_as_fresh(self):
+        """Test results read before a concurrent invalidation are not served afterwards."""
+        list_available = self.service.repository.list_available
+        
+        def racing_list_available(*args):
+            vehicles = list_available(*args)
+            # A booking lands between the query and the cache write
+            Vehicle.objects.filter(id=self.vehicle.id).update(is_available=False)
+            vehicle_search_cache.invalidate_locations(['Jakarta'])
+            return vehicles
+        
+        self.service.repository.list_available = racing_list_available
+        self.assertEqual(self._search(), [self.vehicle.id])
+        self.service.repository.list_available = list_available
+        
+        self.assertEqual(self._search(), [])
+    
+    async def test_async_write_during_query_is_not_cached_as_fresh(self):
+        """Test the async search stores results under the key read before its query."""
+        repository = self.service.async_repository
+        list_available = repository.list_available
+        
+        async def racing_list_available(*args):
+            vehicles = await list_available(*args)
+            await Vehicle.objects.filter(id=self.vehicle.id).aupdate(is_available=False)
+            await sync_to_async(vehicle_search_cache.invalidate_locations)(['Jakarta'])
+            return vehicles
+        
+        repository.list_available = racing_list_available
+        results = await self.service.asearch_available_vehicles(self.start, self.end, 'Jakarta')
+        self.assertEqual([v['id'] for v in results], [self.vehicle.id])
+        repository.list_available = list_available
+        
+        results = await self.service.asearch_available_vehicles(self.start, self.end, 'Jakarta')
+        self.assertEqual(results, [])
+
+
+class CachedVehicleRepositoryTest(TestCase):
+    """Tests for the read-through vehicle cache."""
+    
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.repository = CachedVehicleRepository(DjangoVehicleRepository(), max_entries=2, ttl=60)
+        self.vehicles = [
+            Vehicle.objects.create(
+                name=f'Vehicle {i}',
+                brand='Toyota',
+                model='Avanza',
+                year=2022,
+                plate_number=f'B {i} ABC',
+                color='Black',
+                daily_rate=350000,
+                is_available=True,
+                location='Jakarta'
+            )
+            for i in range(3)
+        ]
+    
+    def test_get_by_id_served_from_cache(self):
+        """Test repeated reads skip the database and return independent copies."""
+        first = self.repository.get_by_id(self.vehicles[0].id)
+        first.name = 'Mutated by caller'
+        
+        with self.assertNumQueries(0):
+            second = self.repository.get_by_id(self.vehicles[0].id)
+        self.assertEqual(second.name, 'Vehicle 0')
+    
+    def test_save_invalidates_entry_and_list(self):
+        """Test save drops the cached vehicle and the cached list."""
+        self.repository.list_all()
+        vehicle = self.repository.get_by_id(self.vehicles[0].id)
+        vehicle.daily_rate = 400000
+        self.repository.save(vehicle)
+        
+        self.assertEqual(self.repository.get_by_id(vehicle.id).daily_rate, 400000)
+        self.assertEqual(
+            {v.id: v.daily_rate for v in self.repository.list_all()}[vehicle.id],
+            400000
+        )
+    
+    def test_version_bump_from_another_worker(self):
+        """Test a write through another repository instance is seen here."""
+        self.repository.get_by_id(self.vehicles[0].id)
+        other_worker = CachedVehicleRepository(DjangoVehicleRepository())
+        other_worker.delete(self.vehicles[0].id)
+        
+        self.assertIsNone(self.repository.get_by_id(self.vehicles[0].id))
+    
+    def test_lru_is_bounded(self):
+        """Test least recently used entries are evicted past max_entries."""
+        for vehicle in self.vehicles:
+            self.repository.get_by_id(vehicle.id)
+        
+        with self.assertNumQueries(1):
+            self.repository.get_by_id(self.vehicles[0].id)
+
+
+class VehicleListStreamingTest(TestCase):
+    """Test the projection path of the vehicle list"""
+    
+    def setUp(self):
+        """Setup test data"""
+        cache.clear()
+        self.vehicles = [
+            Vehicle.objects.create(
+                name=f'Vehicle {i}',
+                brand='Toyota',
+                model='Avanza',
+                year=2022,
+                plate_number=f'B {i} STR',
+                color='White',
+                daily_rate=300000 + i,
+                location='Jakarta "Pusat"'
+            )
+            for i in range(3)
+        ]
+    
+    def test_list_matches_response_schema(self):
+        """Test streamed rows decode to the same objects as VehicleResponse."""
+        response = self.client.get('/api/vehicles/', {'stream': 'true'})
+        
+        self.assertEqual(response.status_code, 200)
+        body = json.loads(b''.join(response.streaming_content))
+        expected = [
+            VehicleResponse(**VehicleService._entity_to_dict(v)).dict()
+            for v in DjangoVehicleRepository().list_all()
+        ]
+        self.assertEqual(body, expected)
+    
+    def test_iter_rows_is_one_query(self):
+        """Test rows come from a single query as tuples in field order."""
+        with self.assertNumQueries(1):
+            rows = list(DjangoVehicleRepository().iter_rows())
+        
+        self.assertEqual(len(rows), 3)
+        self.assertIsInstance(rows[0], tuple)
+        self.assertEqual(rows[0][0], self.vehicles[0].id)
+    
+    def test_chunks_form_valid_json(self):
+        """Test chunk boundaries and empty input still produce valid arrays."""
+        rows = [(i, f'name {i}') for i in range(5)]
+        body = ''.join(json_array_chunks(rows, ('id', 'name'), chunk_size=2))
+        
+        self.assertEqual(json.loads(body), [{'id': i, 'name': f'name {i}'} for i in range(5)])
+        self.assertEqual(json.loads(''.join(json_array_chunks([], ('id',)))), [])
+
+
+class VehicleListFilterTest(TestCase):
+    """Test filters, sorting and keyset pagination of GET /vehicles/"""
+    
+    def setUp(self):
+        """Setup test data"""
+        cache.clear()
+        self.vehicles = [
+            Vehicle.objects.create(
+                name=f'Vehicle {i}',
+                brand='Toyota' if i % 2 else 'Honda',
+                model='Model',
+                year=2018 + i % 4,
+                plate_number=f'B {i} FLT',
+                color='White',
+                daily_rate=200000 + i % 3 * 50000,
+                is_available=i != 0,
+                location='Jakarta' if i < 6 else 'Bandung'
+            )
+            for i in range(10)
+        ]
+    
+    def _walk(self, params):
+        """Follow next cursors and return every id in order."""
+        ids, cursor = [], None
+        while True:
+            query = dict(params, limit=3)
+            if cursor:
+                query['cursor'] = cursor
+            response = self.client.get('/api/vehicles/', query)
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            ids += [item['id'] for item in page['items']]
+            cursor = page['next']
+            if not cursor:
+                return ids
+    
+    def test_filters_combine(self):
+        """Test brand (case-insensitive), year range and availability filters."""
+        response = self.client.get('/api/vehicles/', {
+            'brand': 'toyota', 'min_year': 2019, 'max_year': 2020, 'is_available': 'true'
+        })
+        
+        expected = [
+            v.id for v in self.vehicles
+            if v.brand == 'Toyota' and 2019 <= v.year <= 2020 and v.is_available
+        ]
+        self.assertEqual([item['id'] for item in response.json()['items']], expected)
+    
+    def test_keyset_pages_cover_every_row_once(self):
+        """Test descending rate pages with ties return each vehicle exactly once."""
+        ids = self._walk({'sort': '-daily_rate', 'location': 'Jakarta'})
+        
+        expected = sorted(
+            (v for v in self.vehicles if v.location == 'Jakarta'),
+            key=lambda v: (v.daily_rate, v.id),
+            reverse=True
+        )
+        self.assertEqual(ids, [v.id for v in expected])
+    
+    def test_rate_range_sorted_by_year(self):
+        """Test rate range filter with an ascending year sort."""
+        ids = self._walk({'sort': 'year', 'min_daily_rate': 250000, 'max_daily_rate': 300000})
+        
+        expected = sorted(
+            (v for v in self.vehicles if 250000 <= v.daily_rate <= 300000),
+            key=lambda v: (v.year, v.id)
+        )
+        self.assertEqual(ids, [v.id for v in expected])
+    
+    def test_invalid_sort_and_cursor(self):
+        """Test unknown sort fields and foreign cursors are rejected."""
+        self.assertEqual(self.client.get('/api/vehicles/', {'sort': 'plate_number'}).status_code, 400)
+        
+        cursor = self.client.get('/api/vehicles/', {'sort': 'year', 'limit': 1}).json()['next']
+        response = self.client.get('/api/vehicles/', {'sort': 'name', 'cursor': cursor})
+        self.assertEqual(response.status_code, 400)
+
+
+class VehicleSearchFacetsTest(TestCase):
+    """Test facet counts of vehicle search"""
+    
+    def setUp(self):
+        """Setup test data"""
+        cache.clear()
+        self.service = VehicleService()
+        for i, (brand, rate) in enumerate([
+            ('Toyota', 250000), ('Toyota', 350000), ('Honda', 399999), ('Suzuki', 120000)
+        ]):
+            Vehicle.objects.create(
+                name=f'Vehicle {i}',
+                brand=brand,
+                model='Model',
+                year=2022,
+                plate_number=f'B {i} FCT',
+                color='White',
+                daily_rate=rate,
+                location='Jakarta'
+            )
+        self.start = date.today() + timedelta(days=1)
+        self.end = date.today() + timedelta(days=3)
+    
+    def test_facets_from_single_query(self):
+        """Test vehicles and facets come from one search query."""
+        with self.assertNumQueries(1):
+            result = self.service.search_available_vehicles(
+                self.start, self.end, 'Jakarta', facets=True
+            )
+        
+        facets = result['facets']
+        self.assertEqual(len(result['vehicles']), 4)
+        self.assertEqual(facets['brands'][0], {'value': 'Toyota', 'count': 2})
+        self.assertEqual(facets['locations'], [{'value': 'Jakarta', 'count': 4}])
+        self.assertEqual(
+            [(b['min'], b['count']) for b in facets['price_buckets']],
+            [(100000, 1), (200000, 1), (300000, 2)]
+        )
+        self.assertEqual((facets['min_daily_rate'], facets['max_daily_rate']), (120000, 399999))
+    
+    def test_facets_endpoint(self):
+        """Test the facets endpoint, empty results and bucket validation."""
+        params = {'start_date': self.start, 'end_date': self.end}
+        response = self.client.get('/api/vehicles/search/facets', dict(params, location='Bandung'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['facets']['price_buckets'], [])
+        self.assertIsNone(response.json()['facets']['min_daily_rate'])
+        
+        response = self.client.get(
+            '/api/vehicles/search/facets', dict(params, location='Jakarta', price_bucket=0)
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class AsyncVehicleReadTest(TestCase):
+    """Test the async repository and async read endpoints"""
+    
+    def setUp(self):
+        """Setup test data"""
+        cache.clear()
+        self.vehicles = [
+            Vehicle.objects.create(
+                name=f'Vehicle {i}',
+                brand='Toyota',
+                model='Avanza',
+                year=2022,
+                plate_number=f'B {i} ASY',
+                color='White',
+                daily_rate=300000 + i,
+                location='Jakarta'
+            )
+            for i in range(3)
+        ]
+    
+    async def test_async_repository_matches_sync(self):
+        """Test async reads return the same entities and rows as the sync repository."""
+        sync, repository = DjangoVehicleRepository(), AsyncDjangoVehicleRepository()
+        vehicle_id = self.vehicles[0].id
+        today = date.today()
+        
+        self.assertEqual(
+            await repository.get_by_id(vehicle_id),
+            await sync_to_async(sync.get_by_id)(vehicle_id)
+        )
+        self.assertIsNone(await repository.get_by_id(0))
+        self.assertEqual(
+            await repository.list_page(sort='daily_rate', descending=True, limit=2),
+            await sync_to_async(sync.list_page)(sort='daily_rate', descending=True, limit=2)
+        )
+        self.assertEqual(
+            await repository.list_available('jakarta', today, today),
+            await sync_to_async(sync.list_available)('jakarta', today, today)
+        )
+    
+    async def test_async_cache_shares_sync_invalidation(self):
+        """Test async reads are cached and dropped by sync writes."""
+        cached = CachedVehicleRepository(DjangoVehicleRepository())
+        repository = AsyncCachedVehicleRepository(AsyncDjangoVehicleRepository(), cached)
+        vehicle_id = self.vehicles[0].id
+        await repository.get_by_id(vehicle_id)
+        
+        hit, _ = cached.lookup_vehicle(vehicle_id, await cached.avehicle_version(vehicle_id))
+        self.assertTrue(hit)
+        
+        vehicle = await sync_to_async(cached.get_by_id)(vehicle_id)
+        vehicle.name = 'Renamed'
+        await sync_to_async(cached.save)(vehicle)
+        self.assertEqual((await repository.get_by_id(vehicle_id)).name, 'Renamed')
+    
+    async def test_async_endpoints(self):
+        """Test async list, get and search endpoints under the ASGI handler."""
+        response = await self.async_client.get('/api/vehicles/', {'limit': 2, 'sort': '-daily_rate'})
+        self.assertEqual([v['id'] for v in response.json()['items']], [self.vehicles[2].id, self.vehicles[1].id])
+        
+        response = await self.async_client.get(f'/api/vehicles/{self.vehicles[0].id}')
+        self.assertEqual(response.json()['name'], 'Vehicle 0')
+        self.assertEqual((await self.async_client.get('/api/vehicles/0')).status_code, 404)
+        
+        today = date.today()
+        response = await self.async_client.get(
+            '/api/vehicles/search', {'start_date': today, 'end_date': today, 'location': 'Jakarta'}
+        )
+        self.assertEqual(len(response.json()), 3)
+
+
+class VehicleBulkUpsertTest(TestCase):
+    """Test bulk upsert keyed on plate_number"""
+    
+    def setUp(self):
+        """Setup test data"""
+        cache.clear()
+        self.existing = Vehicle.objects.create(
+            name='Toyota Avanza',
+            brand='Toyota',
+            model='Avanza',
+            year=2022,
+            plate_number='B 1 BLK',
+            color='Black',
+            daily_rate=350000,
+            location='Jakarta'
+        )
+    
+    def _item(self, plate, **overrides):
+        item = {
+            'name': 'Toyota Avanza', 'brand': 'Toyota', 'model': 'Avanza', 'year': 2022,
+            'plate_number': plate, 'color': 'Black', 'daily_rate': 350000, 'location': 'Jakarta'
+        }
+        item.update(overrides)
+        return item
+    
+    def _post(self, items):
+        return self.client.post('/api/vehicles/bulk', {'items': items}, content_type='application/json')
+    
+    def test_per_item_results(self):
+        """Test created, updated, unchanged and duplicate items in input order."""
+        response = self._post([
+            self._item('B 2 BLK'),
+            self._item('B 1 BLK', daily_rate=400000),
+            self._item('B 2 BLK', color='Red'),
+            self._item('B 3 BLK'),
+        ])
+        
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(
+            [r['status'] for r in body['results']],
+            ['created', 'updated', 'failed', 'created']
+        )
+        self.assertEqual(body['results'][1]['id'], self.existing.id)
+        self.assertEqual((body['created'], body['updated'], body['failed']), (2, 1, 1))
+        self.assertEqual(Vehicle.objects.get(id=self.existing.id).daily_rate, 400000)
+        
+        body = self._post([self._item('B 3 BLK')]).json()
+        self.assertEqual(body['results'][0]['status'], 'unchanged')
+    
+    def test_query_count_does_not_grow_with_items(self):
+        """Test a batch costs the same number of queries for 5 or 50 vehicles."""
+        service = VehicleService()
+        
+        def upsert(count, prefix):
+            items = [BulkVehicleItem(**self._item(f'{prefix} {i}')) for i in range(count)]
+            items.append(BulkVehicleItem(**self._item('B 1 BLK', year=2020 + count)))
+            with CaptureQueriesContext(connection) as queries:
+                service.upsert_vehicles(items)
+            return len(queries)
+        
+        self.assertEqual(upsert(5, 'S'), upsert(50, 'L'))
+    
+    def test_location_change_invalidates_search_cache(self):
+        """Test a bulk move drops cached searches of the old location."""
+        service = VehicleService()
+        today = date.today()
+        self.assertEqual(len(service.search_available_vehicles(today, today, 'Jakarta')), 1)
+        
+        service.upsert_vehicles([BulkVehicleItem(**self._item('B 1 BLK', location='Bandung'))])
+        
+        self.assertEqual(service.search_available_vehicles(today, today, 'Jakarta'), [])
+        self.assertEqual(service.get_vehicle_by_id(self.existing.id)['location'], 'Bandung')
+
+
+class VehicleChangeTrackingTest(TestCase):
+    """Test dirty-field tracking and single-statement updates"""
+    
+    def setUp(self):
+        """Setup test data"""
+        cache.clear()
+        self.vehicle = Vehicle.objects.create(
+            name='Toyota Avanza',
+            brand='Toyota',
+            model='Avanza',
+            year=2022,
+            plate_number='B 1 TRK',
+            color='Black',
+            daily_rate=350000,
+            location='Jakarta'
+        )
+        self.repository = DjangoVehicleRepository()
+    
+    def test_entity_records_changed_fields(self):
+        """Test loaded entities start clean and every assignment is recorded."""
+        vehicle = self.repository.get_by_id(self.vehicle.id)
+        self.assertEqual(vehicle.changed_fields(), frozenset())
+        
+        vehicle.name = 'Toyota Avanza'
+        vehicle.daily_rate = 400000
+        vehicle.mark_unavailable()
+        self.assertEqual(vehicle.changed_fields(), {'name', 'daily_rate', 'is_available'})
+        self.assertEqual(self.repository.save(vehicle).changed_fields(), frozenset())
+    
+    def test_save_is_one_update_of_changed_columns(self):
+        """Test save writes the changed column only, without a SELECT."""
+        vehicle = self.repository.get_by_id(self.vehicle.id)
+        vehicle.daily_rate = 400000
+        
+        with CaptureQueriesContext(connection) as queries:
+            self.repository.save(vehicle)
+        
+        self.assertEqual(len(queries), 1)
+        sql = queries[0]['sql']
+        self.assertTrue(sql.startswith('UPDATE'))
+        self.assertIn('daily_rate', sql)
+        self.assertNotIn('plate_number', sql)
+        self.assertEqual(Vehicle.objects.get(id=self.vehicle.id).daily_rate, 400000)
+    
+    def test_save_missing_vehicle(self):
+        """Test save of a deleted vehicle raises not found from the row count."""
+        vehicle = self.repository.get_by_id(self.vehicle.id)
+        Vehicle.objects.filter(id=self.vehicle.id).delete()
+        vehicle.color = 'Red'
+        
+        with self.assertNumQueries(1):
+            with self.assertRaises(VehicleNotFoundError):
+                self.repository.save(vehicle)
+    
+    def test_service_update_from_cache_is_one_query(self):
+        """Test a service update of a cached vehicle costs a single query."""
+        service = VehicleService()
+        service.get_vehicle_by_id(self.vehicle.id)
+        
+        with self.assertNumQueries(1):
+            updated = service.update_vehicle(self.vehicle.id, UpdateVehicleRequest(color='Red'))
+        
+        self.assertEqual(updated['color'], 'Red')
+        self.assertEqual(service.get_vehicle_by_id(self.vehicle.id)['color'], 'Red')
+    
+    def test_update_to_cached_value_after_row_changed(self):
+        """Test an update matching a stale cached value is still written."""
+        service = VehicleService()
+        service.get_vehicle_by_id(self.vehicle.id)
+        # Another worker changed the row; this worker's cache still says Black
+        Vehicle.objects.filter(id=self.vehicle.id).update(color='White')
+        
+        updated = service.update_vehicle(self.vehicle.id, UpdateVehicleRequest(color='Black'))
+        
+        self.assertEqual(updated['color'], 'Black')
+        self.assertEqual(Vehicle.objects.get(id=self.vehicle.id).color, 'Black')
+
+
+class VehicleSoftDeleteTest(TestCase):
+    """Test soft-deleted vehicles are hidden from every read"""
+    
+    def setUp(self):
+        """Setup test data"""
+        cache.clear()
+        self.user = User.objects.create(username='softdelete', password='hashed')
+        self.vehicle = Vehicle.objects.create(
+            name='Toyota Avanza',
+            brand='Toyota',
+            model='Avanza',
+            year=2022,
+            plate_number='B 1 DEL',
+            color='Black',
+            daily_rate=350000,
+            location='Jakarta'
+        )
+        self.start = date.today() + timedelta(days=3)
+        self.end = self.start + timedelta(days=2)
+        self.reservation = Reservation.objects.create(
+            user=self.user, vehicle=self.vehicle, start_date=self.start, end_date=self.end
+        )
+        self.service = VehicleService()
+    
+    def test_delete_keeps_row_and_reservations(self):
+        """Test delete only flips the tombstone; nothing cascades."""
+        with self.assertNumQueries(1):
+            DjangoVehicleRepository().delete(self.vehicle.id)
+        
+        self.assertTrue(Vehicle.all_objects.get(id=self.vehicle.id).is_deleted)
+        self.assertTrue(Reservation.objects.filter(id=self.reservation.id).exists())
+        with self.assertRaises(VehicleNotFoundError):
+            DjangoVehicleRepository().delete(self.vehicle.id)
+    
+    def test_deleted_vehicle_is_hidden(self):
+        """Test get, list and search skip a deleted vehicle and its reservations."""
+        self.service.get_vehicle_by_id(self.vehicle.id)
+        self.service.delete_vehicle(self.vehicle.id)
+        
+        with self.assertRaises(VehicleNotFoundError):
+            self.service.get_vehicle_by_id(self.vehicle.id)
+        self.assertEqual(self.service.get_all_vehicles(), [])
+        self.assertEqual(
+            self.service.search_available_vehicles(self.end + timedelta(days=5), self.end + timedelta(days=6), 'Jakarta'),
+            []
+        )
+        self.assertIsNone(ReservationService.get_by_id(self.reservation.id))
+        self.assertEqual(ReservationService.get_all(), [])
+    
+    def test_plate_number_is_reusable(self):
+        """Test a deleted vehicle's plate number can be registered again."""
+        self.service.delete_vehicle(self.vehicle.id)
+        
+        results = self.service.upsert_vehicles([BulkVehicleItem(
+            name='Honda Jazz', brand='Honda', model='Jazz', year=2021,
+            plate_number='B 1 DEL', color='White', daily_rate=300000, location='Jakarta'
+        )])
+        
+        self.assertEqual(results['created'], 1)
+        self.assertEqual(Vehicle.all_objects.filter(plate_number='B 1 DEL').count(), 2)
+    
+    def test_deleted_vehicle_cannot_be_booked(self):
+        """Test the booking insert refuses a deleted vehicle."""
+        self.service.delete_vehicle(self.vehicle.id)
+        
+        with self.assertRaises(ValueError):
+            ReservationService.create(AddReservationRequest(
+                user_id=self.user.id,
+                vehicle_id=self.vehicle.id,
+                start_date=self.end + timedelta(days=5),
+                end_date=self.end + timedelta(days=6)
+            ))
+
+
+class VehicleQuoteTest(TestCase):
+    """Test batched price quotes"""
+    
+    def setUp(self):
+        """Setup test data"""
+        cache.clear()
+        self.vehicles = [
+            Vehicle.objects.create(
+                name=f'Car {i}', brand='Toyota' if i < 3 else 'Honda', model='M', year=2022,
+                plate_number=f'B {i} QTE', color='Black', daily_rate=100000 * (i + 1), location='Jakarta'
+            )
+            for i in range(5)
+        ]
+        # Friday to Tuesday: Fri, Sat, Sun, Mon charged
+        self.start = date(2030, 1, 4)
+        self.end = date(2030, 1, 8)
+    
+    def test_rental_days_match_calendar(self):
+        """Test the weekday/weekend split against walking every day."""
+        for offset in range(7):
+            start = date(2030, 1, 1) + timedelta(days=offset)
+            for length in range(1, 30):
+                charged = [start + timedelta(days=d) for d in range(length)]
+                days = rental_days(start, start + timedelta(days=length))
+                self.assertEqual(days.weekend_days, sum(1 for d in charged if d.weekday() >= 5))
+                self.assertEqual(days.total, length)
+        with self.assertRaises(ValueError):
+            rental_days(self.end, self.start)
+    
+    def test_quote_totals_with_multipliers(self):
+        """Test weekday and weekend days are priced separately."""
+        days = rental_days(self.start, self.end)
+        self.assertEqual((days.weekdays, days.weekend_days), (2, 2))
+        self.assertEqual(quote_totals([100000, 250000], days), [400000, 1000000])
+        self.assertEqual(quote_totals([100000], days, 1.0, 1.5), [500000])
+        self.assertEqual(quote_totals([100001], days, 0.9, 1.25), [430004])
+        with self.assertRaises(ValueError):
+            quote_totals([100000], days, 0, 1)
+    
+    def test_quote_by_ids_is_one_query(self):
+        """Test quoting by id fetches all rates at once and reports unknown ids."""
+        ids = [self.vehicles[3].id, self.vehicles[0].id, 999999]
+        
+        with self.assertNumQueries(1):
+            quote = VehicleService().quote_vehicles(self.start, self.end, ids, weekend_multiplier=1.5)
+        
+        self.assertEqual(quote['days'], 4)
+        self.assertEqual(quote['vehicle_ids'], [self.vehicles[0].id, self.vehicles[3].id])
+        self.assertEqual(quote['daily_rates'], [100000, 400000])
+        self.assertEqual(quote['totals'], [500000, 2000000])
+        self.assertEqual(quote['missing_ids'], [999999])
+    
+    def test_quote_endpoint_with_filters(self):
+        """Test the endpoint quotes the vehicles matching the filters."""
+        response = self.client.post('/api/vehicles/quote', {
+            'start_date': '2030-01-04',
+            'end_date': '2030-01-08',
+            'brand': 'honda',
+        }, content_type='application/json')
+        
+        self.assertEqual(response.status_code, 200)
+        quote = response.json()
+        self.assertEqual(quote['vehicle_ids'], [self.vehicles[3].id, self.vehicles[4].id])
+        self.assertEqual(quote['totals'], [1600000, 2000000])
+    
+    def test_quote_endpoint_validation(self):
+        """Test a quote needs vehicles to price and a valid range."""
+        body = {'start_date': '2030-01-04', 'end_date': '2030-01-08'}
+        
+        response = self.client.post('/api/vehicles/quote', body, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        
+        body.update(end_date='2030-01-04', vehicle_ids=[self.vehicles[0].id])
+        response = self.client.post('/api/vehicles/quote', body, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+    
+    def test_quote_by_filters_is_capped(self):
+        """Test filters selecting more vehicles than the cap are rejected, not quoted."""
+        service = VehicleService()
+        
+        with mock.patch('vehicle.application.service.MAX_QUOTE_VEHICLES', 3):
+            self.assertEqual(
+                len(service.quote_vehicles(self.start, self.end, filters=VehicleFilter(brand='toyota'))['totals']), 3
+            )
+            with self.assertNumQueries(1), self.assertRaises(ValueError):
+                service.quote_vehicles(self.start, self.end, filters=VehicleFilter(is_available=True))
+
+
+class VehicleRepositoryContract:
+    """
+    Behaviour every VehicleRepository must share. Subclasses provide
+    make_repository() and add_reservation() for their storage.
+    """
+    
+    def make_repository(self):
+        raise NotImplementedError
+    
+    def add_reservation(self, vehicle_id, start_date, end_date, status='pending'):
+        raise NotImplementedError
+    
+    def setUp(self):
+        """Setup test data"""
+        cache.clear()
+        self.repository = self.make_repository()
+        self.vehicles = [
+            self.repository.save(self.entity(i, location='Jakarta' if i < 4 else 'Bandung'))
+            for i in range(6)
+        ]
+    
+    @staticmethod
+    def entity(i, **overrides):
+        fields = dict(
+            id=None, name=f'Car {i}', brand='Toyota' if i % 2 else 'Honda', model='M',
+            year=2018 + i, plate_number=f'B {i} CTR', color='Black',
+            daily_rate=100000 * (i + 1), is_available=True, location='Jakarta',
+        )
+        fields.update(overrides)
+        return VehicleEntity(**fields)
+    
+    def ids(self, vehicles):
+        return [v.id for v in vehicles]
+    
+    def test_save_assigns_ids_and_get_returns_copies(self):
+        """Test created vehicles get ids and reads cannot change stored state."""
+        self.assertEqual(len(set(self.ids(self.vehicles))), 6)
+        
+        vehicle = self.repository.get_by_id(self.vehicles[0].id)
+        self.assertEqual(vehicle, self.vehicles[0])
+        self.assertEqual(vehicle.changed_fields(), frozenset())
+        vehicle.name = 'Mutated'
+        self.assertEqual(self.repository.get_by_id(vehicle.id).name, 'Car 0')
+        self.assertIsNone(self.repository.get_by_id(999999))
+    
+    def test_update_writes_changed_fields_only(self):
+        """Test save applies the changed fields and keeps stored values of the rest."""
+        first = self.repository.get_by_id(self.vehicles[0].id)
+        second = self.repository.get_by_id(self.vehicles[0].id)
+        first.color = 'Red'
+        self.repository.save(first)
+        second.daily_rate = 1
+        self.repository.save(second)
+        
+        stored = self.repository.get_by_id(self.vehicles[0].id)
+        self.assertEqual((stored.color, stored.daily_rate), ('Red', 1))
+        
+        missing = self.entity(9, id=999999)
+        with self.assertRaises(VehicleNotFoundError):
+            self.repository.save(missing)
+    
+    def test_duplicate_plate_is_rejected(self):
+        """Test a live plate number cannot be taken twice."""
+        with self.assertRaises(DuplicatePlateNumberError):
+            self.repository.save(self.entity(9, plate_number='B 0 CTR'))
+    
+    def test_list_filters_in_id_order(self):
+        """Test list_all, iter_rows, list_rates and list_page agree on filters."""
+        filters = VehicleFilter(brand='TOYOTA', location='jakarta', min_year=2019)
+        expected = [self.vehicles[1].id, self.vehicles[3].id]
+        
+        self.assertEqual(sorted(self.ids(self.repository.list_all(filters))), expected)
+        self.assertEqual([row[0] for row in self.repository.iter_rows(filters)], expected)
+        self.assertEqual(
+            self.repository.list_rates(None, filters),
+            [(self.vehicles[1].id, 200000), (self.vehicles[3].id, 400000)]
+        )
+        self.assertEqual(
+            self.repository.list_rates([self.vehicles[1].id, self.vehicles[5].id, 999999]),
+            [(self.vehicles[1].id, 200000), (self.vehicles[5].id, 600000)]
+        )
+        self.assertEqual(self.repository.list_rates(limit=2), [(self.vehicles[0].id, 100000), (self.vehicles[1].id, 200000)])
+        self.assertEqual(len(self.repository.list_all()), 6)
+    
+    def test_list_page_keyset(self):
+        """Test pages follow (sort, id) order from the keyset."""
+        rows = self.repository.list_page(None, 'daily_rate', True, None, 2)
+        self.assertEqual([row[0] for row in rows], [self.vehicles[5].id, self.vehicles[4].id])
+        
+        rows = self.repository.list_page(None, 'daily_rate', True, (rows[-1][7], rows[-1][0]), 10)
+        self.assertEqual([row[0] for row in rows], self.ids(reversed(self.vehicles[:4])))
+    
+    def test_list_available(self):
+        """Test availability: location ignores case, active overlaps block inclusively."""
+        start, end = date(2030, 1, 10), date(2030, 1, 12)
+        self.add_reservation(self.vehicles[0].id, date(2030, 1, 12), date(2030, 1, 14))
+        self.add_reservation(self.vehicles[1].id, date(2030, 1, 1), date(2030, 1, 9), 'confirmed')
+        self.add_reservation(self.vehicles[2].id, date(2030, 1, 10), date(2030, 1, 11), 'cancelled')
+        unavailable = self.repository.get_by_id(self.vehicles[3].id)
+        unavailable.mark_unavailable()
+        self.repository.save(unavailable)
+        
+        available = self.repository.list_available(' JAKARTA ', start, end)
+        
+        self.assertEqual(sorted(self.ids(available)), [self.vehicles[1].id, self.vehicles[2].id])
+        self.assertEqual(self.repository.list_available('Medan', start, end), [])
+    
+    def test_save_many_upserts_on_plate(self):
+        """Test save_many reports created, updated and unchanged in input order."""
+        results = self.repository.save_many([
+            self.entity(0),
+            self.entity(1, daily_rate=1, location='Bandung'),
+            self.entity(7),
+        ])
+        
+        self.assertEqual(
+            [r.status for r in results],
+            [UpsertResult.UNCHANGED, UpsertResult.UPDATED, UpsertResult.CREATED]
+        )
+        self.assertEqual(results[0].vehicle.id, self.vehicles[0].id)
+        self.assertEqual(results[1].previous.location, 'Jakarta')
+        self.assertIsNone(results[2].previous)
+        self.assertEqual(self.repository.get_by_id(results[2].vehicle.id).plate_number, 'B 7 CTR')
+        self.assertEqual(
+            sorted(self.ids(self.repository.list_available('bandung', date(2030, 1, 1), date(2030, 1, 2)))),
+            [self.vehicles[1].id, self.vehicles[4].id, self.vehicles[5].id]
+        )
+    
+    def test_delete_hides_vehicle_and_frees_plate(self):
+        """Test deleted vehicles disappear from reads and their plate can be reused."""
+        self.repository.delete(self.vehicles[0].id)
+        
+        self.assertIsNone(self.repository.get_by_id(self.vehicles[0].id))
+        self.assertNotIn(self.vehicles[0].id, self.ids(self.repository.list_all()))
+        self.assertNotIn(
+            self.vehicles[0].id,
+            self.ids(self.repository.list_available('Jakarta', date(2030, 1, 1), date(2030, 1, 2)))
+        )
+        self.repository.save(self.entity(0))
+        with self.assertRaises(VehicleNotFoundError):
+            self.repository.delete(self.vehicles[0].id)
+    
+    def test_service_search_matches(self):
+        """Test the service layer runs unchanged on the repository."""
+        service = VehicleService(self.repository)
+        
+        results = service.search_available_vehicles(date(2030, 2, 1), date(2030, 2, 3), 'Bandung')
+        
+        self.assertEqual([r['id'] for r in results], [self.vehicles[4].id, self.vehicles[5].id])
+
+
+class DjangoVehicleRepositoryContractTest(VehicleRepositoryContract, TestCase):
+    """Test DjangoVehicleRepository against the repository contract"""
+    
+    def make_repository(self):
+        return DjangoVehicleRepository()
+    
+    def add_reservation(self, vehicle_id, start_date, end_date, status='pending'):
+        user, _ = User.objects.get_or_create(username='contract', defaults={'password': '!'})
+        Reservation.objects.create(
+            user=user, vehicle_id=vehicle_id, start_date=start_date, end_date=end_date, status=status
+        )
+
+
+class InMemoryVehicleRepositoryContractTest(VehicleRepositoryContract, TestCase):
+    """Test InMemoryVehicleRepository against the repository contract"""
+    
+    def make_repository(self):
+        return InMemoryVehicleRepository()
+    
+    def add_reservation(self, vehicle_id, start_date, end_date, status='pending'):
+        self.repository.add_reservation(vehicle_id, start_date, end_date, status)
+    
+    def test_runs_without_queries(self):
+        """Test reads never touch the database."""
+        with self.assertNumQueries(0):
+            self.repository.list_available('Jakarta', date(2030, 1, 1), date(2030, 1, 2))
+            self.repository.list_page(None, 'year', False, None, 3)
+            self.repository.get_by_id(self.vehicles[0].id)
+
 
-# Create your tests here.
+class LoadVehiclesCommandTest(TestCase):
+    """Test chunked load_vehicles with exact counts"""
+    
+    def setUp(self):
+        """Setup test data"""
+        cache.clear()
+        Vehicle.objects.create(
+            name='Toyota Avanza', brand='Toyota', model='Avanza', year=2022,
+            plate_number='B 1 LOD', color='Black', daily_rate=350000, location='Jakarta'
+        )
+    
+    def load(self, items, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            data_file = Path(directory) / 'vehicles.json'
+            data_file.write_text(json.dumps(items))
+            out = io.StringIO()
+            call_command('load_vehicles', file=data_file, batch_size=2, stdout=out, **options)
+        return out.getvalue()
+    
+    def item(self, plate, **overrides):
+        item = dict(
+            name='Honda Jazz', brand='Honda', model='Jazz', year=2021, plate_number=plate,
+            color='White', daily_rate=300000, is_available=True, location='Bandung',
+        )
+        item.update(overrides)
+        return item
+    
+    def test_insert_skips_existing_and_reports_exact_counts(self):
+        """Test existing, repeated and invalid vehicles are counted as skipped, not inserted."""
+        output = self.load([
+            self.item('B 1 LOD'),
+            self.item('B 2 LOD'),
+            self.item('B 3 LOD'),
+            self.item('B 3 LOD'),
+            {'plate_number': 'B 4 LOD'},
+        ])
+        
+        self.assertIn('Inserted 2 vehicles, updated 0, skipped 3 '
+                      '(0 unchanged, 1 already exist, 1 duplicate plates, 1 invalid)', output)
+        self.assertEqual(Vehicle.objects.get(plate_number='B 1 LOD').daily_rate, 350000)
+        self.assertEqual(Vehicle.objects.count(), 3)
+    
+    def test_upsert_updates_changed_vehicles(self):
+        """Test --upsert updates rate and location of existing plates."""
+        self.load([self.item('B 2 LOD')])
+        
+        output = self.load([
+            self.item('B 1 LOD', name='Toyota Avanza', brand='Toyota', model='Avanza', year=2022,
+                      color='Black', daily_rate=400000, location='Surabaya'),
+            self.item('B 2 LOD'),
+            self.item('B 3 LOD'),
+        ], upsert=True)
+        
+        self.assertIn('Inserted 1 vehicles, updated 1, skipped 1 (1 unchanged', output)
+        vehicle = Vehicle.objects.get(plate_number='B 1 LOD')
+        self.assertEqual((vehicle.daily_rate, vehicle.location), (400000, 'Surabaya'))